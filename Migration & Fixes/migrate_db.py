@@ -1,26 +1,22 @@
-import sqlite3
+import os
+import sys
 
-def migrate_to_status():
-    conn = sqlite3.connect("../finance.db")
-    cursor = conn.cursor()
+# The schema now lives in the versioned migrations next to dashboard.py
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-    # Add 'active' column to Recurring
-    print("Updating Recurring table...")
-    try:
-        cursor.execute("ALTER TABLE recurring ADD COLUMN active INTEGER DEFAULT 1")
-    except sqlite3.OperationalError:
-        print("Column 'active' already exists in recurring.")
+from migrations import initialize_system_db, MIGRATIONS
 
-    # Add 'active' column to Cards
-    print("Updating Cards table...")
-    try:
-        cursor.execute("ALTER TABLE cards ADD COLUMN active INTEGER DEFAULT 1")
-    except sqlite3.OperationalError:
-        print("Column 'active' already exists in cards.")
 
-    conn.commit()
-    conn.close()
-    print("Migration Complete! You can now toggle status.")
+def migrate_to_latest(db_path="../finance.db"):
+    applied = initialize_system_db(db_path)
+    if applied:
+        for version, description, _ in MIGRATIONS:
+            if version in applied:
+                print(f"Applied migration {version}: {description}")
+    else:
+        print("Schema already up to date.")
+    print("Migration Complete!")
+
 
 if __name__ == "__main__":
-    migrate_to_status()
\ No newline at end of file
+    migrate_to_latest(sys.argv[1] if len(sys.argv) > 1 else "../finance.db")
@@ -1,7 +1,4 @@
-import sqlite3
-conn = sqlite3.connect("../finance.db")
-cursor = conn.cursor()
-cursor.execute('ALTER TABLE incomes ADD COLUMN paid INTEGER DEFAULT 1')
-conn.commit()
-conn.close()
-print("✅ Recurring table created!")
+from migrate_db import migrate_to_latest
+
+# incomes.paid is provisioned by migration 2 (self-healing columns)
+migrate_to_latest()
@@ -0,0 +1,18 @@
+"""
+Payment-method and paid-flag constants shared by the schema (migration triggers) and the query layer.
+Kept dependency-free so migrations and CLI tools can import them without Streamlit.
+"""
+
+# Non-card payment methods (everything else is treated as a credit card bill)
+DIRECT_METHODS = ("Pix", "Cash")
+# cash_ledger account holding every paid row (the others are payment methods, '' for incomes)
+TOTAL_ACCOUNT = "*"
+
+# What a NULL paid flag means, per ledger: the column defaults (an expense is pending until paid,
+# an income counts as received). Triggers, typed frames and reports all read NULL through this.
+PAID_DEFAULTS = {"expenses": 0, "incomes": 1}
+
+
+def paid_sql(table_name, ref=""):
+    """SQL for a row's paid flag, NULL read as the ledger's default, e.g. paid_sql('incomes', 'l.')."""
+    return f"COALESCE({ref}paid, {PAID_DEFAULTS[table_name]})"
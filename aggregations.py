@@ -0,0 +1,230 @@
+import pandas as pd
+import streamlit as st
+
+import db_utils
+from accounts import TOTAL_ACCOUNT, paid_sql
+from db_utils import run_query, table_version
+from money import cents_sql, from_cents
+
+
+# --- 1. DATE RANGE HELPERS ---
+
+def month_range(month_str):
+    """'2026-03' -> ('2026-03-01', '2026-04-01'): half-open range usable by the Date index."""
+    start = pd.Period(month_str, freq="M")
+    return start.start_time.strftime("%Y-%m-%d"), (start + 1).start_time.strftime("%Y-%m-%d")
+
+
+def _versions(*tables):
+    # Cache key component: aggregates are recomputed only when one of their tables changed
+    return tuple(table_version(t) for t in tables)
+
+
+def _with_price(df):
+    """Totals are summed as integer cents; Price (reais) is derived once, for display."""
+    df["cents"] = df["cents"].fillna(0).astype("int64")
+    df["Price"] = from_cents(df["cents"])
+    return df
+
+
+# --- 2. MONTHLY METRICS (read from monthly_rollup: O(months x categories), not O(ledger rows)) ---
+# Every total is an exact integer sum of cents (money.py), converted to reais at the end
+# monthly_rollup is maintained by triggers on expenses/incomes, so its cache keys follow those tables
+ROLLUP_DEPS = ("expenses", "incomes", "monthly_rollup")
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _month_metrics(db_name, month_str, versions):
+    res = run_query("""SELECT kind,
+                              SUM(cents)                                   AS cents,
+                              SUM(CASE WHEN paid = 1 THEN cents ELSE 0 END) AS paid
+                       FROM monthly_rollup
+                       WHERE month = ?
+                       GROUP BY kind""", (month_str,)).set_index("kind")
+    return {
+        "income": from_cents(res["cents"].get("income", 0)),
+        "expense": from_cents(res["cents"].get("expense", 0)),
+        "paid_expense": from_cents(res["paid"].get("expense", 0)),
+    }
+
+
+def month_metrics(month_str):
+    """Gross inflow, gross outflow and settled outflow (MTD) for one 'YYYY-MM' month."""
+    return _month_metrics(db_utils.DB_NAME, month_str, _versions(*ROLLUP_DEPS))
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _category_totals(db_name, month_str, versions):
+    return _with_price(run_query("""SELECT category AS Category, SUM(cents) AS cents
+                                    FROM monthly_rollup
+                                    WHERE kind = 'expense' AND month = ?
+                                    GROUP BY category""", (month_str,)))
+
+
+def category_totals(month_str):
+    """Expense total per Category for one month (Budget Guardrails)."""
+    return _category_totals(db_utils.DB_NAME, month_str, _versions(*ROLLUP_DEPS))
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _unpaid_in_month(db_name, month_str, versions):
+    start, end = month_range(month_str)
+    df = run_query(f"""SELECT *
+                       FROM expenses
+                       WHERE {paid_sql("expenses")} = 0 AND Date >= ? AND Date < ?""", (start, end))
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def unpaid_in_month(month_str):
+    """Only the pending rows of one month (settlement pipeline), not the whole ledger."""
+    return _unpaid_in_month(db_utils.DB_NAME, month_str, _versions("expenses"))
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _month_item_names(db_name, month_str, versions):
+    start, end = month_range(month_str)
+    res = run_query("SELECT DISTINCT Item FROM expenses WHERE Date >= ? AND Date < ?", (start, end))
+    return res["Item"].tolist()
+
+
+def month_item_names(month_str):
+    """Item names already logged in a month (used to tell which subscriptions are still pending)."""
+    return _month_item_names(db_utils.DB_NAME, month_str, _versions("expenses"))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _receivables(db_name, today, versions):
+    _, month_end = month_range(today[:7])
+    cents = cents_sql()
+    res = run_query(f"""SELECT COALESCE(SUM(CASE WHEN Date < ? THEN {cents} END), 0)               AS overdue,
+                               COALESCE(SUM(CASE WHEN Date >= ? AND Date < ? THEN {cents} END), 0) AS month,
+                               COALESCE(SUM({cents}), 0)                                          AS total
+                        FROM incomes
+                        WHERE {paid_sql("incomes")} = 0""", (today, today, month_end))
+    return {key: from_cents(int(res[key].iloc[0])) for key in ("overdue", "month", "total")}
+
+
+def receivables(today):
+    """Incomes not received yet, on 'today' ('YYYY-MM-DD'): overdue, still due this month, and in total."""
+    return _receivables(db_utils.DB_NAME, today, _versions("incomes"))
+
+
+# --- 3. MONTHLY SERIES ---
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _monthly_totals(db_name, kind, versions):
+    return _with_price(run_query("""SELECT month AS Month, SUM(cents) AS cents, SUM(count) AS Count
+                                    FROM monthly_rollup
+                                    WHERE kind = ? AND month <> ''
+                                    GROUP BY month
+                                    ORDER BY month""", (kind,)))
+
+
+def monthly_totals(kind):
+    """Whole-history per-month totals for 'expense' or 'income' (FIRE calculator, averages)."""
+    return _monthly_totals(db_utils.DB_NAME, kind, _versions(*ROLLUP_DEPS))
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _range_monthly_totals(db_name, kind, start, end, versions):
+    table_name = "expenses" if kind == "expense" else "incomes"
+    first, last = start[:7], end[:7]
+    # Whole months inside [start, end] come straight from the rollup...
+    full = run_query("""SELECT month AS Month, SUM(cents) AS cents
+                        FROM monthly_rollup
+                        WHERE kind = ? AND month > ? AND month < ?
+                        GROUP BY month""", (kind, first, last))
+    # ...only the two partial edge months are summed from the (indexed) ledger
+    edges = run_query(f"""SELECT substr(Date, 1, 7) AS Month, SUM({cents_sql()}) AS cents
+                          FROM {table_name}
+                          WHERE Date >= ? AND Date < date(?, '+1 day')
+                            AND (substr(Date, 1, 7) = ? OR substr(Date, 1, 7) = ?)
+                          GROUP BY substr(Date, 1, 7)""", (start, end, first, last))
+    frames = [f for f in (full, edges) if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=["Month", "cents", "Price"])
+    return _with_price(pd.concat(frames, ignore_index=True).groupby("Month", as_index=False)["cents"].sum())
+
+
+def range_monthly_totals(kind, start, end):
+    """Per-month totals restricted to the inclusive day range [start, end] ('YYYY-MM-DD' strings)."""
+    return _range_monthly_totals(db_utils.DB_NAME, kind, start, end, _versions(*ROLLUP_DEPS))
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _range_category_totals(db_name, start, end, versions):
+    first, last = start[:7], end[:7]
+    # Same split as _range_monthly_totals: rollup for whole months, indexed ledger for the edges
+    full = run_query("""SELECT category AS Category, SUM(cents) AS cents
+                        FROM monthly_rollup
+                        WHERE kind = 'expense' AND month > ? AND month < ?
+                        GROUP BY category""", (first, last))
+    edges = run_query(f"""SELECT COALESCE(Category, '') AS Category, SUM({cents_sql()}) AS cents
+                          FROM expenses
+                          WHERE Date >= ? AND Date < date(?, '+1 day')
+                            AND (substr(Date, 1, 7) = ? OR substr(Date, 1, 7) = ?)
+                          GROUP BY Category""", (start, end, first, last))
+    frames = [f for f in (full, edges) if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=["Category", "cents", "Price"])
+    return _with_price(pd.concat(frames, ignore_index=True).groupby("Category", as_index=False)["cents"].sum())
+
+
+def range_category_totals(start, end):
+    """Expense total per Category over the inclusive day range [start, end] ('YYYY-MM-DD' strings)."""
+    return _range_category_totals(db_utils.DB_NAME, start, end, _versions(*ROLLUP_DEPS))
+
+
+# --- 4. RUNNING BALANCE (read from cash_ledger/cash_months: two primary-key reads per point) ---
+# Both tables are maintained by triggers on expenses/incomes (migration 15), like monthly_rollup
+BALANCE_DEPS = ("expenses", "incomes", "cash_ledger", "cash_months")
+_END_OF_TIME = "9999-12-31"
+
+
+def _balance_cents(day, account):
+    # Balance before the day's month (closing of the last month with flows) + month-to-date up to the day
+    month = day[:7]
+    res = run_query("""SELECT COALESCE((SELECT opening_cents + net_cents FROM cash_months
+                                        WHERE account = ? AND month < ?
+                                        ORDER BY month DESC LIMIT 1), 0)
+                            + COALESCE((SELECT mtd_cents FROM cash_ledger
+                                        WHERE account = ? AND day >= ? AND day <= ?
+                                        ORDER BY day DESC LIMIT 1), 0) AS cents""",
+                    (account, month, account, month, day))
+    return int(res["cents"].iloc[0])
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _balance_on(db_name, day, account, versions):
+    return from_cents(_balance_cents(day, account))
+
+
+def balance_on(day=None, account=TOTAL_ACCOUNT):
+    """
+    Cash at the end of 'day' ('YYYY-MM-DD'): received incomes minus paid expenses dated up to it.
+    day=None counts every paid row; 'account' narrows it to one payment method's flows.
+    """
+    return _balance_on(db_utils.DB_NAME, day or _END_OF_TIME, account, _versions(*BALANCE_DEPS))
+
+
+def cash_balance():
+    """Real bank balance: every received income minus every paid expense."""
+    return balance_on()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _balance_curve(db_name, start, end, account, versions):
+    days = pd.date_range(start, end, freq="D")
+    res = run_query("""SELECT day, net_cents
+                       FROM cash_ledger
+                       WHERE account = ? AND day >= ? AND day <= ?""", (account, start, end))
+    opening = _balance_cents((days[0] - pd.Timedelta(days=1)).strftime("%Y-%m-%d"), account)
+    net = (pd.Series(res["net_cents"].to_numpy(dtype="int64"), index=pd.to_datetime(res["day"]))
+           .reindex(days, fill_value=0))
+    return pd.Series(from_cents(opening + net.cumsum().to_numpy()), index=days, name="Balance")
+
+
+def balance_curve(start, end, account=TOTAL_ACCOUNT):
+    """End-of-day cash for every day of the inclusive range [start, end] ('YYYY-MM-DD'), as a Series."""
+    return _balance_curve(db_utils.DB_NAME, start, end, account, _versions(*BALANCE_DEPS))
@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
 import os
 from datetime import datetime
 import plotly.express as px
 
+from journal import open_journal, rejected_rows
+
 # ==================== CONFIG ====================
 st.set_page_config(
     page_title="Finances & Ops",
@@ -137,29 +138,26 @@ def local_css():
 
 # ==================== DATA SETUP ====================
 DATA_FOLDER = "data"
-FINANCE_FILE = os.path.join(DATA_FOLDER, "finances.csv")
+FINANCE_FILE = os.path.join(DATA_FOLDER, "finances.csv")  # legacy CSV store, imported into the journal once
+JOURNAL_FILE = os.path.join(DATA_FOLDER, "finances.journal")
 
 if not os.path.exists(DATA_FOLDER):
     os.makedirs(DATA_FOLDER)
 
-if not os.path.exists(FINANCE_FILE):
-    df_init = pd.DataFrame(columns=["Data", "Categoria", "Descrição", "Valor", "Tipo"])
-    df_init.to_csv(FINANCE_FILE, index=False)
+
+@st.cache_resource
+def get_journal():
+    return open_journal(JOURNAL_FILE, legacy_csv=FINANCE_FILE)
 
 
-def load_data():
-    return pd.read_csv(FINANCE_FILE)
+@st.cache_data(show_spinner=False)
+def load_expenses(count):
+    # 'count' is only part of the cache key: every save appends, so the next rerun re-reads
+    return get_journal().records(types=["Despesa"])
 
 
 def save_transaction(date, category, desc, value, type_t):
-    new_data = pd.DataFrame({
-        "Data": [date],
-        "Categoria": [category],
-        "Descrição": [desc],
-        "Valor": [value],
-        "Tipo": [type_t]
-    })
-    new_data.to_csv(FINANCE_FILE, mode='a', header=False, index=False)
+    get_journal().append(date, category, desc, value, type_t)
 
 
 # Apply CSS
@@ -205,6 +203,13 @@ if menu == "Dashboard Overview":
 elif menu == "Finance Operations":
     st.markdown("<h1>Financial Operations</h1>", unsafe_allow_html=True)
 
+    # Legacy CSV rows the journal import could not read (skipped, not fatal)
+    rejected = rejected_rows(get_journal().path)
+    if not rejected.empty:
+        with st.expander(f"⚠️ {len(rejected)} row(s) of {FINANCE_FILE} were not imported"):
+            st.caption(f"Fix them and add them again as new transactions. Full list: {JOURNAL_FILE}.rejected.csv")
+            st.dataframe(rejected, hide_index=True, use_container_width=True)
+
     # Input Form (Clean Expander)
     with st.expander("➕ New Transaction Entry", expanded=False):
         with st.form("finance_form"):
@@ -224,16 +229,18 @@ elif menu == "Finance Operations":
                 st.success("Transaction recorded successfully.")
                 st.rerun()
 
-    # Data Viz
-    df = load_data()
+    # Data Viz (totals come from the journal footer, not from a scan)
+    journal = get_journal()
+    count = len(journal)
 
-    if not df.empty:
+    if count:
         # Metrics Row
         st.markdown("### 📊 Cash Flow Analysis")
 
-        receitas = df[df["Tipo"] == "Receita"]["Valor"].sum()
-        despesas = df[df["Tipo"] == "Despesa"]["Valor"].sum()
-        investido = df[df["Tipo"] == "Investimento"]["Valor"].sum()
+        totals = journal.totals()
+        receitas = totals["Receita"]
+        despesas = totals["Despesa"]
+        investido = totals["Investimento"]
         saldo = receitas - despesas - investido
 
         m1, m2, m3, m4 = st.columns(4)
@@ -261,7 +268,7 @@ elif menu == "Finance Operations":
         # Charts
         c1, c2 = st.columns([1, 1])
 
-        df_despesas = df[df["Tipo"] == "Despesa"]
+        df_despesas = load_expenses(count)
         if not df_despesas.empty:
             # Clean Pie Chart
             fig_pie = px.pie(
@@ -285,7 +292,7 @@ elif menu == "Finance Operations":
 
         with c2:
             st.markdown('<div class="fintech-card"><h3>Recent Activity</h3>', unsafe_allow_html=True)
-            st.dataframe(df.tail(8), hide_index=True, use_container_width=True)
+            st.dataframe(journal.tail(8), hide_index=True, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
 # 3. ENGLISH
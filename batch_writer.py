@@ -0,0 +1,116 @@
+import pandas as pd
+
+from data_layer import LEDGER_COLUMNS
+from db_utils import get_connection, bump_table_version
+from migrations import bulk_append_sql
+
+
+# --- 1. VECTORIZED DIFF ---
+
+def _to_sql_frame(df, columns):
+    """Normalizes editor output to what SQLite stores (ISO date strings, 0/1 paid)."""
+    out = df[[c for c in ["id"] + columns if c in df.columns]].copy()
+    if "Date" in out.columns:
+        dates = pd.to_datetime(out["Date"], errors="coerce")
+        out["Date"] = dates.dt.strftime("%Y-%m-%d").where(dates.notna(), None)
+    if "paid" in out.columns:
+        out["paid"] = pd.to_numeric(out["paid"], errors="coerce").fillna(0).astype(int)
+    return out
+
+
+def diff_ledger(original, edited, columns):
+    """
+    Compares a st.data_editor result with the frame it was fed, keyed by 'id'.
+    Row order doesn't matter (sorted/filtered views are fine).
+    Returns (inserts, updates, deleted_ids):
+    - inserts: edited rows without an id (added through num_rows="dynamic")
+    - updates: rows whose id exists in both frames and where any column changed
+    - deleted_ids: ids present in the original but gone from the edit
+    """
+    before = _to_sql_frame(original, columns)
+    after = _to_sql_frame(edited, columns)
+
+    new_mask = after["id"].isna()
+    inserts = after[new_mask].drop(columns="id")
+    after = after[~new_mask].astype({"id": int})
+    before = before.astype({"id": int})
+
+    deleted_ids = before.loc[~before["id"].isin(after["id"]), "id"].tolist()
+
+    merged = after.merge(before, on="id", how="inner", suffixes=("", "__old"))
+    changed = pd.Series(False, index=merged.index)
+    for col in columns:
+        if col not in after.columns:
+            continue
+        new, old = merged[col], merged[f"{col}__old"]
+        changed |= ~((new == old) | (new.isna() & old.isna()))
+    updates = merged.loc[changed, ["id"] + [c for c in columns if c in after.columns]]
+
+    return inserts, updates, deleted_ids
+
+
+# --- 2. SINGLE-TRANSACTION APPLY ---
+
+def _quote(col):
+    return f'"{col}"'
+
+
+def apply_ledger_changes(table_name, original, edited, columns=None):
+    """
+    Writes every insert/update/delete from an editor session in ONE transaction
+    (one executemany per kind) and reports the affected ids:
+    {"inserted": [...], "updated": [...], "deleted": [...]}
+    """
+    columns = columns or [c for c in LEDGER_COLUMNS[table_name] if c != "id"]
+    inserts, updates, deleted_ids = diff_ledger(original, edited, columns)
+    result = {"inserted": [], "updated": updates["id"].tolist(), "deleted": deleted_ids}
+
+    if inserts.empty and updates.empty and not deleted_ids:
+        return result
+
+    with get_connection() as conn:
+        # IMMEDIATE takes the write lock up front: nobody else can insert mid-batch
+        conn.execute("BEGIN IMMEDIATE")
+
+        if not updates.empty:
+            set_cols = [c for c in updates.columns if c != "id"]
+            set_clause = ", ".join(f"{_quote(c)} = ?" for c in set_cols)
+            rows = updates[set_cols + ["id"]].astype(object).where(updates[set_cols + ["id"]].notna(), None)
+            conn.executemany(f"UPDATE {table_name} SET {set_clause} WHERE id = ?",
+                             rows.itertuples(index=False, name=None))
+
+        if deleted_ids:
+            conn.executemany(f"DELETE FROM {table_name} WHERE id = ?", [(i,) for i in deleted_ids])
+
+        if not inserts.empty:
+            ins_cols = list(inserts.columns)
+            conn.executemany(
+                f"INSERT INTO {table_name} ({', '.join(_quote(c) for c in ins_cols)}) "
+                f"VALUES ({', '.join('?' * len(ins_cols))})",
+                inserts.astype(object).where(inserts.notna(), None).itertuples(index=False, name=None))
+            # Under the IMMEDIATE lock the freshly assigned ids are the n largest ones
+            new_ids = conn.execute(f"SELECT id FROM {table_name} ORDER BY id DESC LIMIT ?",
+                                   (len(inserts),)).fetchall()
+            result["inserted"] = sorted(r[0] for r in new_ids)
+
+    bump_table_version(table_name)
+    return result
+
+
+# --- 3. BULK APPEND (deferred derived-table maintenance) ---
+
+def bulk_append(conn, table_name, insert_sql, rows):
+    """
+    Appends a batch of ledger rows inside the caller's write transaction. The per-row rollup,
+    card statement, search index and change-counter triggers stand down (bulk_appends, migration 18)
+    and each of those tables is updated by one grouped statement over the new ids instead.
+    """
+    conn.execute("INSERT INTO bulk_appends (table_name) VALUES (?)", (table_name,))
+    try:
+        # The marker row holds the write lock: the appended rows are exactly the ids past last_id
+        last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table_name}").fetchone()[0]
+        conn.executemany(insert_sql, rows)
+        for sql in bulk_append_sql(table_name):
+            conn.execute(sql, {"last_id": last_id})
+    finally:
+        conn.execute("DELETE FROM bulk_appends WHERE table_name = ?", (table_name,))
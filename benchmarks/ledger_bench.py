@@ -0,0 +1,230 @@
+"""
+Hot-path benchmark for LifeOS on synthetic ledgers.
+
+For every size, a fresh ledger is built with benchmarks/synthetic_ledger.py (real schema via
+initialize_system_db) and each operation is timed headlessly, without Streamlit running:
+- generate_installments / insert_installments (Expenses form, statement import); the insert is
+  end to end: rows plus the batch's set-based rollup/statement/search refresh (bulk_append)
+- check_and_insert_recurring (first call of the month, then the no-op check)
+- dashboard_metrics: every aggregate the Dashboard reads for the current month, cold and warm
+- hub_forecast: cash_flow_forecast over 1 month and 5 years, cold
+- monthly_summary_text / reports: the email report body and a year of reports from the report engine
+- load_ledgers: full expenses + incomes frames (Ledger Mode)
+- ledger_diff / ledger_apply: Ledger Mode editor round-trip (100 edits, 10 deletes, 10 inserts)
+
+'cold' means every st.cache_data entry was dropped first, so the number is the SQL + pandas cost.
+
+Usage:
+    python benchmarks/ledger_bench.py                                  # 10k, 100k, 1M
+    python benchmarks/ledger_bench.py --sizes 10000 --repeat 3 --json bench.json
+    python benchmarks/ledger_bench.py --sizes 100000 --baseline bench.json   # exit 1 on regression
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.logger import set_log_level
+
+# st.cache_data warns about the missing runtime on every call; the caches themselves work fine
+set_log_level("error")
+
+from synthetic_ledger import REPO, build_ledger, use_database  # noqa: E402
+
+from aggregations import (month_metrics, cash_balance, category_totals, unpaid_in_month,  # noqa: E402
+                          month_item_names)
+from batch_writer import diff_ledger, apply_ledger_changes  # noqa: E402
+from data_layer import load_data  # noqa: E402
+from db_utils import run_query, check_and_insert_recurring  # noqa: E402
+from forecasting import cash_flow_forecast  # noqa: E402
+from installments import generate_installments, insert_installments  # noqa: E402
+from recurring_schedule import recurring_occurrences  # noqa: E402
+from reports import build_reports, monthly_periods, monthly_summary_text  # noqa: E402
+from statements import month_statements  # noqa: E402
+
+# Below this, a slower median is treated as noise rather than a regression
+NOISE_FLOOR_MS = 5.0
+
+
+# --- 1. TIMING HELPERS ---
+
+def _time(fn, repeat, setup=None):
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    return {"median_ms": round(statistics.median(runs), 3), "min_ms": round(min(runs), 3),
+            "runs": [round(r, 3) for r in runs]}
+
+
+def _cold():
+    st.cache_data.clear()
+
+
+# --- 2. WORKLOADS ---
+
+def _purchase_batch(n, today):
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        "date": (np.datetime64(today.date(), "D") - rng.integers(0, 30, n)).astype(str),
+        "item": [f"Bench purchase {i}" for i in range(n)],
+        "price": rng.gamma(3.0, 100.0, n).round(2),
+        "category": "Fun",
+        "payment_method": rng.choice(["Nubank", "Itaú", "Pix"], n),
+        "installments": rng.integers(1, 13, n),
+    })
+
+
+def _dashboard(month):
+    month_start = pd.Timestamp(month + "-01")
+    recurring_occurrences(month_start, month_start)
+    month_metrics(month)
+    cash_balance()
+    category_totals(month)
+    unpaid_in_month(month)
+    month_statements(month)
+    month_item_names(month)
+
+
+def _clear_auto_month(month_start, next_month):
+    run_query("DELETE FROM expenses WHERE is_auto = 1 AND Date >= ? AND Date < ?", (month_start, next_month))
+
+
+def _ledger_edit(rng):
+    """Ledger Mode session: the full expenses frame plus an edited copy (what st.data_editor returns)."""
+    original = load_data("expenses")
+    original["paid"] = original["paid"].astype(bool)
+    edited = original.copy()
+    rows = rng.choice(len(edited), 110, replace=False)
+    edited.loc[edited.index[rows[:100]], "Price"] += 1.0
+    edited = edited.drop(index=edited.index[rows[100:]])
+    added = edited.tail(10).drop(columns="id").assign(Item="Bench insert")
+    return original, pd.concat([edited, added], ignore_index=True)
+
+
+def run_size(n, repeat, workdir):
+    path = os.path.join(workdir, f"ledger_{n}.db")
+    t0 = time.perf_counter()
+    counts = build_ledger(path, n)
+    build_s = time.perf_counter() - t0
+    use_database(path)
+
+    today = pd.Timestamp.now().normalize()
+    month = today.strftime("%Y-%m")
+    month_start = today.replace(day=1).strftime("%Y-%m-%d")
+    next_month = (today.replace(day=1) + pd.DateOffset(months=1)).strftime("%Y-%m-%d")
+    batch = _purchase_batch(1000, today)
+    rng = np.random.default_rng(11)
+    ops = {}
+
+    ops["generate_installments"] = _time(
+        lambda: generate_installments(today.date(), "TV", 3600.0, "Housing", "Nubank", 12), repeat)
+    ops["insert_installments[1000 purchases]"] = _time(lambda: insert_installments(batch), repeat)
+
+    ops["check_and_insert_recurring[insert]"] = _time(
+        check_and_insert_recurring, repeat, setup=lambda: _clear_auto_month(month_start, next_month))
+    ops["check_and_insert_recurring[noop]"] = _time(check_and_insert_recurring, repeat)
+
+    ops["dashboard_metrics[cold]"] = _time(lambda: _dashboard(month), repeat, setup=_cold)
+    ops["dashboard_metrics[warm]"] = _time(lambda: _dashboard(month), repeat)
+
+    ops["hub_forecast[1 month, cold]"] = _time(
+        lambda: cash_flow_forecast(today, today + pd.DateOffset(months=1)), repeat, setup=_cold)
+    ops["hub_forecast[5 years, cold]"] = _time(
+        lambda: cash_flow_forecast(today - pd.DateOffset(years=4), today + pd.DateOffset(years=1)),
+        repeat, setup=_cold)
+
+    ops["load_ledgers[cold]"] = _time(lambda: (load_data("incomes"), load_data("expenses")), repeat, setup=_cold)
+    ops["monthly_summary_text[cold]"] = _time(monthly_summary_text, repeat, setup=_cold)
+    ops["reports[12 months + year, html, cold]"] = _time(
+        lambda: build_reports(monthly_periods(today.year - 1) + [str(today.year - 1)], "html"), repeat, setup=_cold)
+
+    session = {}
+
+    def new_session():
+        session["original"], session["edited"] = _ledger_edit(rng)
+
+    columns = ["Date", "Category", "Item", "Price", "Payment Method", "paid"]
+    ops["ledger_diff"] = _time(lambda: diff_ledger(session["original"], session["edited"], columns), repeat,
+                               setup=new_session)
+    ops["ledger_apply"] = _time(lambda: apply_ledger_changes("expenses", session["original"], session["edited"]),
+                                repeat, setup=new_session)
+
+    return {"rows": counts, "build_s": round(build_s, 2), "db_mb": round(os.path.getsize(path) / 2 ** 20, 1),
+            "ops": ops}
+
+
+# --- 3. REPORT ---
+
+def _environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "pandas": pd.__version__, "numpy": np.__version__, "platform": platform.platform()}
+
+
+def compare(report, baseline, tolerance):
+    """Lists ops whose median got slower than baseline * (1 + tolerance) (and by more than the noise floor)."""
+    regressions = []
+    for size, res in report["sizes"].items():
+        old_ops = baseline.get("sizes", {}).get(size, {}).get("ops", {})
+        for op, timing in res["ops"].items():
+            old = old_ops.get(op)
+            if not old:
+                continue
+            new_ms, old_ms = timing["median_ms"], old["median_ms"]
+            if new_ms > old_ms * (1 + tolerance) and new_ms - old_ms > NOISE_FLOOR_MS:
+                regressions.append((size, op, old_ms, new_ms))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="synthetic expense rows per ledger")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per operation (median reported)")
+    parser.add_argument("--json", default="ledger_bench.json", help="report file (default: ledger_bench.json)")
+    parser.add_argument("--baseline", help="previous report: exit 1 if any op regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    report = {"environment": _environment(), "repeat": args.repeat, "sizes": {}}
+    with tempfile.TemporaryDirectory(prefix="lifeos_ledger_bench_") as workdir:
+        for n in args.sizes:
+            res = run_size(n, args.repeat, workdir)
+            report["sizes"][str(n)] = res
+            print(f"\n== {n:,} expenses (built in {res['build_s']}s, {res['db_mb']} MB) ==")
+            for op, timing in res["ops"].items():
+                print(f"{op:<40} {timing['median_ms']:>10.1f} ms   (min {timing['min_ms']:.1f})")
+
+    with open(args.json, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\n📄 Report written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(report, json.load(fh), args.tolerance)
+        for size, op, old_ms, new_ms in regressions:
+            print(f"⚠️ {size}: {op} {old_ms:.1f} ms -> {new_ms:.1f} ms")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
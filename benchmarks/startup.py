@@ -0,0 +1,112 @@
+"""
+Startup benchmark for the Streamlit dashboard.
+
+Measures, per page:
+- cold: first full run in a fresh interpreter (module imports, schema bootstrap, first data load)
+- rerun: median of N reruns in the same session (what every click costs)
+- plotly: whether plotly ended up imported by that page
+
+Usage:
+    python benchmarks/startup.py                      # this checkout
+    python benchmarks/startup.py --app /path/to/old   # another checkout, for before/after numbers
+    python benchmarks/startup.py --rows 20000 --reruns 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["📊 Dashboard", "🎖️ Wealth Command", "💸 Expenses", "English Training", "Project Management"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incomes (id INTEGER PRIMARY KEY AUTOINCREMENT, Date TEXT, Category TEXT, Item TEXT,
+                                    Price REAL, paid INTEGER DEFAULT 1);
+CREATE TABLE IF NOT EXISTS expenses (id INTEGER PRIMARY KEY AUTOINCREMENT, Date TEXT, Category TEXT, Item TEXT,
+                                     Price REAL, "Payment Method" TEXT, paid INTEGER DEFAULT 0);
+CREATE TABLE IF NOT EXISTS budgets (category TEXT PRIMARY KEY, amount REAL);
+CREATE TABLE IF NOT EXISTS categories (name TEXT PRIMARY KEY, type TEXT);
+CREATE TABLE IF NOT EXISTS cards (id INTEGER PRIMARY KEY AUTOINCREMENT, card_name TEXT, closing_day INTEGER,
+                                  due_day INTEGER, active INTEGER);
+CREATE TABLE IF NOT EXISTS recurring (id INTEGER PRIMARY KEY AUTOINCREMENT, item TEXT, category TEXT, price REAL,
+                                      payment_method TEXT, day_of_month INTEGER, active INTEGER DEFAULT 1,
+                                      created_at TEXT);
+CREATE TABLE IF NOT EXISTS investments (Asset TEXT PRIMARY KEY, Category TEXT, Date TEXT, Quantity REAL,
+                                        Amount REAL, Current_Value REAL);
+INSERT INTO cards (card_name, closing_day, due_day, active) VALUES ('Nubank', 28, 7, 1);
+INSERT INTO budgets VALUES ('Food', 800), ('Fun', 300);
+INSERT INTO recurring (item, category, price, payment_method, day_of_month, active, created_at)
+    VALUES ('Netflix', 'Fun', 40, 'Pix', 5, 1, '2024-01-01');
+INSERT INTO investments VALUES ('ALRX11', 'FIIs', '2026-01-01', 10, 1000, 1000);
+"""
+
+# Runs inside the child interpreter: streamlit is imported before the clock starts,
+# so 'cold' is the app's own cost, not the framework's.
+CHILD = r"""
+import json, sys, time, statistics
+from streamlit.testing.v1 import AppTest
+app, page, reruns = sys.argv[1], sys.argv[2], int(sys.argv[3])
+sys.path.insert(0, app)
+at = AppTest.from_file(app + "/dashboard.py", default_timeout=300)
+at.session_state["active_page"] = page
+t0 = time.perf_counter(); at.run(); cold = time.perf_counter() - t0
+times = []
+for _ in range(reruns):
+    t0 = time.perf_counter(); at.run(); times.append(time.perf_counter() - t0)
+print(json.dumps({"cold": cold, "rerun": statistics.median(times), "plotly": "plotly.express" in sys.modules,
+                  "error": str(at.exception[0].value) if at.exception else None}))
+"""
+
+
+def seed_db(path, rows):
+    """Synthetic ledger: 'rows' expenses over ~2 years, plus monthly incomes."""
+    rnd = random.Random(7)
+    today = date.today()
+    con = sqlite3.connect(path)
+    con.executescript(SCHEMA)
+    con.executemany('INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) VALUES (?,?,?,?,?,?)',
+                    [((today - timedelta(days=rnd.randint(-60, 700))).isoformat(),
+                      rnd.choice(["Food", "Fun", "Transport", "Housing"]), f"item{i}", round(rnd.uniform(1, 300), 2),
+                      rnd.choice(["Pix", "Cash", "Nubank"]), int(rnd.random() < 0.6)) for i in range(rows)])
+    con.executemany("INSERT INTO incomes (Date, Category, Item, Price, paid) VALUES (?,?,?,?,1)",
+                    [((today - timedelta(days=30 * m)).isoformat(), "Salary", "Salary", 5000.0) for m in range(24)])
+    con.commit()
+    con.close()
+
+
+def run_page(app, page, rows, reruns):
+    work = tempfile.mkdtemp(prefix="lifeos_bench_")
+    seed_db(os.path.join(work, "finance.db"), rows)
+    out = subprocess.run([sys.executable, "-c", CHILD, app, page, str(reruns)], cwd=work,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=REPO, help="checkout containing dashboard.py (default: this repo)")
+    parser.add_argument("--rows", type=int, default=5000, help="synthetic expense rows")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'page':<22} {'cold (s)':>9} {'rerun (ms)':>11}  plotly")
+    for page in PAGES:
+        res = run_page(os.path.abspath(args.app), page, args.rows, args.reruns)
+        results[page] = res
+        status = f"  ERROR: {res['error']}" if res["error"] else ""
+        print(f"{page:<22} {res['cold']:>9.2f} {res['rerun'] * 1000:>11.1f}  {'yes' if res['plotly'] else 'no'}{status}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"app": os.path.abspath(args.app), "rows": args.rows, "pages": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Synthetic LifeOS ledgers for benchmarking.
+
+build_ledger(path, n_expenses) creates finance.db-compatible files through the real
+migrations (initialize_system_db), so indexes, monthly_rollup triggers and every
+other schema object are exactly what the app runs against.
+
+Shape of the data (deterministic for a given seed):
+- expenses: n_expenses rows over ~5 years (4 back, 1 ahead), ~15% of them card
+  installment series "Item (k/N)", ~60% paid
+- incomes: one salary per month plus freelance rows (~n_expenses / 40)
+- recurring: 50 subscriptions with staggered birth dates, 45 active
+- cards / categories / budgets / investments: small fixed sets
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO not in sys.path:
+    sys.path.insert(0, REPO)
+
+import db_utils  # noqa: E402
+from db_utils import get_connection, bump_table_version  # noqa: E402
+from migrations import initialize_system_db  # noqa: E402
+
+CATEGORIES = ["Food", "Transport", "Housing", "Fun", "Health", "Education", "Leisure", "Dining Out"]
+CARDS = [("Nubank", 28, 7), ("Itaú", 4, 10), ("Inter", 15, 22)]
+METHODS = ["Pix", "Cash"] + [c[0] for c in CARDS]
+ITEMS = ["Supermarket", "Uber", "iFood", "Rent", "Pharmacy", "Course", "Cinema", "Gas", "Amazon", "Coffee"]
+
+
+def use_database(path):
+    """Points the whole data layer (pool, caches, loaders) at 'path' and migrates it."""
+    db_utils.DB_NAME = path
+    initialize_system_db(path)
+
+
+def _dates(rng, n, start, days):
+    offsets = rng.integers(0, days, n)
+    return (np.datetime64(start, "D") + offsets).astype(str)
+
+
+def build_ledger(path, n_expenses, seed=42, today=None):
+    """Creates (or overwrites) a synthetic ledger at 'path'. Returns row counts per table."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    use_database(path)
+
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(today or pd.Timestamp.now().normalize())
+    start = (today - pd.DateOffset(years=4)).strftime("%Y-%m-%d")
+    span = (today + pd.DateOffset(years=1) - pd.Timestamp(start)).days
+
+    # Plain purchases
+    n_series = int(n_expenses * 0.15) // 6
+    n_plain = n_expenses - n_series * 6
+    plain = pd.DataFrame({
+        "Date": _dates(rng, n_plain, start, span),
+        "Category": rng.choice(CATEGORIES, n_plain),
+        "Item": rng.choice(ITEMS, n_plain),
+        "Price": rng.gamma(2.0, 60.0, n_plain).round(2),
+        "Payment Method": rng.choice(METHODS, n_plain),
+    })
+
+    # Installment series: 6 monthly rows per purchase on one card
+    first = pd.to_datetime(_dates(rng, n_series, start, span - 190))
+    k = np.tile(np.arange(6), n_series)
+    owner = np.repeat(np.arange(n_series), 6)
+    series_dates = (first.to_numpy().astype("datetime64[M]")[owner] + k.astype("timedelta64[M]")) \
+        .astype("datetime64[D]") + 6
+    series = pd.DataFrame({
+        "Date": series_dates.astype(str),
+        "Category": rng.choice(CATEGORIES, n_series)[owner],
+        "Item": [f"Purchase {o} ({i + 1}/6)" for o, i in zip(owner, k)],
+        "Price": rng.gamma(3.0, 80.0, n_series).round(2)[owner],
+        "Payment Method": rng.choice([c[0] for c in CARDS], n_series)[owner],
+    })
+
+    expenses = pd.concat([plain, series], ignore_index=True)
+    # Past rows are mostly settled, future rows are pending
+    expenses["paid"] = ((expenses["Date"] < today.strftime("%Y-%m-%d")) & (rng.random(len(expenses)) < 0.75))\
+        .astype(int)
+    expenses = expenses.sort_values("Date", kind="stable")
+
+    months = pd.date_range(start, today + pd.DateOffset(years=1), freq="MS")
+    n_free = max(n_expenses // 40 - len(months), 0)
+    incomes = pd.concat([
+        pd.DataFrame({"Date": (months + pd.Timedelta(days=4)).strftime("%Y-%m-%d"), "Category": "Salary",
+                      "Item": "Salary", "Price": 9000.0}),
+        pd.DataFrame({"Date": _dates(rng, n_free, start, span), "Category": "Freelance", "Item": "Project",
+                      "Price": rng.gamma(2.0, 700.0, n_free).round(2)}),
+    ], ignore_index=True)
+    incomes["paid"] = (incomes["Date"] <= today.strftime("%Y-%m-%d")).astype(int)
+
+    recurring = [(f"Subscription {i}", rng.choice(CATEGORIES), float(round(rng.uniform(10, 300), 2)), "Pix",
+                  int(rng.integers(1, 29)), int(i < 45),
+                  (today - pd.DateOffset(months=int(rng.integers(0, 48)))).strftime("%Y-%m-01"))
+                 for i in range(50)]
+
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany('INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         expenses.astype(object).itertuples(index=False, name=None))
+        conn.executemany("INSERT INTO incomes (Date, Category, Item, Price, paid) VALUES (?, ?, ?, ?, ?)",
+                         incomes.astype(object).itertuples(index=False, name=None))
+        conn.executemany("INSERT INTO recurring (item, category, price, payment_method, day_of_month, active, "
+                         "created_at) VALUES (?, ?, ?, ?, ?, ?, ?)", recurring)
+        conn.executemany("INSERT INTO cards (card_name, closing_day, due_day, active) VALUES (?, ?, ?, 1)", CARDS)
+        conn.executemany("INSERT INTO categories (name, type) VALUES (?, 'Expense')", [(c,) for c in CATEGORIES])
+        conn.executemany("INSERT INTO budgets (category, amount) VALUES (?, ?)",
+                         [(c, 1500.0) for c in CATEGORIES[:5]])
+        conn.executemany("INSERT INTO investments (Asset, Category, Date, Quantity, Amount, Current_Value) "
+                         "VALUES (?, ?, ?, ?, ?, ?)",
+                         [("ALRX11", "FIIs", start, 100, 10000.0, 10400.0), ("BTC", "Crypto", start, 0.1, 25000.0,
+                                                                              31000.0)])
+    with get_connection() as conn:
+        conn.execute("PRAGMA optimize")
+    bump_table_version()
+    return {"expenses": len(expenses), "incomes": len(incomes), "recurring": len(recurring)}
+
+
+if __name__ == "__main__":
+    # Usage: python benchmarks/synthetic_ledger.py <out.db> [n_expenses]
+    counts = build_ledger(os.path.abspath(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 10_000)
+    print(f"✅ {sys.argv[1]}: {counts}")
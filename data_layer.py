@@ -0,0 +1,237 @@
+import pandas as pd
+import streamlit as st
+
+import db_utils
+from accounts import PAID_DEFAULTS, paid_sql
+from db_utils import run_query, table_version
+from money import from_cents, to_cents
+from search_index import SEARCH_TABLES, match_query
+from snapshots import load_current
+
+# Empty-table fallbacks so pages can keep filtering on the usual columns
+LEDGER_COLUMNS = {
+    "expenses": ["id", "Date", "Category", "Item", "Price", "Payment Method", "paid"],
+    "incomes": ["id", "Date", "Category", "Item", "Price", "paid"],
+}
+DATED_TABLES = ("expenses", "incomes")
+
+# Typed ledger schema, applied once when a ledger is read (SQLite or snapshot):
+# low-cardinality labels as categoricals, 0/1 flags as int8, Date parsed to datetime64,
+# money as int64 'cents' (what totals are summed on) next to Price in reais.
+# Item stays a plain string column (nearly unique, a categorical would only add codes).
+CATEGORY_COLUMNS = ("Category", "Payment Method")
+# A NULL paid flag reads as the ledger's default (accounts.PAID_DEFAULTS), exactly as the triggers do
+FLAG_DEFAULTS = {"expenses": {"paid": PAID_DEFAULTS["expenses"], "is_auto": 0},
+                 "incomes": {"paid": PAID_DEFAULTS["incomes"]}}
+DATE_DTYPE = "datetime64[s]"  # pandas' coarsest datetime resolution (dates are whole days)
+
+
+# --- 1. VERSIONED TABLE CACHE ---
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _read_table(db_name, table_name, version):
+    """
+    One physical read per (table, version).
+    'version' is only part of the cache key: a write through run_query bumps it,
+    so the next rerun misses the cache and re-reads; otherwise the parsed frame is reused.
+    Ledgers come from a Parquet snapshot instead while it still matches the table (no parsing).
+    """
+    if table_name in DATED_TABLES:
+        df = load_current(table_name, db_name)
+        if df is not None:
+            return apply_schema(df, table_name)
+    try:
+        res = run_query(f"SELECT * FROM {table_name}")
+        df = res if res is not None else pd.DataFrame()
+    except Exception:
+        # Graceful Degradation: Return empty DF to keep the UI running
+        df = pd.DataFrame()
+
+    if table_name in DATED_TABLES:
+        if df.empty:
+            df = pd.DataFrame(columns=LEDGER_COLUMNS[table_name])
+        df = apply_schema(df, table_name)
+    return df
+
+
+def apply_schema(df, table_name):
+    """
+    Casts a raw ledger frame to the typed schema. Parsing happens here only: pages get
+    Date as datetime64 (the .dt filters work even on an empty ledger), paid as int8 whatever
+    SQLite handed back (1, '1', True, NULL), Category/Payment Method as categoricals, and
+    cents (int64, same rounding as the generated column) with Price re-derived from it.
+    """
+    df["Date"] = pd.to_datetime(df["Date"]).astype(DATE_DTYPE)
+    df["cents"] = to_cents(pd.to_numeric(df["Price"], errors="coerce"))
+    df["Price"] = from_cents(df["cents"])
+    for col, default in FLAG_DEFAULTS[table_name].items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(default).astype("int8")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def editable(df):
+    """Plain-string labels for st.data_editor: a categorical column would become a fixed selectbox."""
+    return df.astype({col: str for col in CATEGORY_COLUMNS if col in df.columns})
+
+
+def load_data(table_name):
+    """
+    Cached drop-in for the old loader: expenses/incomes come back typed (see apply_schema).
+    Safe to mutate: st.cache_data hands every caller its own copy.
+    """
+    return _read_table(db_utils.DB_NAME, table_name, table_version(table_name))
+
+
+def clear_cache():
+    """Drops every cached table (e.g. after an external script touched finance.db)."""
+    _read_table.clear()
+
+
+# --- 2. PAGE DATASETS (lazy: a page only pays for what it declares) ---
+
+def _categories():
+    df_cats = load_data("categories")
+    if not df_cats.empty:
+        df_cats = df_cats.sort_values("name", ascending=True)  # Forces A-Z globally
+    return df_cats
+
+
+# Dataset name -> loader. Everything goes through the versioned cache above.
+DATASETS = {
+    "expenses": lambda: load_data("expenses"),
+    "incomes": lambda: load_data("incomes"),
+    "investments": lambda: load_data("investments"),
+    "budgets": lambda: load_data("budgets"),
+    "recurring": lambda: load_data("recurring"),
+    "categories": _categories,
+    "cards": lambda: load_data("cards"),
+}
+
+
+def load_datasets(names):
+    """{name: frame} for just the datasets a page declared; nothing else is touched."""
+    return {name: DATASETS[name]() for name in names}
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _count_rows(db_name, table_name, version):
+    return int(run_query(f"SELECT COUNT(*) AS cnt FROM {table_name}")["cnt"].iloc[0])
+
+
+def count_rows(table_name):
+    """Row count, re-queried only after a write to the table."""
+    return _count_rows(db_utils.DB_NAME, table_name, table_version(table_name))
+
+
+# --- 3. LEDGER WINDOWS (keyset pagination: only the visible page leaves SQLite) ---
+# Pages are ordered newest first on (Date, id) and continue from the last row of the previous
+# page, so page N costs the same as page 1 (no OFFSET scan). Indexes from migrations 19 and 21.
+# Date is read as DATE_KEY: a row whose date was cleared sorts last instead of being
+# unreachable (a NULL never compares true against the cursor).
+# A search goes through the FTS index (search_index.py): only matching ids are read, best
+# match first, and the cursor is (rank, id) instead.
+PAGE_SIZES = (25, 50, 100, 250)
+DATE_KEY = "COALESCE(t.Date, '')"
+
+
+def _window_source(table_name, paid, categories, search):
+    """(FROM clause, WHERE clauses, params, ranked) of a ledger filter; the ledger is aliased t."""
+    source, clauses, params = f"{table_name} AS t", [], []
+    match = match_query(search)
+    if match:
+        # MATCH needs the FTS table's own name (an alias is not accepted on its left side)
+        fts = SEARCH_TABLES[table_name]
+        source = f"{fts} JOIN {table_name} AS t ON t.id = {fts}.rowid"
+        clauses.append(f"{fts} MATCH ?")
+        params.append(match)
+    if paid is not None:
+        clauses.append(f"{paid_sql(table_name, 't.')} = ?")
+        params.append(int(paid))
+    if categories:
+        clauses.append(f"t.Category IN ({','.join('?' * len(categories))})")
+        params.extend(categories)
+    return source, clauses, params, bool(match)
+
+
+def _where(clauses):
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _count_window(db_name, table_name, paid, categories, search, version):
+    source, clauses, params, _ = _window_source(table_name, paid, categories, search)
+    return int(run_query(f"SELECT COUNT(*) AS cnt FROM {source} {_where(clauses)}", params)["cnt"].iloc[0])
+
+
+def count_window(table_name, paid=None, categories=(), search=""):
+    """Rows matching a ledger filter (an index-only count for the plain and paid filters)."""
+    return _count_window(db_utils.DB_NAME, table_name, paid, tuple(categories), search, table_version(table_name))
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _fetch_window(db_name, table_name, paid, categories, search, after, size, version):
+    source, clauses, params, ranked = _window_source(table_name, paid, categories, search)
+    rank = f"{SEARCH_TABLES[table_name]}.rank"
+    key = rank if ranked else DATE_KEY
+    order = f"{rank}, t.id" if ranked else f"{DATE_KEY} DESC, t.id DESC"
+    if after is not None:
+        if ranked:
+            clauses.append(f"({key}, t.id) > (?, ?)")
+            params.extend(after)
+        else:
+            # The plain bound lets SQLite seek the expression index (a row value alone makes it scan)
+            clauses.append(f"{key} <= ? AND ({key}, t.id) < (?, ?)")
+            params.extend((after[0], *after))
+    # One extra row tells whether there is a next page
+    df = run_query(f"""SELECT t.*, {key} AS page_key
+                       FROM {source}
+                       {_where(clauses)}
+                       ORDER BY {order}
+                       LIMIT ?""", (*params, size + 1))
+    if df.empty:
+        df = pd.DataFrame(columns=LEDGER_COLUMNS[table_name] + ["page_key"])
+    has_more = len(df) > size
+    df = df.iloc[:size].reset_index(drop=True)
+    # The cursor keeps the sort key exactly as SQLite compared it, so the next page starts right after this row
+    cursor = (df["page_key"].iloc[-1], int(df["id"].iloc[-1])) if has_more else None
+    return apply_schema(df.drop(columns="page_key"), table_name), cursor
+
+
+def fetch_window(table_name, size, after=None, paid=None, categories=(), search=""):
+    """
+    One page of a ledger, newest first (best match first when searching):
+    (typed frame, cursor of the next page or None).
+    'after' is the cursor returned for the previous page (None for the first one).
+    """
+    return _fetch_window(db_utils.DB_NAME, table_name, paid, tuple(categories), search,
+                         after, size, table_version(table_name))
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _pending_rows(db_name, table_name, version):
+    df = run_query(f"""SELECT * FROM {table_name} AS t
+                       WHERE {paid_sql(table_name, 't.')} = 0
+                       ORDER BY t.Date IS NULL, t.Date, t.id""")
+    if df.empty:
+        df = pd.DataFrame(columns=LEDGER_COLUMNS[table_name])
+    return apply_schema(df, table_name)
+
+
+def pending_rows(table_name):
+    """Only the unpaid (expenses) or not yet received (incomes) rows of a ledger, oldest first, typed."""
+    return _pending_rows(db_utils.DB_NAME, table_name, table_version(table_name))
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _ledger_categories(db_name, table_name, version):
+    res = run_query(f"SELECT DISTINCT Category FROM {table_name} WHERE Category IS NOT NULL ORDER BY Category")
+    return res["Category"].tolist()
+
+
+def ledger_categories(table_name):
+    """Categories present in a ledger (filter options), without loading the ledger."""
+    return _ledger_categories(db_utils.DB_NAME, table_name, table_version(table_name))
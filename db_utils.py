@@ -1,19 +1,201 @@
+import os
+import queue
+import re
 import sqlite3
+import threading
+from contextlib import contextmanager
 import pandas as pd
-import streamlit as st
 from dateutil.relativedelta import relativedelta
 from datetime import date as dt_class
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from query_profiler import ProfiledConnection
 
 DB_NAME = "finance.db"
 
 
 # --- 1. CORE DATA ENGINE ---
 
-def get_connection():
-    return sqlite3.connect(DB_NAME)
+# Applied to every pooled connection. WAL lets readers (other tabs/sessions) keep
+# working while a write is in flight; NORMAL sync is safe under WAL.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",      # ~20 MB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of SQLite connections for one database file.
+    Each Streamlit session runs its script on its own thread; a rerun checks a
+    connection out, so no two threads ever share one at the same time.
+    """
+
+    def __init__(self, db_name, max_idle=8):
+        self.db_name = db_name
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+
+    def _connect(self):
+        # cached_statements: sqlite3 keeps prepared statements per connection,
+        # so reusing connections also reuses the compiled SQL.
+        # ProfiledConnection feeds query_profiler (a no-op unless profiling is switched on).
+        conn = sqlite3.connect(self.db_name, timeout=30, check_same_thread=False, cached_statements=256,
+                               factory=ProfiledConnection)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_name=None):
+    """One pool per database file, shared by every session of the process."""
+    path = os.path.abspath(db_name or DB_NAME)
+    with _POOLS_LOCK:
+        if path not in _POOLS:
+            _POOLS[path] = ConnectionPool(path)
+        return _POOLS[path]
+
+
+@contextmanager
+def get_connection(db_name=None):
+    """Checks out a pooled connection for one unit of work (commit on success, rollback on error)."""
+    pool = get_pool(db_name)
+    conn = pool.acquire()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.release(conn)
+
+
+# Per-table write counters. Any write that goes through run_query bumps the
+# version of the table it touches, so cached loaders know when to re-read.
+_TABLE_VERSIONS = {}
+_GLOBAL_EPOCH = [0]
+_VERSION_LOCK = threading.Lock()
+
+# Writes from other processes (CLI imports, reports, snapshots, fix scripts) never reach the
+# counters above, so table versions also carry the persistent table_changes counters:
+# base tables are counted by triggers (migrations 9 and 17), derived tables follow their
+# sources and are counted by the tools that rewrite them out of band (note_changes).
+COUNTED_TABLES = ("expenses", "incomes", "investments", "budgets", "recurring", "categories", "cards",
+                  "settlements", "email_outbox", "report_logs")
+DERIVED_FROM = {
+    "monthly_rollup": ("expenses", "incomes"),
+    "card_statements": ("expenses", "cards"),
+    "cash_ledger": ("expenses", "incomes"),
+    "cash_months": ("expenses", "incomes"),
+    "recurring_projection": ("recurring",),
+}
+
+_WRITE_TARGET = re.compile(
+    r"""^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM"""
+    r"""|ALTER\s+TABLE|DROP\s+TABLE(?:\s+IF\s+EXISTS)?|CREATE\s+TABLE(?:\s+IF\s+NOT\s+EXISTS)?)"""
+    r"""\s+["'`\[]?(\w+)""",
+    re.IGNORECASE,
+)
+
+
+def written_table(query):
+    """Returns the table a write statement targets, or None if it can't be told."""
+    match = _WRITE_TARGET.match(query)
+    return match.group(1).lower() if match else None
+
+
+def bump_table_version(*tables):
+    """Marks tables as changed. With no arguments, invalidates every table."""
+    with _VERSION_LOCK:
+        if not tables:
+            _GLOBAL_EPOCH[0] += 1
+        for table in tables:
+            key = table.lower()
+            _TABLE_VERSIONS[key] = _TABLE_VERSIONS.get(key, 0) + 1
+
+
+def note_changes(conn, *tables):
+    """Counts an out-of-band rewrite of 'tables' in table_changes, inside the caller's transaction."""
+    conn.executemany("""INSERT INTO table_changes (table_name, changes) VALUES (?, 1)
+                        ON CONFLICT (table_name) DO UPDATE SET changes = changes + 1""",
+                     [(table.lower(),) for table in tables])
+
+
+class ChangeWatcher:
+    """
+    Sees commits to one database file made by any other connection or process.
+    PRAGMA data_version moves on every such commit, and only then are the table_changes counters
+    and the schema cookie re-read: a version check is one PRAGMA on an idle connection.
+    """
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self._conn = None
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._state = (0, {})
+
+    def state(self):
+        """(schema cookie, {table: changes}) as of the latest commit."""
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = sqlite3.connect(self.db_name, check_same_thread=False)
+                data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                if data_version != self._data_version:
+                    schema = self._conn.execute("PRAGMA schema_version").fetchone()[0]
+                    changes = dict(self._conn.execute("SELECT table_name, changes FROM table_changes"))
+                    self._state = (schema, changes)
+                    self._data_version = data_version
+            except sqlite3.Error:
+                # Not migrated yet (no table_changes): the in-process counters still apply
+                self._state = (0, {})
+            return self._state
+
+
+_WATCHERS = {}
+
+
+def get_watcher(db_name=None):
+    """One change watcher per database file, shared by every session of the process."""
+    path = os.path.abspath(db_name or DB_NAME)
+    with _POOLS_LOCK:
+        if path not in _WATCHERS:
+            _WATCHERS[path] = ChangeWatcher(path)
+        return _WATCHERS[path]
+
+
+def table_version(table_name, db_name=None):
+    """Current version token of a table; changes after every write to it, from this process or any other."""
+    key = table_name.lower()
+    schema, changes = get_watcher(db_name).state()
+    persisted = (schema, *(changes.get(t, 0) for t in (key, *DERIVED_FROM.get(key, ()))))
+    with _VERSION_LOCK:
+        return _GLOBAL_EPOCH[0], _TABLE_VERSIONS.get(key, 0), persisted
 
 
 def run_query(query, params=()):
@@ -21,11 +203,24 @@ def run_query(query, params=()):
     with get_connection() as conn:
         if query.strip().upper().startswith("SELECT"):
             return pd.read_sql(query, conn, params=params)
-        else:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return None
+        conn.execute(query, params)
+    _invalidate_after_write(query)
+    return None
+
+
+def run_many(query, rows):
+    """Bulk variant of run_query for INSERT/UPDATE batches (one transaction)."""
+    with get_connection() as conn:
+        conn.executemany(query, rows)
+    _invalidate_after_write(query)
+
+
+def _invalidate_after_write(query):
+    table = written_table(query)
+    if table:
+        bump_table_version(table)
+    else:
+        bump_table_version()
 
 
 def load_data(table_name):
@@ -44,139 +239,24 @@ def load_data_with_id(table_name):
 
 # --- 2. OPERATIONAL LOGIC ---
 
-def generate_installments(date, item, price, category, payment_method, installments):
-    """
-    Advanced Credit Card Logic:
-    - cycle_shift: If purchase is after closing day, it moves to the next bill.
-    - due_month_offset: If due_day < closing_day (e.g., Closes 28, Due 7), it adds a month.
-    """
-    new_rows = []
-    cards_df = load_data("cards")
-    card_rule = cards_df[cards_df["card_name"] == payment_method]
-    is_credit_card = not card_rule.empty
-
-    for i in range(installments):
-        if is_credit_card:
-            closing_day = int(card_rule.iloc[0]["closing_day"])
-            due_day = int(card_rule.iloc[0]["due_day"])
-
-            # If today is after closing, move cycle forward
-            cycle_shift = 1 if date.day > closing_day else 0
-            # If due date is numerically before closing date, it's paid in the following month
-            due_month_offset = 1 if due_day < closing_day else 0
-
-            months_to_add = i + cycle_shift + due_month_offset
-            row_date = (date + relativedelta(months=months_to_add)).replace(day=due_day)
-        else:
-            row_date = date + relativedelta(months=i)
-
-        item_name = f"{item} ({i + 1}/{installments})" if installments > 1 else item
-        new_rows.append(
-            (row_date.strftime("%Y-%m-%d"), category, item_name, round(price / installments, 2), payment_method, 0))
-    return new_rows
-
-
 def check_and_insert_recurring():
-    current_month_year = dt_class.today().strftime("%Y-%m")
-    check_query = "SELECT COUNT(*) as cnt FROM expenses WHERE Item LIKE '%[AUTO]%' AND strftime('%Y-%m', Date) = ?"
-    already_done_df = run_query(check_query, (current_month_year,))
+    # is_auto + Date range hit idx_expenses_auto_date instead of a LIKE scan over every Item
+    month_start = dt_class.today().replace(day=1)
+    next_month = month_start + relativedelta(months=1)
+    check_query = "SELECT COUNT(*) as cnt FROM expenses WHERE is_auto = 1 AND Date >= ? AND Date < ?"
+    already_done_df = run_query(check_query, (month_start.strftime("%Y-%m-%d"), next_month.strftime("%Y-%m-%d")))
     already_done = already_done_df.iloc[0, 0] if already_done_df is not None else 0
 
     if already_done == 0:
-        recurring_items = run_query("SELECT * FROM recurring WHERE active = 1")
-        if recurring_items is not None and not recurring_items.empty:
-            for _, row in recurring_items.iterrows():
-                day = min(int(row['day_of_month']), 28)
-                target_date = dt_class.today().replace(day=day).strftime("%Y-%m-%d")
-                new_item_name = f"{row['item']} [AUTO]"
-                run_query("""
-                          INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid)
-                          VALUES (?, ?, ?, ?, ?, ?)
-                          """, (target_date, row['category'], new_item_name, row['price'], 'Pix', 0))
+        # One INSERT ... SELECT: the whole month is materialized by SQLite, no per-item Python loop
+        has_items = run_query("SELECT COUNT(*) AS cnt FROM recurring WHERE active = 1").iloc[0, 0]
+        if has_items:
+            run_query("""
+                      INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid, is_auto)
+                      SELECT date(?, '+' || (MIN(MAX(CAST(day_of_month AS INTEGER), 1), 28) - 1) || ' days'),
+                             category, item || ' [AUTO]', price, 'Pix', 0, 1
+                      FROM recurring
+                      WHERE active = 1
+                      """, (month_start.strftime("%Y-%m-%d"),))
             return True
     return False
-
-
-# --- 3. REPORTING & AUTOMATION ENGINE ---
-
-def generate_monthly_summary_text(df_inc_all, df_exp_all):
-    """
-    Generates the text for the email report.
-    Logic: Only counts RECEIVED income (paid=1) for Net Flow.
-    """
-    today = pd.Timestamp.now()
-    curr_month = today.strftime("%Y-%m")
-
-    m_inc = df_inc_all[
-        df_inc_all['Date'].dt.strftime("%Y-%m") == curr_month] if not df_inc_all.empty else pd.DataFrame()
-    m_exp = df_exp_all[
-        df_exp_all['Date'].dt.strftime("%Y-%m") == curr_month] if not df_exp_all.empty else pd.DataFrame()
-
-    # Calculate metrics based on SETTLED funds (Received Income)
-    total_in = 0
-    if not m_inc.empty:
-        # Handling different boolean types (1, True, "1")
-        total_in = m_inc[m_inc["paid"].isin([1, True, "1"])]['Price'].sum()
-
-    total_out = m_exp['Price'].sum() if not m_exp.empty else 0
-    net = total_in - total_out
-    status = "STABLE 🟢" if net >= 0 else "DEFICIT 🔴"
-
-    return f"""
-    ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    🛡️ LIFE OS 2026: FISCAL INTELLIGENCE REPORT
-    📅 Period: {today.strftime('%B %Y')}
-    ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-    💰 FINANCIAL OVERVIEW:
-       • Received Income: R$ {total_in:,.2f}
-       • Total Expenses:  R$ {total_out:,.2f}
-       • Current Net:     R$ {net:,.2f}
-
-    ⚖️ FISCAL STATUS: {status}
-
-    {"⚠️ Note: You have pending receivables not yet included in the cash total." if not m_inc.empty and (m_inc["paid"].isin([0, False, "0"])).any() else ""}
-    ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    Sent via LifeOS Automated Dispatch | {today.strftime("%d/%m/%Y")}
-    """
-
-
-def send_financial_report(recipient_email, subject, body):
-    """Dispatches the report securely using Streamlit Secrets and SMTP."""
-    try:
-        sender_email = st.secrets["email"]["sender_email"]
-        app_password = st.secrets["email"]["app_password"]
-    except Exception:
-        # Failure to find secrets should not crash the app
-        return False
-
-    msg = MIMEMultipart()
-    msg['From'] = sender_email
-    msg['To'] = recipient_email
-    msg['Subject'] = subject
-    msg.attach(MIMEText(body, 'plain'))
-
-    try:
-        with smtplib.SMTP('smtp.gmail.com', 587) as server:
-            server.starttls()
-            server.login(sender_email, app_password)
-            server.send_message(msg)
-        return True
-    except Exception:
-        return False
-
-
-def auto_dispatch_monthly_report(recipient_email, df_inc_all, df_exp_all):
-    """Automated check and send logic."""
-    run_query("CREATE TABLE IF NOT EXISTS report_logs (id INTEGER PRIMARY KEY, month_year TEXT UNIQUE, sent_at TEXT)")
-    curr_month = pd.Timestamp.now().strftime("%Y-%m")
-    check = run_query("SELECT * FROM report_logs WHERE month_year = ?", (curr_month,))
-
-    if check is None or check.empty:
-        report_body = generate_monthly_summary_text(df_inc_all, df_exp_all)
-        success = send_financial_report(recipient_email, f"LifeOS Auto-Report: {curr_month}", report_body)
-        if success:
-            run_query("INSERT INTO report_logs (month_year, sent_at) VALUES (?, ?)",
-                      (curr_month, pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")))
-            return True
-    return False
\ No newline at end of file
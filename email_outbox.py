@@ -0,0 +1,242 @@
+"""
+Email outbox: the UI enqueues, a background worker sends.
+
+Reports are rows of email_outbox (migration 8). One daemon thread per database file claims
+due rows, sends them over SMTP and records the outcome:
+- sent: sent_at is set (and report_logs, for the monthly report)
+- pending again: transient failure, retried after BACKOFF_SECONDS * 2^(attempt - 1)
+- failed: MAX_ATTEMPTS reached, or an error retrying can't fix (bad login, refused address,
+  missing credentials); last_error says which
+A claimed row is 'sending' with claimed_at set; one still claimed after STALE_CLAIM_SECONDS was
+left by a worker that died (any process) and goes back to pending.
+
+SMTP settings come from st.secrets["email"]: sender_email, app_password and optionally
+smtp_host / smtp_port / starttls (defaults: smtp.gmail.com, 587, true). Tests and local
+stand-ins (python -m aiosmtpd -n -l localhost:8025) can pass settings to ensure_worker().
+"""
+import smtplib
+import sqlite3
+import threading
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pandas as pd
+import streamlit as st
+
+import db_utils
+from db_utils import get_connection, bump_table_version, run_query, table_version
+from reports import build_reports
+
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 30        # 30s, 1 min, 2 min, 4 min between attempts
+MAX_BACKOFF_SECONDS = 3600
+POLL_SECONDS = 60           # idle wake-up, in case a row was queued by another process
+SMTP_TIMEOUT = 30
+# A send is a few SMTP round trips (connect, STARTTLS, login, message), each bounded by SMTP_TIMEOUT:
+# a row still 'sending' after this long was left by a worker that died, and is sent again
+STALE_CLAIM_SECONDS = 5 * SMTP_TIMEOUT
+
+# Retrying these only repeats the same answer from the server
+PERMANENT_ERRORS = (smtplib.SMTPAuthenticationError, smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+def _now():
+    return pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# --- 1. SMTP DELIVERY (worker thread only: blocks on TLS and login) ---
+
+def smtp_settings():
+    """SMTP settings from Streamlit Secrets, or None when they're not configured."""
+    try:
+        cfg = st.secrets["email"]
+        return {"host": cfg.get("smtp_host", "smtp.gmail.com"), "port": int(cfg.get("smtp_port", 587)),
+                "starttls": bool(cfg.get("starttls", True)),
+                "sender": cfg["sender_email"], "password": cfg.get("app_password", "")}
+    except Exception:
+        # Failure to find secrets should not crash the app
+        return None
+
+
+def deliver(settings, recipient_email, subject, body):
+    """Sends one plain-text email. Raises smtplib/OS errors; the worker decides whether to retry."""
+    msg = MIMEMultipart()
+    msg['From'] = settings["sender"]
+    msg['To'] = recipient_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+
+    with smtplib.SMTP(settings["host"], settings["port"], timeout=SMTP_TIMEOUT) as server:
+        if settings["starttls"]:
+            server.starttls()
+        if settings["password"]:
+            server.login(settings["sender"], settings["password"])
+        server.send_message(msg)
+
+
+# --- 2. BACKGROUND WORKER ---
+
+class MissingCredentials(Exception):
+    pass
+
+
+class OutboxWorker(threading.Thread):
+    """Drains email_outbox for one database file, oldest due row first, one email at a time."""
+
+    def __init__(self, db_name, settings=None):
+        super().__init__(name=f"email-outbox:{db_name}", daemon=True)
+        self.db_name = db_name
+        self.settings = settings
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wake.set()
+        self.join(timeout)
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                self._reclaim_stale()
+                job = self._claim()
+                if job is None:
+                    self._wake.wait(self._idle_seconds())
+                    self._wake.clear()
+                    continue
+                self._process(job)
+            except sqlite3.Error:
+                # Locked or busy database: the row stays queued, try again on the next wake-up
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+
+    def _execute(self, query, params=()):
+        with get_connection(self.db_name) as conn:
+            conn.execute(query, params)
+        bump_table_version("email_outbox")
+
+    def _reclaim_stale(self):
+        # Only rows whose sender died mid-send: another process's worker may be sending a recent claim right now
+        cutoff = (pd.Timestamp.now() - pd.Timedelta(seconds=STALE_CLAIM_SECONDS)).strftime("%Y-%m-%d %H:%M:%S")
+        with get_connection(self.db_name) as conn:
+            reclaimed = conn.execute("""UPDATE email_outbox SET status = 'pending'
+                                        WHERE status = 'sending' AND (claimed_at IS NULL OR claimed_at < ?)""",
+                                     (cutoff,)).rowcount
+        if reclaimed:
+            bump_table_version("email_outbox")
+
+    def _claim(self):
+        with get_connection(self.db_name) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return conn.execute("""UPDATE email_outbox
+                                   SET status = 'sending', attempts = attempts + 1, claimed_at = ?
+                                   WHERE id = (SELECT id FROM email_outbox
+                                               WHERE status = 'pending' AND next_attempt_at <= ?
+                                               ORDER BY next_attempt_at, id LIMIT 1)
+                                   RETURNING id, recipient, subject, body, attempts, report_month""",
+                                (_now(), _now())).fetchone()
+
+    def _idle_seconds(self):
+        with get_connection(self.db_name) as conn:
+            due = conn.execute("SELECT MIN(next_attempt_at) FROM email_outbox "
+                               "WHERE status = 'pending'").fetchone()[0]
+        if due is None:
+            return POLL_SECONDS
+        return min(max((pd.Timestamp(due) - pd.Timestamp.now()).total_seconds(), 0.05), POLL_SECONDS)
+
+    def _process(self, job):
+        outbox_id, recipient, subject, body, attempts, report_month = job
+        try:
+            settings = self.settings or smtp_settings()
+            if settings is None:
+                raise MissingCredentials("SMTP credentials missing: set [email] in .streamlit/secrets.toml")
+            deliver(settings, recipient, subject, body)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, PERMANENT_ERRORS + (MissingCredentials,)) or attempts >= MAX_ATTEMPTS:
+                self._execute("UPDATE email_outbox SET status = 'failed', last_error = ? WHERE id = ?",
+                              (error, outbox_id))
+            else:
+                delay = min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+                retry_at = (pd.Timestamp.now() + pd.Timedelta(seconds=delay)).strftime("%Y-%m-%d %H:%M:%S")
+                self._execute("UPDATE email_outbox SET status = 'pending', last_error = ?, next_attempt_at = ? "
+                              "WHERE id = ?", (error, retry_at, outbox_id))
+            return
+
+        sent_at = _now()
+        with get_connection(self.db_name) as conn:
+            conn.execute("UPDATE email_outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+                         (sent_at, outbox_id))
+            if report_month:
+                conn.execute("INSERT OR IGNORE INTO report_logs (month_year, sent_at) VALUES (?, ?)",
+                             (report_month, sent_at))
+        bump_table_version("email_outbox", "report_logs")
+
+
+_WORKERS = {}
+_WORKERS_LOCK = threading.Lock()
+
+
+def ensure_worker(db_name=None, settings=None):
+    """The running worker for this database file, started on first use (one per file per process)."""
+    path = db_utils.get_pool(db_name).db_name
+    with _WORKERS_LOCK:
+        worker = _WORKERS.get(path)
+        if worker is None or not worker.is_alive():
+            worker = _WORKERS[path] = OutboxWorker(path, settings)
+            worker.start()
+        return worker
+
+
+# --- 3. UI-SIDE API (never touches SMTP) ---
+
+def enqueue_report(recipient_email, subject, body, report_month=None):
+    """
+    Queues one email for the worker and returns its outbox id.
+    Returns None when report_month is given and that month's report is already queued or sent.
+    """
+    with get_connection() as conn:
+        cur = conn.execute("""INSERT OR IGNORE INTO email_outbox
+                                  (recipient, subject, body, status, next_attempt_at, report_month, created_at)
+                              VALUES (?, ?, ?, 'pending', ?, ?, ?)""",
+                           (recipient_email, subject, body, _now(), report_month, _now()))
+        outbox_id = cur.lastrowid if cur.rowcount else None
+    bump_table_version("email_outbox")
+    ensure_worker().wake()
+    return outbox_id
+
+
+def auto_dispatch_monthly_report(recipient_email):
+    """Queues this month's report once (True when it was queued by this call)."""
+    curr_month = pd.Timestamp.now().strftime("%Y-%m")
+    return queue_monthly_reports(recipient_email, [curr_month]) == [curr_month]
+
+
+def queue_monthly_reports(recipient_email, months):
+    """
+    Queues the report of every 'YYYY-MM' month not already queued or logged in report_logs
+    (e.g. a whole year: reports.monthly_periods(2025)). Returns the months queued by this call.
+    """
+    marks = ", ".join("?" * len(months))
+    done = run_query(f"""SELECT month_year AS month FROM report_logs WHERE month_year IN ({marks})
+                         UNION SELECT report_month FROM email_outbox WHERE report_month IN ({marks})""",
+                     list(months) * 2)
+    todo = [m for m in months if m not in set(done["month"])]
+    # All bodies from one grouped pass of the report engine
+    bodies = build_reports(todo) if todo else {}
+    return [m for m in todo
+            if enqueue_report(recipient_email, f"LifeOS Auto-Report: {m}", bodies[m], report_month=m) is not None]
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _recent_outbox(db_name, limit, version):
+    return run_query("""SELECT id, recipient, subject, status, attempts, last_error, created_at, sent_at
+                        FROM email_outbox ORDER BY id DESC LIMIT ?""", (limit,))
+
+
+def recent_outbox(limit=5):
+    """Latest queued emails with their delivery status, newest first (re-read only when the outbox changes)."""
+    return _recent_outbox(db_utils.DB_NAME, limit, table_version("email_outbox"))
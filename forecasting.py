@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import db_utils
+from db_utils import run_query, table_version
+from aggregations import balance_on, cash_balance, range_category_totals
+from money import cents_sql, from_cents, to_cents
+from recurring_schedule import materialize_through, recurring_occurrences
+from search_index import match_query
+
+RECURRING_ACCOUNT = "Recurring"
+BAND_PERCENTILES = (10, 50, 90)
+SIMULATIONS = 400
+HISTORY_DAYS = 365
+FORECAST_DEPS = ("expenses", "incomes", "monthly_rollup", "cash_ledger", "cash_months", "recurring", "recurring_projection")
+
+
+# --- 1. RANGE INPUTS (aggregated in SQLite over the Date range, never whole-ledger copies) ---
+
+# Optimization Audit heuristics (discretionary spend)
+WASTE_CATEGORIES = ("Leisure", "Entertainment", "Dining Out")
+WASTE_KEYWORDS = ("ifood", "uber", "netflix", "amazon", "steam", "delivery", "burger", "pizza", "hbo", "disney")
+WASTE_MATCH = match_query(" ".join(WASTE_KEYWORDS), column="Item", any_word=True)
+_WASTE_PATTERN = r"\b(?:" + "|".join(WASTE_KEYWORDS) + ")"
+_RANGE = "Date >= ? AND Date < date(?, '+1 day')"
+
+
+def _daily_flows(table_name, method_sql, start, end):
+    """(Date, method, cents) sums per day: the content index covers Date, Price and Payment Method."""
+    df = run_query(f"""SELECT Date, {method_sql} AS method, SUM({cents_sql()}) AS cents
+                       FROM {table_name}
+                       WHERE {_RANGE}
+                       GROUP BY Date, method""", (start, end))
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def _top_rows(start, end, limit, waste_only=False):
+    """
+    Largest expenses in range. Candidates are picked through indexes (Date/Price, plus the FTS index
+    on Item and the Category index for the waste filter), and just 'limit' rows are read in full.
+    """
+    if waste_only:
+        # Keyword hits come from the search index (any word starting with a keyword), not a LIKE scan
+        categories = ",".join("?" * len(WASTE_CATEGORIES))
+        candidates = f"""SELECT id FROM (SELECT t.id, t.Price
+                                         FROM expenses_fts JOIN expenses AS t ON t.id = expenses_fts.rowid
+                                         WHERE expenses_fts MATCH ? AND {_RANGE}
+                                         UNION
+                                         SELECT id, Price FROM expenses WHERE Category IN ({categories}) AND {_RANGE})
+                         ORDER BY Price DESC LIMIT ?"""
+        params = (WASTE_MATCH, start, end, *WASTE_CATEGORIES, start, end, limit)
+    else:
+        candidates = f"SELECT id FROM expenses WHERE {_RANGE} ORDER BY Price DESC LIMIT ?"
+        params = (start, end, limit)
+    df = run_query(f"""SELECT Date, Category, Item, Price
+                       FROM expenses
+                       WHERE id IN ({candidates})""", params)
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def _is_waste(df):
+    # Same rule as WASTE_MATCH: a word of Item starts with one of the keywords
+    return df["Category"].isin(WASTE_CATEGORIES) | df["Item"].fillna("").str.lower().str.contains(_WASTE_PATTERN)
+
+
+def _liquid_after_commitments():
+    """Cash on hand (cash_ledger) minus every logged expense still unpaid: what the runway is measured on."""
+    res = run_query("""SELECT COALESCE(SUM(cents), 0) AS open
+                       FROM monthly_rollup
+                       WHERE kind = 'expense' AND paid = 0""")
+    return from_cents(to_cents(cash_balance()) - int(res["open"].iloc[0]))
+
+
+def _daily_spend_history(before, days=HISTORY_DAYS):
+    """Per-day spend over the last 'days' days (zero-filled), excluding recurring auto rows."""
+    first = (pd.Timestamp(before) - pd.Timedelta(days=days)).strftime("%Y-%m-%d")
+    res = run_query(f"""SELECT Date, SUM({cents_sql()}) AS cents
+                        FROM expenses
+                        WHERE Date >= ? AND Date < ? AND is_auto = 0
+                        GROUP BY Date""", (first, before))
+    daily = np.zeros(days)
+    if not res.empty:
+        idx = (pd.to_datetime(res["Date"]) - pd.Timestamp(first)).dt.days.to_numpy()
+        ok = (idx >= 0) & (idx < days)
+        np.add.at(daily, idx[ok], from_cents(res["cents"].to_numpy()[ok]))
+    return daily
+
+
+# --- 2. VECTORIZED ENGINE ---
+
+def _bin_by_day(day_idx, values, n_days, account_codes=None, n_accounts=1):
+    """Scatter-adds integer cents into a (accounts x days) grid with a single bincount."""
+    codes = np.zeros(len(day_idx), dtype=np.int64) if account_codes is None else account_codes
+    flat = np.bincount(codes * n_days + day_idx, weights=values, minlength=n_accounts * n_days)
+    # bincount weights are float64, exact for integers below 2**53
+    return flat.round().astype(np.int64).reshape(n_accounts, n_days)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _forecast(db_name, start, end, today, versions):
+    start_str, end_str = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    days = pd.date_range(start.normalize(), end.normalize(), freq="D")
+    n_days = len(days)
+
+    exp = _daily_flows("expenses", '"Payment Method"', start_str, end_str)
+    inc = _daily_flows("incomes", "''", start_str, end_str)
+
+    rec = recurring_occurrences(start, end)
+    if not rec.empty:
+        rec = rec.drop(columns="recurring_id").assign(
+            Item="🔄 " + rec["Item"].astype(str), **{"Payment Method": RECURRING_ACCOUNT})
+        exp = pd.concat([exp, pd.DataFrame({"Date": rec["Date"], "method": RECURRING_ACCOUNT,
+                                            "cents": to_cents(rec["Price"])})], ignore_index=True)
+
+    # Daily flows: outflows split per account (payment method), inflows as one row
+    accounts, account_codes = np.unique(exp["method"].fillna("").astype(str).to_numpy(), return_inverse=True)
+    exp_day = (exp["Date"].dt.normalize() - days[0]).dt.days.to_numpy(dtype=np.int64)
+    inc_day = (inc["Date"].dt.normalize() - days[0]).dt.days.to_numpy(dtype=np.int64)
+    # Binned in integer cents (exact sums per day and account), converted to reais once
+    outflow = from_cents(_bin_by_day(exp_day, exp["cents"].to_numpy(dtype=np.int64), n_days,
+                                     account_codes.astype(np.int64), max(len(accounts), 1)))
+    inflow = from_cents(_bin_by_day(inc_day, inc["cents"].to_numpy(dtype=np.int64), n_days)[0])
+
+    # Breakdowns for the Hub charts: ledger aggregates + the (small) recurring frame
+    categories = range_category_totals(start_str, end_str)
+    if not rec.empty:
+        categories = pd.concat([categories[["Category", "cents"]],
+                                pd.DataFrame({"Category": rec["Category"], "cents": to_cents(rec["Price"])})])
+        categories = categories.groupby("Category", as_index=False, sort=False)["cents"].sum()
+        categories["Price"] = from_cents(categories["cents"])
+    account_totals = pd.DataFrame({"Payment Method": accounts, "Price": outflow.sum(axis=1)[:len(accounts)]})
+    account_totals = account_totals[account_totals["Payment Method"] != RECURRING_ACCOUNT]
+    top_items = pd.concat([_top_rows(start_str, end_str, 5), rec[["Date", "Category", "Item", "Price"]]])
+    waste_items = pd.concat([_top_rows(start_str, end_str, 5, waste_only=True),
+                             rec.loc[_is_waste(rec), ["Date", "Category", "Item", "Price"]] if not rec.empty else None])
+
+    # Cash held at the end of the day before 'start', straight from the running balance
+    opening = balance_on((start - pd.Timedelta(days=1)).strftime("%Y-%m-%d"))
+    net = inflow - outflow.sum(axis=0)
+    balance = opening + np.cumsum(net)
+
+    # Percentile bands: unplanned daily spend resampled from the last year, added only to future days
+    history = _daily_spend_history(min(start, today).strftime("%Y-%m-%d"))
+    future = np.asarray(days > today)
+    noise = np.zeros((SIMULATIONS, n_days))
+    if history.any() and future.any():
+        # Fixed seed: the same inputs always give the same bands (and cache entry)
+        noise[:, future] = np.random.default_rng(0).choice(history, size=(SIMULATIONS, int(future.sum())))
+    paths = balance - np.cumsum(noise, axis=1)
+    bands = dict(zip(BAND_PERCENTILES, np.percentile(paths, BAND_PERCENTILES, axis=0)))
+
+    pred_inc, pred_exp = float(inflow.sum()), float(outflow.sum())
+    daily_burn = (pred_exp / n_days) if pred_exp > 0 else 1
+    liquid = _liquid_after_commitments()
+
+    return {
+        "days": days,
+        "accounts": list(accounts),
+        "outflow": outflow,
+        "inflow": inflow,
+        "balance": balance,
+        "bands": bands,
+        "recurring": rec,
+        "category_totals": categories,
+        "account_totals": account_totals.sort_values("Price").reset_index(drop=True),
+        "top_items": top_items.sort_values("Price", ascending=False).head(5),
+        "waste_items": waste_items.sort_values("Price", ascending=False).head(5),
+        "pred_inc": pred_inc,
+        "pred_exp": pred_exp,
+        "net": pred_inc - pred_exp,
+        "runway_days": max(0, liquid / daily_burn),
+        "savings_rate": ((pred_inc - pred_exp) / pred_inc) if pred_inc > 0 else 0,
+    }
+
+
+def cash_flow_forecast(start, end):
+    """
+    Cash-flow projection over the inclusive day range [start, end] built from the ledgers,
+    pending installments (future-dated expenses) and recurring occurrences, in one pass:
+    - outflow: (accounts x days) array, one row per payment method ('Recurring' for subscriptions)
+    - inflow / balance: per-day arrays; balance starts from the cash held before 'start'
+    - bands: {10|50|90: per-day balance percentiles} with resampled unplanned spend on future days
+    - recurring: the subscription occurrences in range (Payment Method 'Recurring')
+    - category_totals / account_totals / top_items / waste_items: Hub chart inputs (recurring included
+      except in account_totals, which is the card utilization)
+    - pred_inc, pred_exp, net, runway_days, savings_rate: the Hub headline numbers
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    materialize_through(end.strftime("%Y-%m"))
+    today = pd.Timestamp.now().normalize()
+    return _forecast(db_utils.DB_NAME, start, end, today, tuple(table_version(t) for t in FORECAST_DEPS))
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from batch_writer import bulk_append
+from data_layer import load_data
+from db_utils import bump_table_version, get_connection
+from money import from_cents, installment_cents, to_cents
+
+INSERT_EXPENSE_SQL = ('INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) '
+                      'VALUES (?, ?, ?, ?, ?, ?)')
+EXPENSE_ROW_COLUMNS = ["Date", "Category", "Item", "Price", "Payment Method", "paid"]
+
+
+# --- 1. CARD RULES ---
+
+def load_card_rules():
+    """{card_name: (closing_day, due_day)} from the cached cards table (first row wins, like before)."""
+    cards_df = load_data("cards")
+    if cards_df.empty:
+        return {}
+    cards_df = cards_df.drop_duplicates("card_name", keep="first")
+    return {name: (int(closing), int(due))
+            for name, closing, due in zip(cards_df["card_name"], cards_df["closing_day"], cards_df["due_day"])}
+
+
+# --- 2. VECTORIZED ENGINE ---
+
+def expand_installments(purchases, card_rules=None):
+    """
+    Expands a batch of purchases into one row per installment, all due dates computed with NumPy
+    month arithmetic (no per-row relativedelta).
+    'purchases' needs: date, item, price, category, payment_method, installments.
+
+    Advanced Credit Card Logic:
+    - cycle_shift: If purchase is after closing day, it moves to the next bill.
+    - due_month_offset: If due_day < closing_day (e.g., Closes 28, Due 7), it adds a month.
+    Non-card methods just repeat monthly on the purchase day.
+    Days past the end of a short month are clipped to its last day.
+    Prices are split in integer cents and the last installment takes the remainder, so the
+    installments always add up to the purchase price exactly.
+
+    Returns a frame with EXPENSE_ROW_COLUMNS (Date as 'YYYY-MM-DD'), ready for executemany.
+    """
+    if card_rules is None:
+        card_rules = load_card_rules()
+    if len(purchases) == 0:
+        return pd.DataFrame(columns=EXPENSE_ROW_COLUMNS)
+
+    dates = pd.to_datetime(purchases["date"]).to_numpy().astype("datetime64[D]")
+    counts = np.maximum(purchases["installments"].to_numpy(dtype=np.int64), 1)
+    methods = purchases["payment_method"].to_numpy(dtype=object)
+
+    purchase_month = dates.astype("datetime64[M]")
+    purchase_day = (dates - purchase_month.astype("datetime64[D]")).astype(np.int64) + 1
+
+    rules = pd.Series(methods).map(card_rules)
+    is_card = rules.notna().to_numpy()
+    closing = np.array([r[0] if isinstance(r, tuple) else 0 for r in rules], dtype=np.int64)
+    due = np.array([r[1] if isinstance(r, tuple) else 0 for r in rules], dtype=np.int64)
+
+    cycle_shift = (is_card & (purchase_day > closing)).astype(np.int64)
+    due_month_offset = (is_card & (due < closing)).astype(np.int64)
+    base_offset = cycle_shift + due_month_offset
+    target_day = np.where(is_card, due, purchase_day)
+
+    # One output row per installment: owner index + installment number (0-based)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    number = np.arange(counts.sum()) - np.repeat(starts, counts)
+
+    month = purchase_month[owner] + (base_offset[owner] + number).astype("timedelta64[M]")
+    month_start = month.astype("datetime64[D]")
+    month_len = ((month + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+    day = np.minimum(target_day[owner], month_len)
+    due_dates = month_start + (day - 1).astype("timedelta64[D]")
+
+    n = counts[owner]
+    items = pd.Series(purchases["item"].to_numpy(dtype=object)[owner]).fillna("").astype(str)
+    labels = items + " (" + pd.Series(number + 1).astype(str) + "/" + pd.Series(n).astype(str) + ")"
+    total_cents = to_cents(purchases["price"].to_numpy(dtype=np.float64))
+
+    return pd.DataFrame({
+        "Date": pd.Series(due_dates).dt.strftime("%Y-%m-%d"),
+        "Category": purchases["category"].to_numpy(dtype=object)[owner],
+        "Item": labels.where(pd.Series(n > 1), items),
+        "Price": from_cents(installment_cents(total_cents[owner], n, number + 1)),
+        "Payment Method": methods[owner],
+        "paid": 0,
+    })
+
+
+def installment_rows(frame):
+    """Columnar frame -> list of plain-Python tuples for sqlite3.executemany."""
+    return list(frame[EXPENSE_ROW_COLUMNS].astype(object).itertuples(index=False, name=None))
+
+
+def insert_installments(purchases, card_rules=None):
+    """
+    Expands and writes a whole batch of purchases in one transaction. Returns the row count.
+    The derived tables are refreshed once per batch (batch_writer.bulk_append), not per row.
+    """
+    frame = expand_installments(purchases, card_rules)
+    if not frame.empty:
+        with get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            bulk_append(conn, "expenses", INSERT_EXPENSE_SQL, installment_rows(frame))
+        bump_table_version("expenses")
+    return len(frame)
+
+
+# --- 3. SINGLE-PURCHASE ENTRY POINT (Expenses form) ---
+
+def generate_installments(date, item, price, category, payment_method, installments):
+    """Same contract as before: a list of (Date, Category, Item, Price, Payment Method, paid) tuples."""
+    purchase = pd.DataFrame([{"date": date, "item": item, "price": price, "category": category,
+                              "payment_method": payment_method, "installments": installments}])
+    return installment_rows(expand_installments(purchase))
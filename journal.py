@@ -0,0 +1,271 @@
+"""
+Append-only binary journal for app.py's Finance Operations page (replaces data/finances.csv).
+
+finances.journal
+    header   b"LOSJ" + format version
+    records  date (day ordinal), type, value (cents), category and description (UTF-8)
+    footer   record count, end of the records, running totals per type (cents), CRC32
+finances.journal.idx (sidecar index, one fixed-width entry per record)
+    offset of the record, date, type
+
+An append writes the new record and the updated footer over the old footer in one write,
+then adds its index entry. Totals are a footer read (O(1)); the last k records are k index
+entries plus k record reads (O(k)); date/type queries filter the memory-mapped index and
+only read the records that match. A torn append (crash mid-write) is detected by the footer
+CRC on the next open: the journal is rescanned, the partial record dropped and the index rebuilt.
+
+The first open imports the legacy CSV store; rows it can't read (empty Valor, unknown Tipo,
+bad Data) are left out and listed, with their CSV line and the reason, in finances.journal.rejected.csv.
+"""
+import csv
+import datetime
+import math
+import os
+import struct
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+TYPES = ("Despesa", "Receita", "Investimento")
+COLUMNS = ["Data", "Categoria", "Descrição", "Valor", "Tipo"]
+
+HEADER = struct.Struct("<4sH")
+MAGIC, VERSION = b"LOSJ", 1
+RECORD = struct.Struct("<iBqHH")          # date ordinal, type, cents, len(category), len(description)
+FOOTER = struct.Struct("<4sQQ3qI")        # magic, count, end of records, totals per type, crc32
+FOOTER_MAGIC = b"JTOT"
+INDEX_ENTRY = np.dtype([("offset", "<u8"), ("date", "<i4"), ("type", "u1")])
+MAX_ORDINAL = datetime.date.max.toordinal()
+
+_LOCKS = {}
+_LOCKS_LOCK = threading.Lock()
+
+
+def _lock(path):
+    with _LOCKS_LOCK:
+        return _LOCKS.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def _pack_footer(count, end, totals):
+    body = FOOTER.pack(FOOTER_MAGIC, count, end, *totals, 0)[:-4]
+    return body + struct.pack("<I", zlib.crc32(body))
+
+
+def _encode(date, category, desc, value, type_t):
+    """One record as bytes, plus its (date ordinal, type code, cents). ValueError says which field is bad."""
+    if type_t not in TYPES:
+        raise ValueError(f"Tipo {type_t!r} is not one of {', '.join(TYPES)}")
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        amount = math.nan
+    if not math.isfinite(amount):
+        raise ValueError(f"Valor {value!r} is not a number")
+    try:
+        ordinal = pd.Timestamp(date).toordinal()
+    except (TypeError, ValueError):
+        raise ValueError(f"Data {date!r} is not a date") from None
+    code = TYPES.index(type_t)
+    cents = int(round(amount * 100))
+    cat, text = str(category or "").encode(), str(desc or "").encode()
+    return RECORD.pack(ordinal, code, cents, len(cat), len(text)) + cat + text, ordinal, code, cents
+
+
+class Journal:
+    """One journal file and its index. Holds no open handles: every call opens, reads or writes, and closes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._lock = _lock(path)
+        with self._lock:
+            if not os.path.exists(path):
+                with open(path, "wb") as fh:
+                    fh.write(HEADER.pack(MAGIC, VERSION) + _pack_footer(0, HEADER.size, (0, 0, 0)))
+                open(self.index_path, "wb").close()
+            if self._footer() is None:
+                self._recover()
+            elif (not os.path.exists(self.index_path)
+                  or os.path.getsize(self.index_path) != len(self) * INDEX_ENTRY.itemsize):
+                self._rebuild_index()
+
+    # --- 1. FOOTER (count and running totals) ---
+
+    def _footer(self):
+        """(count, end, totals) if the footer is intact and sits right after the records, else None."""
+        with open(self.path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            size = fh.tell()
+            if size < HEADER.size + FOOTER.size:
+                return None
+            fh.seek(size - FOOTER.size)
+            raw = fh.read(FOOTER.size)
+        magic, count, end, *rest = FOOTER.unpack(raw)
+        totals, crc = rest[:3], rest[3]
+        if magic != FOOTER_MAGIC or crc != zlib.crc32(raw[:-4]) or end != size - FOOTER.size:
+            return None
+        return count, end, totals
+
+    def __len__(self):
+        return self._footer()[0]
+
+    def totals(self):
+        """Sum of Valor per Tipo, straight from the footer."""
+        return {t: cents / 100 for t, cents in zip(TYPES, self._footer()[2])}
+
+    # --- 2. APPEND ---
+
+    def append(self, date, category, desc, value, type_t):
+        self.extend([(date, category, desc, value, type_t)])
+
+    def extend(self, rows):
+        """Appends (Data, Categoria, Descrição, Valor, Tipo) rows with one journal write and one index write."""
+        self._extend_encoded([_encode(*row) for row in rows])
+
+    def _extend_encoded(self, encoded):
+        if not encoded:
+            return
+        with self._lock:
+            count, end, totals = self._footer()
+            totals, chunks, entries = list(totals), [], np.empty(len(encoded), dtype=INDEX_ENTRY)
+            offset = end
+            for i, (record, ordinal, code, cents) in enumerate(encoded):
+                entries[i] = (offset, ordinal, code)
+                totals[code] += cents
+                chunks.append(record)
+                offset += len(record)
+            with open(self.path, "r+b") as fh:
+                fh.seek(end)
+                fh.write(b"".join(chunks) + _pack_footer(count + len(encoded), offset, totals))
+                fh.flush()
+                os.fsync(fh.fileno())
+            with open(self.index_path, "ab") as fh:
+                fh.write(entries.tobytes())
+
+    # --- 3. READS ---
+
+    def _index(self):
+        count = len(self)
+        if count == 0:
+            return np.empty(0, dtype=INDEX_ENTRY)
+        return np.memmap(self.index_path, dtype=INDEX_ENTRY, mode="r", shape=(count,))
+
+    def _read(self, offsets):
+        rows = []
+        with open(self.path, "rb") as fh:
+            for offset in offsets:
+                fh.seek(int(offset))
+                ordinal, code, cents, cat_len, desc_len = RECORD.unpack(fh.read(RECORD.size))
+                text = fh.read(cat_len + desc_len)
+                rows.append((datetime.date.fromordinal(ordinal).isoformat(), text[:cat_len].decode(),
+                             text[cat_len:].decode(), cents / 100, TYPES[code]))
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def tail(self, k):
+        """The last k transactions (oldest first), like df.tail(k) on the old CSV."""
+        index = self._index()
+        return self._read(index["offset"][max(len(index) - k, 0):])
+
+    def records(self, types=None, start=None, end=None):
+        """Transactions of the given types within [start, end] (inclusive dates), in entry order."""
+        index = self._index()
+        mask = np.ones(len(index), dtype=bool)
+        if types is not None:
+            mask &= np.isin(index["type"], [TYPES.index(t) for t in types])
+        if start is not None:
+            mask &= index["date"] >= pd.Timestamp(start).toordinal()
+        if end is not None:
+            mask &= index["date"] <= pd.Timestamp(end).toordinal()
+        return self._read(index["offset"][mask])
+
+    # --- 4. RECOVERY ---
+
+    def _scan(self, data):
+        """Walks the records from the header; stops at the footer or at a torn/garbled record."""
+        pos, entries, totals = HEADER.size, [], [0, 0, 0]
+        while pos + RECORD.size <= len(data):
+            if data[pos:pos + 4] == FOOTER_MAGIC and len(data) - pos == FOOTER.size:
+                break
+            ordinal, code, cents, cat_len, desc_len = RECORD.unpack_from(data, pos)
+            stop = pos + RECORD.size + cat_len + desc_len
+            if code >= len(TYPES) or not 0 < ordinal <= MAX_ORDINAL or stop > len(data):
+                break
+            entries.append((pos, ordinal, code))
+            totals[code] += cents
+            pos = stop
+        return pos, entries, totals
+
+    def _recover(self):
+        with open(self.path, "rb") as fh:
+            data = fh.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{self.path} is not a LifeOS journal")
+        end, entries, totals = self._scan(data)
+        with open(self.path, "r+b") as fh:
+            fh.seek(end)
+            fh.write(_pack_footer(len(entries), end, totals))
+            fh.truncate()
+        self._write_index(entries)
+
+    def _rebuild_index(self):
+        with open(self.path, "rb") as fh:
+            data = fh.read()
+        self._write_index(self._scan(data)[1])
+
+    def _write_index(self, entries):
+        with open(self.index_path, "wb") as fh:
+            fh.write(np.array(entries, dtype=INDEX_ENTRY).tobytes())
+
+
+def _read_legacy(legacy_csv):
+    """Encoded records of the legacy CSV, plus its unreadable rows as (line, reason, *COLUMNS values)."""
+    encoded, rejected = [], []
+    with open(legacy_csv, encoding="utf-8-sig", newline="") as fh:
+        reader = csv.DictReader(fh)
+        missing = [col for col in COLUMNS if col not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"{legacy_csv} has no {', '.join(missing)} column(s)")
+        for row in reader:
+            values = [row[col] or "" for col in COLUMNS]
+            try:
+                encoded.append(_encode(*values))
+            except ValueError as e:
+                # reader.line_num is the file line the row ended on (quoted fields may span lines)
+                rejected.append((reader.line_num, str(e), *values))
+    return encoded, rejected
+
+
+def rejected_rows(path):
+    """Legacy rows the import of the journal at 'path' left out (line, reason, ...), or an empty frame."""
+    try:
+        return pd.read_csv(path + ".rejected.csv", keep_default_na=False)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=["line", "reason"] + COLUMNS)
+
+
+def open_journal(path, legacy_csv=None):
+    """
+    The journal at 'path'; a new journal starts with the rows of the old CSV store, if there is one.
+    The import is built beside the journal and renamed into place once complete, so a crash
+    mid-import leaves no journal behind and the next open imports again. Rows that can't be read
+    are skipped, not fatal: they are listed in path + '.rejected.csv' (see rejected_rows).
+    """
+    if os.path.exists(path) or not (legacy_csv and os.path.exists(legacy_csv)):
+        return Journal(path)
+    work = path + ".import"
+    for leftover in (work, work + ".idx"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    encoded, rejected = _read_legacy(legacy_csv)
+    Journal(work)._extend_encoded(encoded)
+    rejects_path = path + ".rejected.csv"
+    if rejected:
+        pd.DataFrame(rejected, columns=["line", "reason"] + COLUMNS).to_csv(rejects_path, index=False)
+    elif os.path.exists(rejects_path):
+        os.remove(rejects_path)
+    # Index first: a journal without its index is rebuilt on open, never the other way round
+    os.replace(work + ".idx", path + ".idx")
+    os.replace(work, path)
+    return Journal(path)
@@ -0,0 +1,884 @@
+import os
+import threading
+
+import pandas as pd
+
+import db_utils
+from accounts import DIRECT_METHODS, PAID_DEFAULTS, TOTAL_ACCOUNT, paid_sql
+from db_utils import COUNTED_TABLES, bump_table_version, note_changes
+from money import CENTS_EXPR, cents_sql
+from search_index import PREFIX_LENGTHS, RANK, SEARCH_TABLES, TOKENIZER
+
+
+# --- 1. SCHEMA HELPERS ---
+
+def _columns(conn, table_name):
+    # table_xinfo: table_info leaves generated columns out
+    return {row[1] for row in conn.execute(f'PRAGMA table_xinfo("{table_name}")')}
+
+
+def _add_column(conn, table_name, column_def):
+    """ALTER TABLE ... ADD COLUMN, skipped when the column is already there (no try/except guessing)."""
+    column_name = column_def.split()[0].strip('"')
+    if column_name not in _columns(conn, table_name):
+        conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_def}")
+
+
+# --- 2. MIGRATIONS (append only: never edit a step that has shipped) ---
+
+def _m001_baseline(conn):
+    """Core tables, exactly as initialize_system_db() used to provision them."""
+    # 1. CORE FINANCIALS
+    conn.execute('''CREATE TABLE IF NOT EXISTS incomes
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, Date TEXT, Category TEXT, Item TEXT, Price REAL)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS expenses
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, Date TEXT, Category TEXT, Item TEXT, Price REAL,
+                     "Payment Method" TEXT, paid INTEGER DEFAULT 0)''')
+
+    # 2. OPERATIONAL SETTINGS
+    conn.execute("CREATE TABLE IF NOT EXISTS budgets (category TEXT PRIMARY KEY, amount REAL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS categories (name TEXT PRIMARY KEY, type TEXT)")
+    conn.execute('''CREATE TABLE IF NOT EXISTS cards
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, card_name TEXT, closing_day INTEGER, due_day INTEGER,
+                     active INTEGER)''')
+
+    # 3. RECURRING & INVESTMENTS
+    conn.execute('''CREATE TABLE IF NOT EXISTS recurring
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, item TEXT, category TEXT, price REAL,
+                     payment_method TEXT, day_of_month INTEGER, active INTEGER DEFAULT 1)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS investments
+                    (Asset TEXT PRIMARY KEY, Category TEXT, Date TEXT, Quantity REAL, Amount REAL,
+                     Current_Value REAL)''')
+
+    # 4. GROWTH & PERFORMANCE (English & Projects)
+    conn.execute('''CREATE TABLE IF NOT EXISTS vocabulary
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT, sentence TEXT, date TEXT)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS habit_list
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, habit_name TEXT)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS daily_habits
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, habit_name TEXT, date TEXT, completed INTEGER)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS dev_tasks
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, task_name TEXT, status TEXT, priority TEXT,
+                     completed INTEGER)''')
+
+    # 5. AUTOMATION
+    conn.execute("CREATE TABLE IF NOT EXISTS report_logs (id INTEGER PRIMARY KEY, month_year TEXT UNIQUE, sent_at TEXT)")
+
+
+def _m002_self_healing_columns(conn):
+    """The columns the pages (and the old 'Migration & Fixes' scripts) used to patch in on the fly."""
+    _add_column(conn, "incomes", "paid INTEGER DEFAULT 1")
+    _add_column(conn, "recurring", "active INTEGER DEFAULT 1")
+    _add_column(conn, "recurring", "created_at TEXT")
+    _add_column(conn, "cards", "active INTEGER DEFAULT 1")
+    _add_column(conn, "vocabulary", "sentence TEXT")
+    _add_column(conn, "dev_tasks", "priority TEXT DEFAULT 'Medium'")
+
+
+def _m003_ledger_indexes(conn):
+    """
+    Covering indexes for the hot predicates (paid / Date / Payment Method / Category).
+    Price is the trailing column so the SUM(Price) aggregates never touch the table rows.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (Date, paid, Price)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_paid_date ON expenses (paid, Date, Price)")
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expenses_method_paid_date '
+                 'ON expenses ("Payment Method", paid, Date, Price)')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_category_date ON expenses (Category, Date, Price)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incomes_date ON incomes (Date, paid, Price)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incomes_paid_date ON incomes (paid, Date, Price)")
+
+
+def _m004_expenses_is_auto(conn):
+    """Flags rows inserted by check_and_insert_recurring, replacing the Item LIKE '%[AUTO]%' scan."""
+    _add_column(conn, "expenses", "is_auto INTEGER NOT NULL DEFAULT 0")
+    conn.execute("UPDATE expenses SET is_auto = 1 WHERE Item LIKE '%[AUTO]%'")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_auto_date ON expenses (is_auto, Date)")
+
+
+# Ledger table -> (rollup kind, SQL for its payment method)
+ROLLUP_SOURCES = {
+    "expenses": ("expense", '"Payment Method"'),
+    "incomes": ("income", None),
+}
+
+# monthly_rollup's measure: (column, type, ledger value summed into it with '{ref}' as the row prefix).
+# Migration 5 summed REAL Price into 'total'; migration 10 sums integer cents instead.
+ROLLUP_MEASURE_V5 = ("total", "REAL", "{ref}Price")
+ROLLUP_MEASURE = ("cents", "INTEGER", CENTS_EXPR)
+
+
+def _rollup_key(ref, table_name):
+    kind, method_col = ROLLUP_SOURCES[table_name]
+    method = f"COALESCE({ref}.{method_col}, '')" if method_col else "''"
+    return (f"COALESCE(substr({ref}.Date, 1, 7), '')", f"'{kind}'", f"COALESCE({ref}.Category, '')", method,
+            paid_sql(table_name, f"{ref}."))
+
+
+def _rollup_add(ref, table_name, sign, measure):
+    month, kind_sql, category, method, paid = _rollup_key(ref, table_name)
+    column, value = measure[0], measure[2].format(ref=f"{ref}.")
+    return f"""INSERT INTO monthly_rollup (month, kind, category, payment_method, paid, {column}, count)
+               VALUES ({month}, {kind_sql}, {category}, {method}, {paid},
+                       {sign}COALESCE({value}, 0), {sign}1)
+               ON CONFLICT (month, kind, category, payment_method, paid)
+                   DO UPDATE SET {column} = {column} + excluded.{column}, count = count + excluded.count;"""
+
+
+def _rollup_prune(ref, table_name):
+    month, kind_sql, category, method, paid = _rollup_key(ref, table_name)
+    return f"""DELETE FROM monthly_rollup
+               WHERE month = {month} AND kind = {kind_sql} AND category = {category}
+                 AND payment_method = {method} AND paid = {paid} AND count = 0;"""
+
+
+def rollup_backfill_sql(table_name, measure=ROLLUP_MEASURE, where="1"):
+    kind, method_col = ROLLUP_SOURCES[table_name]
+    method = f"COALESCE({method_col}, '')" if method_col else "''"
+    column, value = measure[0], measure[2].format(ref="")
+    return f"""INSERT INTO monthly_rollup (month, kind, category, payment_method, paid, {column}, count)
+               SELECT COALESCE(substr(Date, 1, 7), ''), '{kind}', COALESCE(Category, ''), {method},
+                      {paid_sql(table_name)}, SUM(COALESCE({value}, 0)), COUNT(*)
+               FROM {table_name}
+               WHERE {where}
+               GROUP BY 1, 2, 3, 4, 5"""
+
+
+def _create_rollup_triggers(conn, measure):
+    for table_name, (_, method_col) in ROLLUP_SOURCES.items():
+        watched = ["Date", "Category", "Price", "paid"] + ([method_col] if method_col else [])
+        add_new = _rollup_add("NEW", table_name, "", measure)
+        remove_old = f'{_rollup_add("OLD", table_name, "-", measure)} {_rollup_prune("OLD", table_name)}'
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_rollup_ins AFTER INSERT ON {table_name}
+                         BEGIN {add_new} END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_rollup_del AFTER DELETE ON {table_name}
+                         BEGIN {remove_old} END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_rollup_upd
+                         AFTER UPDATE OF {", ".join(watched)} ON {table_name}
+                         BEGIN {remove_old} {add_new} END""")
+
+
+def _create_monthly_rollup(conn, measure):
+    """monthly_rollup, its maintenance triggers on both ledgers and the initial backfill."""
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS monthly_rollup
+                     (month TEXT NOT NULL, kind TEXT NOT NULL, category TEXT NOT NULL,
+                      payment_method TEXT NOT NULL, paid INTEGER NOT NULL,
+                      {measure[0]} {measure[1]} NOT NULL DEFAULT 0, count INTEGER NOT NULL DEFAULT 0,
+                      PRIMARY KEY (month, kind, category, payment_method, paid))""")
+    _create_rollup_triggers(conn, measure)
+    for table_name in ROLLUP_SOURCES:
+        conn.execute(rollup_backfill_sql(table_name, measure))
+
+
+def _m005_monthly_rollup(conn):
+    """
+    monthly_rollup: one row per (month, kind, category, payment_method, paid), kept exact by triggers
+    on every insert/update/delete, so monthly reports read O(months) rows instead of the whole ledger.
+    """
+    _create_monthly_rollup(conn, ROLLUP_MEASURE_V5)
+
+
+def _m006_expenses_content_index(conn):
+    """Content index used by statement imports to dedupe against rows already in the ledger."""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expenses_content ON expenses (Date, Price, "Payment Method", Item)')
+
+
+def _m007_recurring_projection(conn):
+    """
+    recurring_projection: one materialized row per (recurring id, month), filled forward up to
+    recurring_watermark.through_month. Editing or deleting a subscription drops its rows so they
+    are rebuilt with the new values on the next read.
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS recurring_projection
+                    (recurring_id INTEGER NOT NULL, month TEXT NOT NULL, created_at TEXT, category TEXT,
+                     item TEXT, price REAL, payment_method TEXT,
+                     PRIMARY KEY (recurring_id, month))""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recurring_projection_month ON recurring_projection (month)")
+    conn.execute("""CREATE TABLE IF NOT EXISTS recurring_watermark
+                    (recurring_id INTEGER PRIMARY KEY, through_month TEXT NOT NULL)""")
+    for event in ("UPDATE", "DELETE"):
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_recurring_projection_{event.lower()}
+                         AFTER {event} ON recurring
+                         BEGIN
+                             DELETE FROM recurring_projection WHERE recurring_id = OLD.id;
+                             DELETE FROM recurring_watermark WHERE recurring_id = OLD.id;
+                         END""")
+
+
+def _m008_email_outbox(conn):
+    """
+    email_outbox: reports waiting for (or done with) the background SMTP worker in email_outbox.py.
+    report_month is set for the monthly report only; the unique index makes enqueueing it idempotent.
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS email_outbox
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, recipient TEXT NOT NULL, subject TEXT, body TEXT,
+                     status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,
+                     next_attempt_at TEXT NOT NULL, last_error TEXT, report_month TEXT,
+                     created_at TEXT NOT NULL, sent_at TEXT)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at)")
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS idx_email_outbox_report_month
+                    ON email_outbox (report_month) WHERE report_month IS NOT NULL""")
+
+
+# Tables whose writes are counted in table_changes (the ledgers snapshots can stand in for)
+CHANGE_TRACKED = ("expenses", "incomes")
+
+
+def _m009_table_changes(conn):
+    """
+    table_changes: a persistent write counter per ledger, bumped by triggers on every row change.
+    snapshots.py records it at export time, so checking a snapshot against the live ledger is
+    one primary-key lookup instead of a comparison of the data.
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS table_changes
+                    (table_name TEXT PRIMARY KEY, changes INTEGER NOT NULL DEFAULT 0)""")
+    for table_name in CHANGE_TRACKED:
+        _count_changes(conn, table_name)
+
+
+def _changes_bump(table_name, count="1"):
+    return f"UPDATE table_changes SET changes = changes + {count} WHERE table_name = '{table_name}';"
+
+
+def _count_changes(conn, table_name):
+    """table_changes row for 'table_name' and the triggers that bump it on every row change."""
+    conn.execute("INSERT OR IGNORE INTO table_changes (table_name, changes) VALUES (?, 0)", (table_name,))
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_changes_{event.lower()}
+                         AFTER {event} ON {table_name}
+                         BEGIN
+                             {_changes_bump(table_name)}
+                         END""")
+
+
+def _m010_integer_cents(conn):
+    """
+    Integer cents (money.py): a generated 'cents' column on expenses/incomes, stored Prices
+    normalized to whole cents, and monthly_rollup rebuilt to sum integer cents instead of REAL.
+    Covering (…, Price) indexes stay as they are: aggregates sum cents_sql() straight from them.
+    """
+    for table_name in ROLLUP_SOURCES:
+        for event in ("ins", "del", "upd"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_rollup_{event}")
+    conn.execute("DROP TABLE IF EXISTS monthly_rollup")
+    for table_name in ROLLUP_SOURCES:
+        _add_column(conn, table_name, f"cents INTEGER GENERATED ALWAYS AS ({cents_sql()}) VIRTUAL")
+        # e.g. 16.666666666666668 (old CSV imports) -> 16.67, so Price and cents always agree
+        conn.execute(f"UPDATE {table_name} SET Price = cents / 100.0 WHERE Price <> cents / 100.0")
+    _create_monthly_rollup(conn, ROLLUP_MEASURE)
+
+
+def _m011_ledger_page_indexes(conn):
+    """
+    (Date, id) indexes for the keyset-paginated ledger views (data_layer.fetch_window): a page is
+    an index range read in ORDER BY Date DESC, id DESC order, plus the unpaid-only expense view.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date_id ON expenses (Date, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_paid_date_id ON expenses (paid, Date, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incomes_date_id ON incomes (Date, id)")
+
+
+def _search_add(fts):
+    return f"INSERT INTO {fts} (rowid, Item, Category) VALUES (NEW.id, NEW.Item, NEW.Category)"
+
+
+def _m012_search_index(conn):
+    """
+    FTS5 search index (search_index.py) over Item/Category of each ledger: external content
+    (tokens only, rows stay in the ledger), synced by triggers and backfilled with 'rebuild'.
+    """
+    for table_name, fts in SEARCH_TABLES.items():
+        conn.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5
+                         (Item, Category, content='{table_name}', content_rowid='id',
+                          tokenize='{TOKENIZER}', prefix='{PREFIX_LENGTHS}')""")
+        conn.execute(f"INSERT INTO {fts} ({fts}, rank) VALUES ('rank', '{RANK}')")
+        add = _search_add(fts)
+        remove = (f"INSERT INTO {fts} ({fts}, rowid, Item, Category) "
+                  f"VALUES ('delete', OLD.id, OLD.Item, OLD.Category)")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_fts_ins AFTER INSERT ON {table_name}
+                         BEGIN {add}; END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_fts_del AFTER DELETE ON {table_name}
+                         BEGIN {remove}; END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_fts_upd
+                         AFTER UPDATE OF Item, Category ON {table_name}
+                         BEGIN {remove}; {add}; END""")
+        conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+# card_statements (migration 13): one billing cycle per (month, card). A card purchase is stored on
+# its bill's due date (installments.py), so its statement month is substr(Date, 1, 7); the cycle
+# closes on the card's closing day, one month earlier when the due day comes before it.
+
+def _statement_member(ref):
+    """SQL condition: the expenses row {ref} (NEW/OLD) belongs to a card statement."""
+    direct = ", ".join(f"'{m}'" for m in DIRECT_METHODS)
+    return f"""{ref}.Date IS NOT NULL AND COALESCE({ref}."Payment Method", '') NOT IN ('', {direct})"""
+
+
+def _day_of_month(month_sql, day_sql):
+    """'YYYY-MM-DD' of day {day_sql} in month {month_sql}, clipped to the month's last day."""
+    last = f"CAST(strftime('%d', {month_sql} || '-01', '+1 month', '-1 day') AS INTEGER)"
+    return f"date({month_sql} || '-01', '+' || (MIN({day_sql}, {last}) - 1) || ' days')"
+
+
+def _statement_dates(month_sql, card_sql):
+    """(closing date, due date) SQL of a card's cycle; NULL for a method without card rules."""
+    rule = "(SELECT {col} FROM cards WHERE card_name = " + card_sql + " ORDER BY id LIMIT 1)"
+    closing, due = rule.format(col="closing_day"), rule.format(col="due_day")
+    closing_month = f"CASE WHEN {due} < {closing} THEN strftime('%Y-%m', {month_sql} || '-01', '-1 month') ELSE {month_sql} END"
+    return _day_of_month(closing_month, closing), _day_of_month(month_sql, due)
+
+
+# Derived from the counters and today's date: paid once nothing is open, closed after the closing date
+STATEMENT_STATE = """CASE WHEN {open_count} = 0 THEN 'paid'
+                          WHEN closing_date <= date('now', 'localtime') THEN 'closed'
+                          ELSE 'open' END"""
+STATEMENT_STATE_SQL = STATEMENT_STATE.format(open_count="open_count")
+
+
+def _statement_add(ref, sign):
+    """
+    Trigger body adding (sign '') or removing (sign '-') one expenses row from its statement.
+    The cycle dates are looked up only when the statement row is created; afterwards it's one
+    primary-key UPDATE of the counters (and the state, computed from the updated open count).
+    """
+    month, card = f"substr({ref}.Date, 1, 7)", f'{ref}."Payment Method"'
+    key = f"month = {month} AND card = {card}"
+    member = _statement_member(ref)
+    cents = f"COALESCE({cents_sql(ref + '.')}, 0)"
+    unpaid = f"({paid_sql('expenses', ref + '.')} = 0)"
+    body = ""
+    if not sign:
+        closing, due = _statement_dates(month, card)
+        body += f"""INSERT INTO card_statements (month, card, closing_date, due_date)
+                    SELECT {month}, {card}, {closing}, {due}
+                    WHERE {member} AND NOT EXISTS (SELECT 1 FROM card_statements WHERE {key});"""
+    body += f"""UPDATE card_statements
+                SET total_cents = total_cents {sign or '+'} {cents}, open_cents = open_cents {sign or '+'} {cents} * {unpaid},
+                    count = count {sign or '+'} 1, open_count = open_count {sign or '+'} {unpaid},
+                    state = {STATEMENT_STATE.format(open_count=f"(open_count {sign or '+'} {unpaid})")}
+                WHERE {key} AND {member};"""
+    if sign:
+        body += f"DELETE FROM card_statements WHERE {key} AND count = 0;"
+    return body
+
+
+def _create_statement_triggers(conn):
+    add_new, remove_old = _statement_add("NEW", ""), _statement_add("OLD", "-")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_expenses_statement_ins AFTER INSERT ON expenses
+                     BEGIN {add_new} END""")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_expenses_statement_del AFTER DELETE ON expenses
+                     BEGIN {remove_old} END""")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_expenses_statement_upd
+                     AFTER UPDATE OF Date, Price, paid, "Payment Method" ON expenses
+                     BEGIN {remove_old} {add_new} END""")
+
+
+def _statements_insert_sql(where="1"):
+    return f"""INSERT INTO card_statements (month, card, total_cents, open_cents, count, open_count)
+               SELECT substr(Date, 1, 7), "Payment Method", SUM(COALESCE({cents_sql()}, 0)),
+                      SUM(CASE WHEN {paid_sql("expenses")} = 0 THEN COALESCE({cents_sql()}, 0) ELSE 0 END),
+                      COUNT(*), SUM({paid_sql("expenses")} = 0)
+               FROM expenses AS e
+               WHERE {_statement_member("e")} AND {where}
+               GROUP BY 1, 2"""
+
+
+def statements_backfill_sql():
+    closing, due = _statement_dates("month", "card")
+    return [_statements_insert_sql(),
+            f"UPDATE card_statements SET closing_date = {closing}, due_date = {due}",
+            f"UPDATE card_statements SET state = {STATEMENT_STATE_SQL}"]
+
+
+def _m013_card_statements(conn):
+    """
+    card_statements (statements.py): one billing-cycle row per card per month with its closing/due
+    dates, running total and open (unpaid) amount in cents, member counts and open/closed/paid state.
+    Triggers on expenses keep it exact; a new or edited card re-dates that card's cycles.
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS card_statements
+                    (month TEXT NOT NULL, card TEXT NOT NULL, closing_date TEXT, due_date TEXT,
+                     total_cents INTEGER NOT NULL DEFAULT 0, open_cents INTEGER NOT NULL DEFAULT 0,
+                     count INTEGER NOT NULL DEFAULT 0, open_count INTEGER NOT NULL DEFAULT 0,
+                     state TEXT NOT NULL DEFAULT 'open' CHECK (state IN ('open', 'closed', 'paid')),
+                     PRIMARY KEY (month, card))""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_card_statements_state ON card_statements (state, closing_date)")
+    _create_statement_triggers(conn)
+    closing, due = _statement_dates("month", "card")
+    redate = (f"UPDATE card_statements SET closing_date = {closing}, due_date = {due} "
+              f"WHERE card IN (NEW.card_name, {{old}}); "
+              f"UPDATE card_statements SET state = {STATEMENT_STATE_SQL} WHERE card IN (NEW.card_name, {{old}});")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_cards_statement_ins AFTER INSERT ON cards
+                     BEGIN {redate.format(old="NEW.card_name")} END""")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_cards_statement_upd
+                     AFTER UPDATE OF card_name, closing_day, due_day ON cards
+                     BEGIN {redate.format(old="OLD.card_name")} END""")
+    for sql in statements_backfill_sql():
+        conn.execute(sql)
+
+
+def _m014_settlements(conn):
+    """
+    settlements (settlements.py): one row per bulk settle, and a settlement_id on the ledger rows
+    it paid, so a batch can be undone with one indexed UPDATE. Marking a row unpaid by hand
+    drops its settlement_id (an undo never touches rows that were re-settled some other way).
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS settlements
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT NOT NULL, description TEXT,
+                     created_at TEXT NOT NULL, rows INTEGER NOT NULL DEFAULT 0, cents INTEGER NOT NULL DEFAULT 0,
+                     undone_at TEXT)""")
+    for table_name in ROLLUP_SOURCES:
+        _add_column(conn, table_name, "settlement_id INTEGER")
+        conn.execute(f"""CREATE INDEX IF NOT EXISTS idx_{table_name}_settlement ON {table_name} (settlement_id)
+                         WHERE settlement_id IS NOT NULL""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_settlement_unpaid
+                         AFTER UPDATE OF paid ON {table_name}
+                         WHEN NEW.paid = 0 AND NEW.settlement_id IS NOT NULL
+                         BEGIN UPDATE {table_name} SET settlement_id = NULL WHERE id = NEW.id; END""")
+
+
+# cash_ledger (migration 15): the running bank balance as a two-level prefix sum, in integer cents.
+# Paid incomes flow in and paid expenses out, per account: TOTAL_ACCOUNT holds every row, the other
+# accounts split expenses per payment method ('' for incomes).
+#   cash_ledger (account, day)   net_cents of the day and mtd_cents, the month's cumulative flow up to it
+#   cash_months (account, month) net_cents of the month and opening_cents, the balance before it
+# Balance at the end of a day = opening_cents of its month + its mtd_cents: two primary-key reads.
+# A paid row shifts only the later days of its month and the later months (never every later day).
+
+BALANCE_COLUMNS = {
+    "cash_ledger": "account, day, net_cents, count, mtd_cents",
+    "cash_months": "account, month, net_cents, count, opening_cents",
+}
+
+
+def _balance_flow(ref, table_name):
+    """SQL of a paid ledger row's signed cash flow in cents (income +, expense -)."""
+    return f"{'-' if table_name == 'expenses' else ''}COALESCE({cents_sql(ref + '.')}, 0)"
+
+
+def _balance_accounts(ref, table_name):
+    method = f"""COALESCE({ref}."Payment Method", '')""" if table_name == "expenses" else "''"
+    return f"'{TOTAL_ACCOUNT}'", method
+
+
+def _balance_add(ref, table_name, sign):
+    """Trigger body adding (sign '') or removing (sign '-') one paid ledger row from the running balance."""
+    day = f"COALESCE(substr({ref}.Date, 1, 10), '')"
+    month = f"substr({day}, 1, 7)"
+    flow, step = f"{sign or '+'} {_balance_flow(ref, table_name)}", f"{sign or '+'} 1"
+    body = ""
+    for account in _balance_accounts(ref, table_name):
+        if not sign:
+            # New rows start from the running totals just before them
+            body += f"""INSERT OR IGNORE INTO cash_ledger (account, day, mtd_cents)
+                        VALUES ({account}, {day},
+                                COALESCE((SELECT mtd_cents FROM cash_ledger
+                                          WHERE account = {account} AND day >= {month} AND day < {day}
+                                          ORDER BY day DESC LIMIT 1), 0));
+                        INSERT OR IGNORE INTO cash_months (account, month, opening_cents)
+                        VALUES ({account}, {month},
+                                COALESCE((SELECT opening_cents + net_cents FROM cash_months
+                                          WHERE account = {account} AND month < {month}
+                                          ORDER BY month DESC LIMIT 1), 0));"""
+        # '-99' bounds the month's days ('YYYY-MM-DD' < 'YYYY-MM-99'); NULL Dates (day '') get an empty range
+        body += f"""UPDATE cash_ledger SET net_cents = net_cents {flow}, count = count {step},
+                                           mtd_cents = mtd_cents {flow}
+                    WHERE account = {account} AND day = {day};
+                    UPDATE cash_ledger SET mtd_cents = mtd_cents {flow}
+                    WHERE account = {account} AND day > {day} AND day < {month} || '-99';
+                    UPDATE cash_months SET net_cents = net_cents {flow}, count = count {step}
+                    WHERE account = {account} AND month = {month};
+                    UPDATE cash_months SET opening_cents = opening_cents {flow}
+                    WHERE account = {account} AND month > {month};"""
+        if sign:
+            body += f"""DELETE FROM cash_ledger WHERE account = {account} AND day = {day} AND count = 0;
+                        DELETE FROM cash_months WHERE account = {account} AND month = {month} AND count = 0;"""
+    return body
+
+
+def _paid_flows():
+    return " UNION ALL ".join(
+        f"""SELECT {account} AS account, COALESCE(substr(Date, 1, 10), '') AS day,
+                   {_balance_flow(table_name, table_name)} AS flow
+            FROM {table_name} WHERE {paid_sql(table_name)} = 1"""
+        for table_name in ROLLUP_SOURCES for account in _balance_accounts(table_name, table_name))
+
+
+def cash_ledger_sql():
+    """{table: SELECT of its rows recomputed from the ledgers} for cash_ledger/cash_months (backfill, drift)."""
+    flows = _paid_flows()
+    return {
+        "cash_ledger": f"""SELECT account, day, SUM(flow) AS net_cents, COUNT(*) AS count,
+                                  SUM(SUM(flow)) OVER (PARTITION BY account, substr(day, 1, 7) ORDER BY day)
+                                      AS mtd_cents
+                           FROM ({flows})
+                           GROUP BY account, day""",
+        "cash_months": f"""SELECT account, substr(day, 1, 7) AS month, SUM(flow) AS net_cents, COUNT(*) AS count,
+                                  SUM(SUM(flow)) OVER (PARTITION BY account ORDER BY substr(day, 1, 7))
+                                      - SUM(flow) AS opening_cents
+                           FROM ({flows})
+                           GROUP BY account, month""",
+    }
+
+
+def _backfill_cash_ledger(conn):
+    for table_name, select in cash_ledger_sql().items():
+        conn.execute(f"INSERT INTO {table_name} ({BALANCE_COLUMNS[table_name]}) {select}")
+
+
+def _create_balance_triggers(conn):
+    for table_name, (_, method_col) in ROLLUP_SOURCES.items():
+        watched = ["Date", "Price", "paid"] + ([method_col] if method_col else [])
+        add_new, remove_old = _balance_add("NEW", table_name, ""), _balance_add("OLD", table_name, "-")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_balance_ins AFTER INSERT ON {table_name}
+                         WHEN {paid_sql(table_name, "NEW.")} = 1 BEGIN {add_new} END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_balance_del AFTER DELETE ON {table_name}
+                         WHEN {paid_sql(table_name, "OLD.")} = 1 BEGIN {remove_old} END""")
+        # Removal and re-insertion commute (pure additions), so two guarded triggers are enough
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_balance_upd_old
+                         AFTER UPDATE OF {", ".join(watched)} ON {table_name}
+                         WHEN {paid_sql(table_name, "OLD.")} = 1 BEGIN {remove_old} END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table_name}_balance_upd_new
+                         AFTER UPDATE OF {", ".join(watched)} ON {table_name}
+                         WHEN {paid_sql(table_name, "NEW.")} = 1 BEGIN {add_new} END""")
+
+
+def _m015_cash_ledger(conn):
+    """
+    cash_ledger + cash_months (aggregations.balance_on / balance_curve): the running cash balance,
+    in total and per payment method, kept exact by triggers on paid/Price/Date changes, so the
+    current cash and any balance curve are index reads instead of all-time sums.
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS cash_ledger
+                    (account TEXT NOT NULL, day TEXT NOT NULL, net_cents INTEGER NOT NULL DEFAULT 0,
+                     count INTEGER NOT NULL DEFAULT 0, mtd_cents INTEGER NOT NULL DEFAULT 0,
+                     PRIMARY KEY (account, day)) WITHOUT ROWID""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS cash_months
+                    (account TEXT NOT NULL, month TEXT NOT NULL, net_cents INTEGER NOT NULL DEFAULT 0,
+                     count INTEGER NOT NULL DEFAULT 0, opening_cents INTEGER NOT NULL DEFAULT 0,
+                     PRIMARY KEY (account, month)) WITHOUT ROWID""")
+    _create_balance_triggers(conn)
+    _backfill_cash_ledger(conn)
+
+
+
+# Every trigger that reads a row's paid flag, by ledger (migration 16 recreates them with paid_sql)
+PAID_TRIGGERS = {
+    "expenses": ["rollup_ins", "rollup_del", "rollup_upd", "statement_ins", "statement_del", "statement_upd",
+                 "balance_ins", "balance_del", "balance_upd_old", "balance_upd_new"],
+    "incomes": ["rollup_ins", "rollup_del", "rollup_upd", "balance_ins", "balance_del", "balance_upd_old",
+                "balance_upd_new"],
+}
+
+
+def _m016_paid_defaults(conn):
+    """
+    One meaning for a NULL paid flag (accounts.PAID_DEFAULTS): the derived-table triggers (which read
+    NULL incomes as unpaid while the typed frames read them as received) are recreated with paid_sql
+    and their tables rebuilt; stored NULLs are filled in on the way. A NULL written later is read
+    through the same default everywhere, so it is left as written (rewriting it from a trigger would
+    run the derived-table triggers against a row they haven't counted yet).
+    """
+    for table_name, events in PAID_TRIGGERS.items():
+        for event in events:
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_{event}")
+    for table_name, default in PAID_DEFAULTS.items():
+        conn.execute(f"UPDATE {table_name} SET paid = {default} WHERE paid IS NULL")
+    _create_rollup_triggers(conn, ROLLUP_MEASURE)
+    _create_statement_triggers(conn)
+    _create_balance_triggers(conn)
+    for table_name in ("monthly_rollup", "card_statements", "cash_ledger", "cash_months"):
+        conn.execute(f"DELETE FROM {table_name}")
+    for table_name in ROLLUP_SOURCES:
+        conn.execute(rollup_backfill_sql(table_name))
+    for sql in statements_backfill_sql():
+        conn.execute(sql)
+    _backfill_cash_ledger(conn)
+
+
+def _m017_count_cached_tables(conn):
+    """
+    table_changes counters for every table the app caches (db_utils.COUNTED_TABLES), not only the
+    ledgers, so a write from another process (CLI import, fix script) moves the cache versions too.
+    """
+    for table_name in COUNTED_TABLES:
+        _count_changes(conn, table_name)
+
+
+# bulk_appends (migration 18): a ledger listed there is being appended to in bulk by the current
+# transaction (batch_writer.bulk_append), so its per-row AFTER INSERT work stands down and the
+# writer brings the derived tables up to date with one grouped statement each (bulk_append_sql)
+# before it removes the row again. Never committed non-empty: other connections never see it.
+BULK_GUARD = "NOT EXISTS (SELECT 1 FROM bulk_appends WHERE table_name = '{table_name}')"
+
+
+def _deferred_inserts(table_name):
+    """{trigger suffix: body} of the AFTER INSERT triggers a bulk append defers."""
+    triggers = {
+        "changes_insert": _changes_bump(table_name),
+        "fts_ins": _search_add(SEARCH_TABLES[table_name]) + ";",
+        "rollup_ins": _rollup_add("NEW", table_name, "", ROLLUP_MEASURE),
+    }
+    if table_name == "expenses":
+        triggers["statement_ins"] = _statement_add("NEW", "")
+    return triggers
+
+
+def bulk_append_sql(table_name):
+    """
+    Statements (named parameter :last_id) that account for every row appended after id :last_id:
+    the change counter, search index, monthly_rollup and (expenses) card_statements, the same
+    results the deferred triggers give row by row.
+    """
+    new_rows = "id > :last_id"
+    new_keys = f"""(month, card) IN (SELECT substr(Date, 1, 7), "Payment Method" FROM expenses WHERE {new_rows})"""
+    column = ROLLUP_MEASURE[0]
+    sql = [_changes_bump(table_name, f"(SELECT COUNT(*) FROM {table_name} WHERE {new_rows})"),
+           f"""INSERT INTO {SEARCH_TABLES[table_name]} (rowid, Item, Category)
+               SELECT id, Item, Category FROM {table_name} WHERE {new_rows}""",
+           f"""{rollup_backfill_sql(table_name, where=new_rows)}
+               ON CONFLICT (month, kind, category, payment_method, paid)
+                   DO UPDATE SET {column} = {column} + excluded.{column}, count = count + excluded.count"""]
+    if table_name == "expenses":
+        closing, due = _statement_dates("month", "card")
+        sql += [f"""{_statements_insert_sql(where=new_rows)}
+                    ON CONFLICT (month, card)
+                        DO UPDATE SET total_cents = total_cents + excluded.total_cents,
+                                      open_cents = open_cents + excluded.open_cents,
+                                      count = count + excluded.count, open_count = open_count + excluded.open_count""",
+                f"""UPDATE card_statements SET closing_date = {closing}, due_date = {due}
+                    WHERE closing_date IS NULL AND due_date IS NULL AND {new_keys}""",
+                f"UPDATE card_statements SET state = {STATEMENT_STATE_SQL} WHERE {new_keys}"]
+    return sql
+
+
+def _m018_bulk_appends(conn):
+    """
+    bulk_appends: lets a batch of ledger inserts (installment batches, statement imports) skip the
+    per-row rollup/statement/search/counter triggers and refresh those tables set-based instead.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS bulk_appends (table_name TEXT PRIMARY KEY)")
+    for table_name in ROLLUP_SOURCES:
+        for suffix, body in _deferred_inserts(table_name).items():
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_{suffix}")
+            conn.execute(f"""CREATE TRIGGER trg_{table_name}_{suffix} AFTER INSERT ON {table_name}
+                             WHEN {BULK_GUARD.format(table_name=table_name)}
+                             BEGIN {body} END""")
+
+
+def _m019_null_safe_page_indexes(conn):
+    """
+    Ledger pages sort on COALESCE(Date, '') (data_layer.DATE_KEY) so a row whose Date was cleared
+    stays reachable: migration 11's (Date, id) indexes become the same indexes on that expression.
+    """
+    for name in ("idx_expenses_date_id", "idx_expenses_paid_date_id", "idx_incomes_date_id"):
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_page ON expenses (COALESCE(Date, ''), id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_paid_page ON expenses (paid, COALESCE(Date, ''), id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incomes_page ON incomes (COALESCE(Date, ''), id)")
+
+
+def _m020_settlement_unpaid_default(conn):
+    """Unpaying a settled row by hand reads paid through its default too (a NULL expense is unpaid)."""
+    for table_name in ROLLUP_SOURCES:
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_settlement_unpaid")
+        conn.execute(f"""CREATE TRIGGER trg_{table_name}_settlement_unpaid
+                         AFTER UPDATE OF paid ON {table_name}
+                         WHEN {paid_sql(table_name, 'NEW.')} = 0 AND NEW.settlement_id IS NOT NULL
+                         BEGIN UPDATE {table_name} SET settlement_id = NULL WHERE id = NEW.id; END""")
+
+
+def _m021_unpaid_indexes(conn):
+    """
+    Pending-expense reads (ledger pages, the month's unpaid rows) filter on paid_sql('expenses'):
+    the paid-leading indexes of migrations 3 and 19 become the same indexes on that expression.
+    """
+    conn.execute("DROP INDEX IF EXISTS idx_expenses_paid_date")
+    conn.execute("DROP INDEX IF EXISTS idx_expenses_paid_page")
+    conn.execute(f"""CREATE INDEX IF NOT EXISTS idx_expenses_unpaid_date
+                     ON expenses ({paid_sql("expenses")}, Date, Price)""")
+    conn.execute(f"""CREATE INDEX IF NOT EXISTS idx_expenses_unpaid_page
+                     ON expenses ({paid_sql("expenses")}, COALESCE(Date, ''), id)""")
+
+
+def _m022_pending_incomes_index(conn):
+    """The receivables radar sums (and lists) incomes read through paid_sql('incomes'): migration 3's paid index, on that expression."""
+    conn.execute("DROP INDEX IF EXISTS idx_incomes_paid_date")
+    conn.execute(f"""CREATE INDEX IF NOT EXISTS idx_incomes_pending_date
+                     ON incomes ({paid_sql("incomes")}, Date, Price)""")
+
+
+def _m023_outbox_claimed_at(conn):
+    """email_outbox.claimed_at: when a worker took the row, so only abandoned 'sending' rows are reclaimed."""
+    _add_column(conn, "email_outbox", "claimed_at TEXT")
+
+
+def rebuild_monthly_rollup():
+    """Consistency tool: recomputes monthly_rollup from the ledgers in one transaction."""
+    with db_utils.get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM monthly_rollup")
+        for table_name in ROLLUP_SOURCES:
+            conn.execute(rollup_backfill_sql(table_name))
+        note_changes(conn, "monthly_rollup")
+    bump_table_version("monthly_rollup")
+
+
+def rebuild_search_index():
+    """Consistency tool: re-tokenizes every ledger row into its FTS index."""
+    with db_utils.get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for fts in SEARCH_TABLES.values():
+            conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def rebuild_card_statements():
+    """Consistency tool: recomputes card_statements from the expenses ledger in one transaction."""
+    with db_utils.get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM card_statements")
+        for sql in statements_backfill_sql():
+            conn.execute(sql)
+        note_changes(conn, "card_statements")
+    bump_table_version("card_statements")
+
+
+def rebuild_cash_ledger():
+    """Consistency tool: recomputes cash_ledger and cash_months (the running balance) in one transaction."""
+    with db_utils.get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM cash_ledger")
+        conn.execute("DELETE FROM cash_months")
+        _backfill_cash_ledger(conn)
+        note_changes(conn, "cash_ledger", "cash_months")
+    bump_table_version("cash_ledger", "cash_months")
+
+
+def cash_ledger_drift():
+    """Consistency check: {table: rows that differ from a fresh recomputation}, all empty when exact."""
+    drift = {}
+    for table_name, select in cash_ledger_sql().items():
+        stored = f"SELECT {BALANCE_COLUMNS[table_name]} FROM {table_name}"
+        drift[table_name] = db_utils.run_query(f"""SELECT * FROM ({stored} EXCEPT {select})
+                                                   UNION ALL
+                                                   SELECT * FROM ({select} EXCEPT {stored})""")
+    return drift
+
+
+MIGRATIONS = [
+    (1, "baseline schema", _m001_baseline),
+    (2, "self-healing columns", _m002_self_healing_columns),
+    (3, "ledger covering indexes", _m003_ledger_indexes),
+    (4, "expenses.is_auto flag", _m004_expenses_is_auto),
+    (5, "monthly_rollup + maintenance triggers", _m005_monthly_rollup),
+    (6, "expenses content index", _m006_expenses_content_index),
+    (7, "recurring_projection + watermark", _m007_recurring_projection),
+    (8, "email_outbox", _m008_email_outbox),
+    (9, "table_changes write counters", _m009_table_changes),
+    (10, "integer cents + cents rollup", _m010_integer_cents),
+    (11, "ledger keyset page indexes", _m011_ledger_page_indexes),
+    (12, "FTS5 search index over Item/Category", _m012_search_index),
+    (13, "card_statements billing cycles + triggers", _m013_card_statements),
+    (14, "settlement batches + ledger settlement_id", _m014_settlements),
+    (15, "cash_ledger running balance + triggers", _m015_cash_ledger),
+    (16, "one default for NULL paid flags", _m016_paid_defaults),
+    (17, "table_changes counters for every cached table", _m017_count_cached_tables),
+    (18, "bulk_appends: set-based refresh for batch inserts", _m018_bulk_appends),
+    (19, "NULL-safe ledger page indexes", _m019_null_safe_page_indexes),
+    (20, "settlement_unpaid reads NULL paid flags as the default", _m020_settlement_unpaid_default),
+    (21, "unpaid-expense indexes on the paid default", _m021_unpaid_indexes),
+    (22, "pending-income index on the paid default", _m022_pending_incomes_index),
+    (23, "email_outbox.claimed_at", _m023_outbox_claimed_at),
+]
+
+
+# --- 3. RUNNER ---
+
+def schema_version(conn):
+    conn.execute("""CREATE TABLE IF NOT EXISTS schema_version
+                    (version INTEGER PRIMARY KEY, description TEXT, applied_at TEXT)""")
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Applies every pending migration, each in its own transaction. Returns the versions applied."""
+    applied = []
+    current = schema_version(conn)
+    conn.commit()
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            step(conn)
+            conn.execute("INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                         (version, description, pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+_MIGRATED = set()
+_MIGRATE_LOCK = threading.Lock()
+
+
+def initialize_system_db(db_name=None):
+    """
+    SECURITY & DATA INTEGRITY:
+    Brings the database up to the latest schema version.
+    Runs the migrations once per DB file per process; later reruns return immediately.
+    """
+    path = os.path.abspath(db_name or db_utils.DB_NAME)
+    if path in _MIGRATED:
+        return []
+    with _MIGRATE_LOCK:
+        if path in _MIGRATED:
+            return []
+        pool = db_utils.get_pool(path)
+        conn = pool.acquire()
+        try:
+            applied = migrate(conn)
+        finally:
+            pool.release(conn)
+        _MIGRATED.add(path)
+    if applied:
+        bump_table_version()
+    return applied
+
+
+# --- 4. COMMAND LINE (consistency tools) ---
+# python -m migrations              apply pending migrations to finance.db
+# python -m migrations --check      report cash_ledger/cash_months drift (exit 1 when there is any)
+# python -m migrations --rebuild    recompute every derived table from the ledgers, then check again
+
+def _report_drift(drift):
+    for table_name, rows in drift.items():
+        print(f"   {table_name:<14} {'ok' if rows.empty else f'{len(rows)} rows differ'}")
+    return any(not rows.empty for rows in drift.values())
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Schema migrations and derived-table consistency tools.")
+    parser.add_argument("--db", default=db_utils.DB_NAME, help="database file (default: %(default)s)")
+    parser.add_argument("--check", action="store_true", help="compare the running balance with the ledgers")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recompute monthly_rollup, card_statements, cash_ledger and the search index")
+    args = parser.parse_args()
+
+    db_utils.DB_NAME = args.db
+    applied = initialize_system_db()
+    print(f"✅ Schema version {max(v for v, _, _ in MIGRATIONS)} (applied now: {applied or 'none'})")
+    if args.rebuild:
+        for rebuild in (rebuild_monthly_rollup, rebuild_card_statements, rebuild_cash_ledger, rebuild_search_index):
+            rebuild()
+            print(f"🔧 {rebuild.__name__}")
+    if args.check or args.rebuild:
+        print("🔍 Drift against the ledgers:")
+        sys.exit(1 if _report_drift(cash_ledger_drift()) else 0)
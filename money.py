@@ -0,0 +1,51 @@
+"""
+Money as integer cents.
+
+The ledgers keep Price (REAL, reais) as the value the user typed; cents is the exact integer
+twin every total is computed on: a generated column of expenses/incomes (migration 10),
+monthly_rollup.cents, and the int64 'cents' column of the typed frames. Floats only appear
+again at the display boundary (from_cents).
+
+Rounding is half away from zero, like SQLite's ROUND, so Python and SQL agree on every value.
+"""
+import numpy as np
+
+# The generated column's definition. Sums written as cents_sql() instead of SUM(cents) keep
+# using the covering (…, Price) indexes: SQLite can't read a virtual column from an index.
+CENTS_EXPR = "CAST(ROUND({ref}Price * 100) AS INTEGER)"
+
+
+def cents_sql(ref=""):
+    """SQL for a row's cents, e.g. cents_sql('l.') -> CAST(ROUND(l.Price * 100) AS INTEGER)."""
+    return CENTS_EXPR.format(ref=ref)
+
+
+def to_cents(value):
+    """Reais -> integer cents (scalar -> int, array/Series -> int64 array). NaN counts as 0."""
+    arr = np.nan_to_num(np.asarray(value, dtype=np.float64))
+    # Same arithmetic as SQLite's ROUND(x): truncate x +/- 0.5
+    cents = np.trunc(arr * 100 + np.copysign(0.5, arr)).astype(np.int64)
+    return int(cents) if cents.ndim == 0 else cents
+
+
+def from_cents(cents):
+    """Integer cents -> reais (float), for display and for the Price columns."""
+    if np.ndim(cents) == 0:
+        return int(cents) / 100
+    return np.asarray(cents, dtype=np.int64) / 100
+
+
+def installment_cents(total_cents, count, number):
+    """
+    Cents of installment 'number' (1-based) of a purchase split in 'count' parts (vectorized).
+    Every installment but the last gets the rounded even share; the last one absorbs the
+    remainder, so the parts always add back to the purchase exactly: R$ 50 / 3 -> 16.67,
+    16.67, 16.66 (never 16.67 x 3 = 50.01).
+    """
+    total = np.asarray(total_cents, dtype=np.int64)
+    count = np.maximum(np.asarray(count, dtype=np.int64), 1)
+    # total / count rounded half away from zero, in integer arithmetic
+    share = np.sign(total) * ((np.abs(total) * 2 + count) // (2 * count))
+    # Tiny totals split many ways can round the shares above the total: fall back to the floor
+    share = np.where(np.abs(share) * (count - 1) > np.abs(total), np.sign(total) * (np.abs(total) // count), share)
+    return np.where(np.asarray(number) >= count, total - share * (count - 1), share)
@@ -0,0 +1,184 @@
+"""
+Statement-level profiling for the SQLite pool.
+
+Every pooled connection is a ProfiledConnection, so run_query, run_many and the code that
+uses get_connection() directly are all measured the same way. Profiling is opt-in
+(LIFEOS_PROFILE=1 sets the default, the sidebar "Query Diagnostics" switches it per session);
+when it is off a statement costs one extra Python call.
+
+A rerun is the unit of work: dashboard.py calls begin_rerun(page, **settings) with the session's
+switches before anything touches the database and end_rerun() at the very end. The switches live
+on the rerun (one per script thread), so one browser tab never turns profiling on or off for another. Each statement of that rerun is recorded with
+its latency (execute + fetch), rows returned (or affected) and, optionally, the
+EXPLAIN QUERY PLAN of statements slower than slow_ms. Finished reruns are appended to a
+JSON lines log (one line per statement) and kept in memory for the diagnostics panel.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from itertools import count
+
+LOG_PATH = os.environ.get("LIFEOS_PROFILE_LOG", "query_profile.jsonl")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Collapses whitespace so the same statement groups together whatever its indentation."""
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+# --- 1. PROFILER STATE ---
+
+class QueryProfiler:
+    """Default switches for new sessions, plus one in-flight rerun (and its settings) per script thread."""
+
+    def __init__(self):
+        # Defaults only: each rerun carries the settings its session passed to begin_rerun
+        self.enabled = os.environ.get("LIFEOS_PROFILE") == "1"
+        self.explain_slow = False
+        self.slow_ms = 50.0
+        self.log_path = LOG_PATH
+        self.recent = deque(maxlen=50)  # summaries of the last finished reruns
+        self._local = threading.local()
+        self._ids = count(1)
+        self._log_lock = threading.Lock()
+
+    def current(self):
+        return getattr(self._local, "rerun", None)
+
+    def begin_rerun(self, page, enabled=None, explain_slow=None, slow_ms=None):
+        """Starts recording this thread's rerun with the session's settings (None = the defaults)."""
+        # A rerun cut short by st.rerun() never reaches end_rerun: flush it first
+        self.end_rerun()
+        self._local.rerun = None
+        if self.enabled if enabled is None else enabled:
+            self._local.rerun = {"id": next(self._ids), "page": page, "ts": time.time(), "statements": [],
+                                 "explain_slow": self.explain_slow if explain_slow is None else explain_slow,
+                                 "slow_ms": self.slow_ms if slow_ms is None else slow_ms}
+
+    def end_rerun(self):
+        """Closes the thread's rerun, logs it and returns it (None when nothing was recorded)."""
+        rerun = self.current()
+        self._local.rerun = None
+        if rerun is None:
+            return None
+        statements = rerun["statements"]
+        self.recent.append({"rerun": rerun["id"], "page": rerun["page"], "statements": len(statements),
+                            "total_ms": round(sum(s["ms"] for s in statements), 2)})
+        self._write_log(rerun)
+        return rerun
+
+    def record(self, rerun, sql, ms, rows, many=False):
+        entry = {"sql": normalize_sql(sql), "ms": ms, "rows": rows, "many": many, "plan": None}
+        rerun["statements"].append(entry)
+        return entry
+
+    def _write_log(self, rerun):
+        lines = [json.dumps({"ts": rerun["ts"], "rerun": rerun["id"], "page": rerun["page"], **s},
+                            ensure_ascii=False)
+                 for s in rerun["statements"]]
+        if not lines:
+            return
+        try:
+            with self._log_lock, open(self.log_path, "a", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+        except OSError:
+            pass  # Profiling must never break the app (read-only dir, full disk...)
+
+
+PROFILER = QueryProfiler()
+
+
+def _explain(conn, sql, params):
+    """EXPLAIN QUERY PLAN details on a plain cursor (not profiled itself); None if SQLite refuses."""
+    try:
+        cur = sqlite3.Cursor(conn)
+        plan = sqlite3.Cursor.execute(cur, "EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return [row[3] for row in plan] or None
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+# --- 2. INSTRUMENTED CONNECTION ---
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Times execute/executemany and the fetches that follow them, attributing both to one entry."""
+
+    _entry = None
+    _statement = None
+    _rerun = None
+
+    def execute(self, sql, parameters=()):
+        rerun = PROFILER.current()
+        if rerun is None:
+            self._entry = None
+            return super().execute(sql, parameters)
+        self._rerun = rerun
+        t0 = time.perf_counter()
+        super().execute(sql, parameters)
+        # Reads report rows as they are fetched; writes report what they changed
+        rows = 0 if self.description is not None else max(self.rowcount, 0)
+        self._entry = PROFILER.record(rerun, sql, (time.perf_counter() - t0) * 1000, rows)
+        self._statement = (sql, parameters)
+        self._maybe_explain()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        rerun = PROFILER.current()
+        self._entry = None
+        if rerun is None:
+            return super().executemany(sql, seq_of_parameters)
+        t0 = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        PROFILER.record(rerun, sql, (time.perf_counter() - t0) * 1000, max(self.rowcount, 0), many=True)
+        return self
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(t0, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(t0, len(rows))
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(t0, len(rows))
+        return rows
+
+    def _fetched(self, t0, n):
+        if self._entry is None:
+            return
+        self._entry["ms"] += (time.perf_counter() - t0) * 1000
+        self._entry["rows"] += n
+        self._maybe_explain()
+
+    def _maybe_explain(self):
+        # At most one EXPLAIN per statement, as soon as it crosses the threshold (execute or a fetch)
+        rerun = self._rerun
+        if rerun["explain_slow"] and self._statement is not None and self._entry["ms"] >= rerun["slow_ms"]:
+            self._entry["plan"] = _explain(self.connection, *self._statement)
+            self._statement = None
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors (including the implicit ones of execute) are profiled."""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import db_utils
+from db_utils import get_connection, bump_table_version, note_changes, table_version, run_query
+
+# Subscriptions without a birth date count from here (same default the pages always used)
+DEFAULT_CREATED_AT = "2024-01-01"
+OCCURRENCE_COLUMNS = ["recurring_id", "Date", "Category", "Item", "Price", "Payment Method", "paid"]
+
+
+# --- 1. MATERIALIZATION (projection table + per-subscription watermark) ---
+
+_MATERIALIZE_SQL = f"""
+    WITH RECURSIVE months(m) AS (
+        SELECT MIN(substr(COALESCE(created_at, '{DEFAULT_CREATED_AT}'), 1, 7)) FROM recurring WHERE active = 1
+        UNION ALL
+        SELECT strftime('%Y-%m', m || '-01', '+1 month') FROM months WHERE m < :through
+    )
+    INSERT OR IGNORE INTO recurring_projection
+        (recurring_id, month, created_at, category, item, price, payment_method)
+    SELECT r.id, months.m, COALESCE(r.created_at, '{DEFAULT_CREATED_AT}'), r.category, r.item, r.price,
+           r.payment_method
+    FROM recurring r
+    JOIN months ON months.m >= substr(COALESCE(r.created_at, '{DEFAULT_CREATED_AT}'), 1, 7)
+    LEFT JOIN recurring_watermark w ON w.recurring_id = r.id
+    WHERE r.active = 1 AND months.m <= :through AND months.m > COALESCE(w.through_month, '')
+"""
+
+_ADVANCE_WATERMARK_SQL = """
+    INSERT INTO recurring_watermark (recurring_id, through_month)
+    SELECT id, :through FROM recurring WHERE active = 1
+    ON CONFLICT (recurring_id) DO UPDATE SET through_month = MAX(through_month, excluded.through_month)
+"""
+
+# {db path: (recurring version, through_month)} so reruns skip the watermark check entirely
+_HORIZON = {}
+
+
+def materialize_through(month_str):
+    """
+    Makes sure every active subscription has its occurrences materialized up to 'YYYY-MM'.
+    Only the months past each subscription's watermark are written (one INSERT ... SELECT over a
+    recursive month series), so extending the horizon costs O(new months x items), once.
+    Returns the number of new occurrences.
+    """
+    path = os.path.abspath(db_utils.DB_NAME)
+    version = table_version("recurring")
+    known = _HORIZON.get(path)
+    if known and known[0] == version and known[1] >= month_str:
+        return 0
+
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        behind = conn.execute("""SELECT COUNT(*) FROM recurring r
+                                 LEFT JOIN recurring_watermark w ON w.recurring_id = r.id
+                                 WHERE r.active = 1 AND COALESCE(w.through_month, '') < ?""",
+                              (month_str,)).fetchone()[0]
+        added = 0
+        if behind:
+            before = conn.total_changes
+            conn.execute(_MATERIALIZE_SQL, {"through": month_str})
+            # rowcount isn't reported for statements starting with WITH
+            added = conn.total_changes - before
+            conn.execute(_ADVANCE_WATERMARK_SQL, {"through": month_str})
+            if added:
+                note_changes(conn, "recurring_projection")
+
+    if added:
+        bump_table_version("recurring_projection")
+    _HORIZON[path] = (version, max(month_str, known[1]) if known and known[0] == version else month_str)
+    return added
+
+
+# --- 2. RANGE QUERIES ---
+
+def _anchor_dates(start, end):
+    """
+    start + 0, 1, 2... months (day clipped to the month's length, like relativedelta) up to 'end':
+    the dates on which each subscription is counted inside [start, end].
+    """
+    first = np.datetime64(start.strftime("%Y-%m"), "M")
+    count = (end.year - start.year) * 12 + (end.month - start.month) + 1
+    if count <= 0:
+        return pd.DatetimeIndex([])
+    months = first + np.arange(count).astype("timedelta64[M]")
+    month_len = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+    days = np.minimum(start.day, month_len)
+    anchors = pd.DatetimeIndex(months.astype("datetime64[D]") + (days - 1).astype("timedelta64[D]"))
+    anchors = anchors + (start - start.normalize())
+    return anchors[anchors <= end]
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _recurring_occurrences(db_name, start, end, versions):
+    anchors = _anchor_dates(start, end)
+    if anchors.empty:
+        return pd.DataFrame(columns=OCCURRENCE_COLUMNS)
+    months = pd.DataFrame({"month": anchors.strftime("%Y-%m"), "Date": anchors})
+
+    proj = run_query("""SELECT recurring_id, month, created_at, category, item, price, payment_method
+                        FROM recurring_projection
+                        WHERE month >= ? AND month <= ?
+                        ORDER BY month, recurring_id""",
+                     (months["month"].iloc[0], months["month"].iloc[-1]))
+    occ = proj.merge(months, on="month")
+    # Birth-date integrity: a subscription only counts once it existed on the anchor date
+    occ = occ[pd.to_datetime(occ["created_at"], errors="coerce") <= occ["Date"]]
+    return pd.DataFrame({
+        "recurring_id": occ["recurring_id"],
+        "Date": occ["Date"],
+        "Category": occ["category"],
+        "Item": occ["item"],
+        "Price": occ["price"],
+        "Payment Method": occ["payment_method"],
+        "paid": 0,
+    }).reset_index(drop=True)
+
+
+def recurring_occurrences(start, end):
+    """
+    Every active subscription occurrence in [start, end], one row per (subscription, month),
+    dated start + n months. A single month (start == end == first day) gives that month's bill.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    materialize_through(end.strftime("%Y-%m"))
+    return _recurring_occurrences(db_utils.DB_NAME, start, end,
+                                  (table_version("recurring"), table_version("recurring_projection")))
@@ -0,0 +1,254 @@
+"""
+Report engine: financial summaries for any set of periods, in one grouped query.
+
+A period is '2026-03' (month), '2026Q1' (quarter), '2026' (year) or a custom inclusive
+('YYYY-MM-DD', 'YYYY-MM-DD') day range. Whole months are read from monthly_rollup and only
+the partial edge months of custom ranges touch the ledgers, all periods in a single statement.
+Summaries and rendered text/HTML are cached per period and data version, so a Dashboard
+rerun or a batch export never recomputes a report whose months didn't change.
+
+Usage (batch export of a year: 12 monthly reports + the yearly one, as .txt and .html):
+    python reports.py 2025 [out_dir]
+"""
+import html
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+
+import db_utils
+from accounts import paid_sql
+from db_utils import run_query, table_version
+from money import cents_sql, from_cents
+
+# monthly_rollup is trigger-maintained from the ledgers, so the cache follows all three
+REPORT_DEPS = ("expenses", "incomes", "monthly_rollup")
+TOP_CATEGORIES = 5
+
+
+# --- 1. PERIODS ---
+
+def parse_period(spec):
+    """
+    '2026-03' | '2026Q1' | '2026' | (start, end) -> (label, title, start, stop),
+    with 'YYYY-MM-DD' bounds and stop exclusive.
+    """
+    if isinstance(spec, (tuple, list)):
+        start, end = pd.Timestamp(spec[0]).normalize(), pd.Timestamp(spec[1]).normalize()
+        label = f"{start:%Y-%m-%d}..{end:%Y-%m-%d}"
+        title = f"{start:%d/%m/%Y} - {end:%d/%m/%Y}"
+        stop = end + pd.Timedelta(days=1)
+    else:
+        spec = str(spec).upper()
+        if "Q" in spec:
+            period = pd.Period(spec, freq="Q")
+            title = f"Q{period.quarter} {period.year}"
+        elif len(spec) == 4:
+            period = pd.Period(spec, freq="Y")
+            title = spec
+        else:
+            period = pd.Period(spec, freq="M")
+            title = period.strftime("%B %Y")
+        label = str(period)
+        start, stop = period.start_time.normalize(), (period + 1).start_time
+    return label, title, start.strftime("%Y-%m-%d"), stop.strftime("%Y-%m-%d")
+
+
+def monthly_periods(year):
+    """The twelve month specs of a year ('2025-01' ... '2025-12')."""
+    return [f"{int(year)}-{m:02d}" for m in range(1, 13)]
+
+
+def _split(start, stop):
+    """
+    Splits [start, stop) into whole months (first, last 'YYYY-MM', or None) and the partial
+    day ranges around them, which are the only parts that need the ledgers.
+    """
+    start, stop = pd.Timestamp(start), pd.Timestamp(stop)
+    first_full = start if start.day == 1 else start + pd.offsets.MonthBegin(1)
+    stop_full = stop if stop.day == 1 else stop - pd.offsets.MonthBegin(1)
+    if first_full >= stop_full:
+        return None, [(start, stop)]
+    months = (first_full.strftime("%Y-%m"), (stop_full - pd.offsets.MonthBegin(1)).strftime("%Y-%m"))
+    edges = [(a, b) for a, b in ((start, first_full), (stop_full, stop)) if a < b]
+    return months, edges
+
+
+# --- 2. ONE GROUPED PASS ---
+
+def _values(rows):
+    # VALUES list for an inline table (SQLite names its columns column1, column2, ...)
+    return ", ".join("(" + ", ".join("?" * len(rows[0])) + ")" for _ in rows), [v for r in rows for v in r]
+
+
+def _period_totals(periods):
+    """Long frame (label, kind, paid, Category, cents, n) covering every period, from one statement."""
+    month_rows, edge_rows = [], []
+    for label, _, start, stop in periods:
+        months, edges = _split(start, stop)
+        if months:
+            month_rows.append((label, *months))
+        edge_rows += [(label, a.strftime("%Y-%m-%d"), b.strftime("%Y-%m-%d")) for a, b in edges]
+
+    parts, params = [], []
+    if month_rows:
+        values, values_params = _values(month_rows)
+        parts.append(f"""SELECT p.column1 AS label, r.kind, r.paid, r.category AS Category,
+                                SUM(r.cents) AS cents, SUM(r.count) AS n
+                         FROM (VALUES {values}) AS p
+                         JOIN monthly_rollup r ON r.month >= p.column2 AND r.month <= p.column3
+                         GROUP BY 1, 2, 3, 4""")
+        params += values_params
+    if edge_rows:
+        values, values_params = _values(edge_rows)
+        for table_name, kind in (("incomes", "income"), ("expenses", "expense")):
+            parts.append(f"""SELECT p.column1 AS label, '{kind}' AS kind, {paid_sql(table_name, 'l.')} AS paid,
+                                    COALESCE(l.Category, '') AS Category,
+                                    SUM(COALESCE({cents_sql("l.")}, 0)) AS cents, COUNT(*) AS n
+                             FROM (VALUES {values}) AS p
+                             JOIN {table_name} l ON l.Date >= p.column2 AND l.Date < p.column3
+                             GROUP BY 1, 2, 3, 4""")
+            params += values_params
+    if not parts:
+        return pd.DataFrame(columns=["label", "kind", "paid", "Category", "cents", "n"])
+    return run_query(" UNION ALL ".join(parts), params)
+
+
+def _summarize(totals, periods):
+    """
+    One summary dict per period from the long totals frame (grouped once for all periods).
+    Everything is added up in integer cents; amounts become reais only in the returned dicts.
+    """
+    totals = totals.astype({"cents": "int64"})
+    by_kind = totals.groupby(["label", "kind", "paid"])[["cents", "n"]].sum()
+    cents, count = by_kind["cents"].to_dict(), by_kind["n"].to_dict()
+    expense_rows = totals[totals["kind"] == "expense"]
+    categories = expense_rows.groupby(["label", "Category"])["cents"].sum().sort_values(ascending=False)
+    categories_by_label = {}
+    for (label, category), value in categories.items():
+        categories_by_label.setdefault(label, []).append((category, from_cents(value)))
+
+    summaries = {}
+    for label, title, start, stop in periods:
+        income_received = cents.get((label, "income", 1), 0)
+        expenses = cents.get((label, "expense", 1), 0) + cents.get((label, "expense", 0), 0)
+        summaries[label] = {
+            "label": label, "title": title, "start": start,
+            "end": (pd.Timestamp(stop) - pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+            "income_received": from_cents(income_received),
+            "income_pending": from_cents(cents.get((label, "income", 0), 0)),
+            "has_pending_income": count.get((label, "income", 0), 0) > 0,
+            "expenses": from_cents(expenses),
+            "expenses_paid": from_cents(cents.get((label, "expense", 1), 0)),
+            # Net counts SETTLED funds only (received income), like the original monthly report
+            "net": from_cents(income_received - expenses),
+            "categories": categories_by_label.get(label, []),
+        }
+    return summaries
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _period_summaries(db_name, periods, versions):
+    return _summarize(_period_totals(periods), periods)
+
+
+def _current_versions():
+    return tuple(table_version(t) for t in REPORT_DEPS)
+
+
+def period_summaries(specs):
+    """{label: summary dict} for every period spec (see parse_period), computed in one query."""
+    periods = tuple(parse_period(s) for s in specs)
+    return _period_summaries(db_utils.DB_NAME, periods, _current_versions())
+
+
+# --- 3. RENDERING (cached per period, format and data version) ---
+
+def render_text(summary, sent_on):
+    status = "STABLE 🟢" if summary["net"] >= 0 else "DEFICIT 🔴"
+    return f"""
+    ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    🛡️ LIFE OS 2026: FISCAL INTELLIGENCE REPORT
+    📅 Period: {summary["title"]}
+    ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    💰 FINANCIAL OVERVIEW:
+       • Received Income: R$ {summary["income_received"]:,.2f}
+       • Total Expenses:  R$ {summary["expenses"]:,.2f}
+       • Current Net:     R$ {summary["net"]:,.2f}
+
+    ⚖️ FISCAL STATUS: {status}
+
+    {"⚠️ Note: You have pending receivables not yet included in the cash total." if summary["has_pending_income"] else ""}
+    ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    Sent via LifeOS Automated Dispatch | {sent_on}
+    """
+
+
+def render_html(summary, sent_on):
+    status, color = ("STABLE", "#10b981") if summary["net"] >= 0 else ("DEFICIT", "#ef4444")
+    rows = "".join(f"<tr><td>{html.escape(str(cat) or 'Uncategorized')}</td>"
+                   f"<td style='text-align:right'>R$ {total:,.2f}</td></tr>"
+                   for cat, total in summary["categories"][:TOP_CATEGORIES])
+    pending = ("<p style='color:#f59e0b'>⚠️ You have pending receivables not yet included in the cash total.</p>"
+               if summary["has_pending_income"] else "")
+    return f"""<div style="font-family:sans-serif;max-width:560px">
+<h2>🛡️ LifeOS 2026: Fiscal Intelligence Report</h2>
+<p>📅 Period: <b>{html.escape(summary["title"])}</b> ({summary["start"]} to {summary["end"]})</p>
+<table style="width:100%;border-collapse:collapse">
+<tr><td>Received Income</td><td style='text-align:right'>R$ {summary["income_received"]:,.2f}</td></tr>
+<tr><td>Total Expenses</td><td style='text-align:right'>R$ {summary["expenses"]:,.2f}</td></tr>
+<tr><td><b>Current Net</b></td><td style='text-align:right'><b>R$ {summary["net"]:,.2f}</b></td></tr>
+</table>
+<p>⚖️ Fiscal status: <b style="color:{color}">{status}</b></p>
+{pending}
+<h4>Top categories</h4>
+<table style="width:100%;border-collapse:collapse">{rows}</table>
+<p style="color:#64748b;font-size:12px">Sent via LifeOS Automated Dispatch | {sent_on}</p>
+</div>"""
+
+
+RENDERERS = {"text": render_text, "html": render_html}
+
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def _rendered(db_name, period, fmt, sent_on, versions, _summary=None):
+    # _summary (not hashed) lets build_reports hand over totals it already computed in bulk
+    summary = _summary or _period_summaries(db_name, (period,), versions)[period[0]]
+    return RENDERERS[fmt](summary, sent_on)
+
+
+def build_reports(specs, fmt="text"):
+    """{label: rendered report} for every period spec; one grouped query covers all of them."""
+    periods = tuple(parse_period(s) for s in specs)
+    versions = _current_versions()
+    sent_on = pd.Timestamp.now().strftime("%d/%m/%Y")
+    summaries = _period_summaries(db_utils.DB_NAME, periods, versions)
+    return {p[0]: _rendered(db_utils.DB_NAME, p, fmt, sent_on, versions, _summary=summaries[p[0]])
+            for p in periods}
+
+
+def report(spec, fmt="text"):
+    """One rendered report ('text' or 'html')."""
+    return next(iter(build_reports([spec], fmt).values()))
+
+
+def monthly_summary_text():
+    """The current month's email report body."""
+    return report(pd.Timestamp.now().strftime("%Y-%m"))
+
+
+if __name__ == "__main__":
+    from migrations import initialize_system_db
+
+    initialize_system_db()
+    year = sys.argv[1]
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else f"reports_{year}"
+    os.makedirs(out_dir, exist_ok=True)
+    specs = monthly_periods(year) + [year]
+    for fmt, ext in (("text", "txt"), ("html", "html")):
+        for label, body in build_reports(specs, fmt).items():
+            with open(os.path.join(out_dir, f"report_{label}.{ext}"), "w", encoding="utf-8") as fh:
+                fh.write(body)
+    print(f"✅ {len(specs)} reports written to {out_dir}")
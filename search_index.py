@@ -0,0 +1,30 @@
+"""
+Full-text search over the ledgers' Item and Category (SQLite FTS5).
+
+expenses_fts / incomes_fts are external-content indexes (migration 12): they store only the
+tokens, keyed by the ledger id, and triggers keep them in step with every insert, update and
+delete. The unicode61 tokenizer folds case and strips accents, so 'acai' finds 'Açaí' and
+'cafe' finds 'Café'; prefix indexes make 'far' -> 'Farmácia' an index lookup too.
+Results are ranked with bm25, an Item hit counting twice as much as a Category hit.
+"""
+import re
+
+SEARCH_TABLES = {"expenses": "expenses_fts", "incomes": "incomes_fts"}
+TOKENIZER = "unicode61 remove_diacritics 2"
+PREFIX_LENGTHS = "2 3"
+RANK = "bm25(2.0, 1.0)"  # weights of Item, Category
+
+_WORD = re.compile(r"\w+")
+
+
+def match_query(text, column=None, any_word=False):
+    """
+    Free text -> FTS5 MATCH expression: every word as a quoted prefix term, so user input
+    can never be read as FTS syntax. 'padaria ce' -> "padaria"* AND "ce"*.
+    None when the text has no searchable word.
+    """
+    words = _WORD.findall(str(text or ""))
+    if not words:
+        return None
+    expr = (" OR " if any_word else " AND ").join(f'"{w}"*' for w in words)
+    return f"{column} : ({expr})" if column else expr
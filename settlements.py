@@ -0,0 +1,120 @@
+"""
+Bulk settlement: marks ledger rows paid (expenses) or received (incomes) by predicate, in one
+indexed UPDATE, and records it as an undoable batch.
+
+Every call gets a row in 'settlements' (migration 14) and stamps its id on the rows it paid
+(settlement_id), so undo is one UPDATE on the settlement_id index. Predicates:
+    card      Payment Method (expenses only)
+    cycle     'YYYY-MM': the rows dated in that month (a card's statement month)
+    start/end inclusive 'YYYY-MM-DD' Date range
+    category  Category
+    ids       explicit row ids (editor checkboxes), bound as one JSON array parameter
+The card/cycle pair reads idx_expenses_method_paid_date; ids are primary-key lookups.
+The result carries the new cash balance, read from the maintained aggregates (no ledger reload).
+"""
+import json
+
+import pandas as pd
+
+from accounts import paid_sql
+from aggregations import cash_balance
+from db_utils import bump_table_version, get_connection, run_query
+from money import from_cents
+
+SETTLE_TABLES = ("expenses", "incomes")
+
+
+def _predicate(table_name, card, cycle, start, end, category, ids):
+    clauses, params = [], []
+    if card is not None:
+        if table_name != "expenses":
+            raise ValueError("'card' only applies to expenses")
+        clauses.append('"Payment Method" = ?')
+        params.append(card)
+    if cycle is not None:
+        clauses.append("Date >= ? AND Date < date(?, '+1 month')")
+        params += [f"{cycle}-01", f"{cycle}-01"]
+    if start is not None:
+        clauses.append("Date >= ?")
+        params.append(str(start))
+    if end is not None:
+        clauses.append("Date < date(?, '+1 day')")
+        params.append(str(end))
+    if category is not None:
+        clauses.append("Category = ?")
+        params.append(category)
+    if ids is not None:
+        clauses.append("id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(i) for i in ids]))
+    if not clauses:
+        raise ValueError("settle() needs at least one predicate (it never settles a whole ledger)")
+    return " AND ".join(clauses), params
+
+
+def _touched(table_name):
+    # Triggers also moved the rollup (and, for expenses, the card statements)
+    extra = ("card_statements",) if table_name == "expenses" else ()
+    bump_table_version(table_name, "monthly_rollup", "settlements", *extra)
+
+
+def _result(batch_id, rows, cents):
+    return {"batch_id": batch_id, "rows": rows, "amount": from_cents(cents), "cash_balance": cash_balance()}
+
+
+# --- 1. SETTLE ---
+
+def settle(table_name="expenses", card=None, cycle=None, start=None, end=None, category=None, ids=None,
+           description=None):
+    """
+    Pays every unpaid row of 'table_name' matching all the given predicates, as one batch.
+    Returns {"batch_id", "rows", "amount", "cash_balance"}; batch_id is None when nothing matched.
+    """
+    if table_name not in SETTLE_TABLES:
+        raise ValueError(f"Unknown ledger: {table_name}")
+    where, params = _predicate(table_name, card, cycle, start, end, category, ids)
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        batch_id = conn.execute("INSERT INTO settlements (table_name, description, created_at) VALUES (?, ?, ?)",
+                                (table_name, description, pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"))).lastrowid
+        paid = conn.execute(f"""UPDATE {table_name} SET paid = 1, settlement_id = ?
+                                WHERE {paid_sql(table_name)} = 0 AND {where}
+                                RETURNING cents""", (batch_id, *params)).fetchall()
+        cents = sum(row[0] or 0 for row in paid)
+        if paid:
+            conn.execute("UPDATE settlements SET rows = ?, cents = ? WHERE id = ?", (len(paid), cents, batch_id))
+        else:
+            conn.execute("DELETE FROM settlements WHERE id = ?", (batch_id,))
+            batch_id = None
+    if paid:
+        _touched(table_name)
+    return _result(batch_id, len(paid), cents)
+
+
+# --- 2. UNDO ---
+
+def undo_settlement(batch_id):
+    """Reverts one batch: its rows go back to unpaid. Same result shape as settle()."""
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        batch = conn.execute("SELECT table_name FROM settlements WHERE id = ? AND undone_at IS NULL",
+                             (int(batch_id),)).fetchone()
+        if batch is None:
+            raise ValueError(f"Settlement {batch_id} does not exist or was already undone")
+        table_name = batch[0]
+        # Only rows the batch still holds paid (read like every other reader: NULL as the default)
+        reverted = conn.execute(f"""UPDATE {table_name} SET paid = 0, settlement_id = NULL
+                                    WHERE settlement_id = ? AND {paid_sql(table_name)} = 1
+                                    RETURNING cents""", (int(batch_id),)).fetchall()
+        conn.execute("UPDATE settlements SET undone_at = ? WHERE id = ?",
+                     (pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"), int(batch_id)))
+    _touched(table_name)
+    return _result(int(batch_id), len(reverted), sum(row[0] or 0 for row in reverted))
+
+
+def recent_settlements(limit=5):
+    """Latest batches that can still be undone (newest first)."""
+    return run_query("""SELECT id, table_name, description, created_at, rows, cents
+                        FROM settlements
+                        WHERE undone_at IS NULL
+                        ORDER BY id DESC
+                        LIMIT ?""", (limit,))
@@ -0,0 +1,202 @@
+"""
+Columnar Parquet snapshots of the LifeOS database.
+
+export_snapshot() copies every table, read inside one SQLite read transaction (a consistent
+point-in-time copy), to zstd-compressed Parquet next to finance.db:
+    snapshots/20261017T093000/manifest.json
+    snapshots/20261017T093000/expenses/year=2025/part-0.parquet   (ledgers: partitioned by year of Date)
+    snapshots/20261017T093000/budgets.parquet                     (everything else: one file)
+    snapshots/LATEST                                              (name of the newest complete snapshot)
+
+Date is stored as a timestamp column and 0/1 flags (paid, is_auto, active...) as int8, so
+reading back is a memory-mapped columnar read with no string parsing. The manifest keeps
+the pandas dtypes (reloads match load_data exactly) and the table_changes counters at
+export time: a ledger snapshot is 'current' while its counter still matches the database.
+
+Usage:
+    python snapshots.py            # export a snapshot of finance.db
+    python snapshots.py info       # what the latest snapshot holds
+"""
+import json
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+import db_utils
+from db_utils import get_connection
+from migrations import CHANGE_TRACKED
+
+# Ledgers partitioned by year (every other table is small enough for one file)
+PARTITIONED_TABLES = ("expenses", "incomes")
+FLAG_COLUMNS = ("paid", "is_auto", "active", "completed")
+KEEP_SNAPSHOTS = 3
+COMPRESSION = "zstd"
+
+
+def snapshot_root(db_name=None):
+    """Snapshots live in a 'snapshots' folder beside the database file."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_name or db_utils.DB_NAME)), "snapshots")
+
+
+# --- 1. EXPORT ---
+
+def _to_arrow(df, table_name):
+    """Typed Arrow table: parsed Date (+ partition year) and int8 flags."""
+    if table_name in PARTITIONED_TABLES and "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"])
+    dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+    for col in FLAG_COLUMNS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype("int8")
+    if table_name in PARTITIONED_TABLES and "Date" in df.columns:
+        df["year"] = df["Date"].dt.year.astype("Int16")
+    return pa.Table.from_pandas(df, preserve_index=False), dtypes
+
+
+def _write_table(table, target, partitioned):
+    if partitioned and table.num_rows:
+        ds.write_dataset(table, target, format="parquet",
+                         partitioning=ds.partitioning(pa.schema([("year", pa.int16())]), flavor="hive"),
+                         file_options=ds.ParquetFileFormat().make_write_options(compression=COMPRESSION),
+                         basename_template="part-{i}.parquet")
+    else:
+        pq.write_table(table, target + ".parquet", compression=COMPRESSION)
+
+
+def export_snapshot(db_name=None, keep=KEEP_SNAPSHOTS):
+    """Writes a full snapshot and returns its directory. Older snapshots beyond 'keep' are removed."""
+    root = snapshot_root(db_name)
+    name = pd.Timestamp.now().strftime("%Y%m%dT%H%M%S")
+    final = os.path.join(root, name)
+    work = final + ".partial"
+    shutil.rmtree(work, ignore_errors=True)
+    os.makedirs(work)
+
+    manifest = {"created_at": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"), "tables": {}}
+    with get_connection(db_name) as conn:
+        # One read transaction: every table (and the change counters) from the same database state
+        conn.execute("BEGIN")
+        # Plain tables only: FTS indexes (virtual + shadow tables) are rebuilt from the ledgers
+        tables = [r[0] for r in conn.execute("SELECT name FROM pragma_table_list WHERE schema = 'main' "
+                                             "AND type = 'table' AND name NOT LIKE 'sqlite_%' "
+                                             "ORDER BY name").fetchall()]
+        changes = dict(conn.execute("SELECT table_name, changes FROM table_changes").fetchall())
+        for table_name in tables:
+            df = pd.read_sql(f'SELECT * FROM "{table_name}"', conn)
+            partitioned = table_name in PARTITIONED_TABLES and "Date" in df.columns and not df.empty
+            arrow_table, dtypes = _to_arrow(df, table_name)
+            _write_table(arrow_table, os.path.join(work, table_name), partitioned)
+            manifest["tables"][table_name] = {"rows": len(df), "dtypes": dtypes, "partitioned": partitioned,
+                                              "changes": changes.get(table_name)}
+
+    with open(os.path.join(work, "manifest.json"), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    # Rename, then repoint LATEST: readers only ever see complete snapshots
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(work, final)
+    with open(os.path.join(root, "LATEST.tmp"), "w") as fh:
+        fh.write(name)
+    os.replace(os.path.join(root, "LATEST.tmp"), os.path.join(root, "LATEST"))
+
+    for old in list_snapshots(db_name)[:-keep]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return final
+
+
+def list_snapshots(db_name=None):
+    """Complete snapshot names, oldest first."""
+    root = snapshot_root(db_name)
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root)
+                  if os.path.isfile(os.path.join(root, d, "manifest.json")) and not d.endswith(".partial"))
+
+
+# --- 2. MEMORY-MAPPED RELOAD ---
+
+def latest_snapshot(db_name=None):
+    """(path, manifest) of the newest snapshot, or (None, None)."""
+    root = snapshot_root(db_name)
+    try:
+        with open(os.path.join(root, "LATEST")) as fh:
+            path = os.path.join(root, fh.read().strip())
+        with open(os.path.join(path, "manifest.json")) as fh:
+            return path, json.load(fh)
+    except (OSError, ValueError):
+        return None, None
+
+
+def read_snapshot(table_name, years=None, columns=None, snapshot=None):
+    """
+    One table from a snapshot (latest by default) as a DataFrame with the dtypes load_data gives.
+    'years' prunes ledger partitions before anything is read; files are memory-mapped.
+    """
+    path, manifest = (snapshot, None) if snapshot else latest_snapshot()
+    if path is None:
+        raise FileNotFoundError("No snapshot found: run export_snapshot() first")
+    if manifest is None:
+        with open(os.path.join(path, "manifest.json")) as fh:
+            manifest = json.load(fh)
+    meta = manifest["tables"][table_name]
+
+    if meta["partitioned"]:
+        dataset = ds.dataset(os.path.join(path, table_name), format="parquet", partitioning="hive",
+                             filesystem=fs.LocalFileSystem(use_mmap=True))
+        row_filter = ds.field("year").isin(list(years)) if years is not None else None
+        read_columns = columns if columns is None or "id" in columns else list(columns) + ["id"]
+        df = dataset.to_table(columns=read_columns, filter=row_filter).to_pandas()
+        df = df.drop(columns="year", errors="ignore")
+        # Fragments come back year by year: restore the ledger's rowid order
+        if "id" in df.columns:
+            df = df.sort_values("id", kind="stable", ignore_index=True)
+            if columns is not None and "id" not in columns:
+                df = df.drop(columns="id")
+    else:
+        df = pq.read_table(os.path.join(path, table_name + ".parquet"), columns=columns,
+                           memory_map=True).to_pandas()
+    return df.astype({c: t for c, t in meta["dtypes"].items() if c in df.columns})
+
+
+def current_snapshot(table_name, db_name=None):
+    """Latest snapshot path if it still matches the live table (change-tracked ledgers only), else None."""
+    if table_name not in CHANGE_TRACKED:
+        return None
+    path, manifest = latest_snapshot(db_name)
+    # Empty ledgers have nothing to gain from a snapshot (and load_data shapes them itself)
+    if path is None or not manifest["tables"].get(table_name, {}).get("rows"):
+        return None
+    # The counter of the snapshot's own database, not whichever one is the app's default
+    with get_connection(db_name) as conn:
+        live = conn.execute("SELECT changes FROM table_changes WHERE table_name = ?", (table_name,)).fetchone()
+    if live is None or live[0] != manifest["tables"][table_name]["changes"]:
+        return None
+    return path
+
+
+def load_current(table_name, db_name=None):
+    """The whole table from a still-current snapshot (zero-parse), or None when SQLite must be read."""
+    path = current_snapshot(table_name, db_name)
+    return read_snapshot(table_name, snapshot=path) if path else None
+
+
+if __name__ == "__main__":
+    from migrations import initialize_system_db
+
+    initialize_system_db()
+    if len(sys.argv) > 1 and sys.argv[1] == "info":
+        path, manifest = latest_snapshot()
+        if path is None:
+            print("No snapshot yet.")
+        else:
+            print(f"📦 {path} ({manifest['created_at']})")
+            for name, meta in manifest["tables"].items():
+                state = "current" if current_snapshot(name) else ("stale" if name in CHANGE_TRACKED else "-")
+                print(f"   {name:<22} {meta['rows']:>9} rows  {state}")
+    else:
+        print(f"✅ Snapshot written to {export_snapshot()}")
@@ -0,0 +1,346 @@
+import io
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+
+from batch_writer import bulk_append
+from db_utils import get_connection, bump_table_version
+from installments import INSERT_EXPENSE_SQL, EXPENSE_ROW_COLUMNS, expand_installments, installment_rows, \
+    load_card_rules
+from money import from_cents, installment_cents, to_cents
+
+DEFAULT_CHUNKSIZE = 5000
+DEFAULT_CATEGORY = "Imported"
+# Rows whose method is neither in the file nor given by the caller (CSV and OFX alike)
+DEFAULT_PAYMENT_METHOD = "Pix"
+
+# Source column -> ledger column. First alias found wins (due date beats purchase date).
+COLUMN_ALIASES = {
+    "Date": ["Vencimento", "Date", "Data"],
+    "Category": ["Category", "Categoria"],
+    "Item": ["Item", "Descrição", "Descricao", "Description"],
+    "Price": ["Price", "Valor_Parcela", "Valor"],
+    "Payment Method": ["Payment Method", "Metodo_Pagamento", "Método", "Metodo"],
+}
+# Ledger columns a CSV must carry (any alias, or the listed fallback columns)
+REQUIRED_COLUMNS = {"Date": (), "Price": ("Valor_Total",)}
+PAID_STATUSES = {"pago", "paga", "quitado", "paid", "1", "true"}
+EXPENSE_TYPES = {"despesa", "expense"}
+
+
+class StatementFormatError(ValueError):
+    """The file's layout can't be imported (e.g. a required column is missing); nothing was written."""
+
+
+# --- 1. CSV PARSING (chunked) ---
+
+def _sniff_dialect(head_line):
+    """Brazilian bank exports use ';' with decimal commas; LifeOS/legacy files use ',' and dots."""
+    if head_line.count(";") > head_line.count(","):
+        return ";", ","
+    return ",", "."
+
+
+def _pick(chunk, ledger_col):
+    for alias in COLUMN_ALIASES[ledger_col]:
+        if alias in chunk.columns:
+            return chunk[alias]
+    return None
+
+
+def _require_columns(chunk):
+    for ledger_col, fallbacks in REQUIRED_COLUMNS.items():
+        if _pick(chunk, ledger_col) is None and not set(fallbacks) & set(chunk.columns):
+            accepted = ", ".join(COLUMN_ALIASES[ledger_col] + list(fallbacks))
+            raise StatementFormatError(f"Missing '{ledger_col}' column (accepted names: {accepted})")
+
+
+def _clean_method(series, default_method):
+    # "Credit Card (Nubank)" (finances_v2.csv) -> "Nubank", the name the cards table uses
+    cleaned = series.fillna("").astype(str).str.strip().str.replace(r"^Credit Card \((.+)\)$", r"\1", regex=True)
+    return cleaned.mask(cleaned == "", default_method or DEFAULT_PAYMENT_METHOD)
+
+
+def normalize_csv_chunk(chunk, payment_method=None, card_rules=None):
+    """
+    Maps one chunk of any supported CSV layout onto EXPENSE_ROW_COLUMNS.
+    Supported: LifeOS/legacy (Date, Category, Item, Price, Payment Method), app.py's
+    finances.csv (Data, Categoria, Descrição, Valor, Tipo) and finances_v2.csv
+    (Data, Vencimento, Categoria, Descrição, Valor_Total, Valor_Parcela, Parcela_Atual, ...).
+    Purchases given only as Valor_Total + Total_Parcelas are expanded by the installment engine.
+    Rows without a Payment Method take 'payment_method', or DEFAULT_PAYMENT_METHOD.
+    Returns (rows, skipped_count); raises StatementFormatError when Date or Price is missing.
+    """
+    _require_columns(chunk)
+    total = len(chunk)
+    if "Tipo" in chunk.columns:
+        chunk = chunk[chunk["Tipo"].fillna("").str.strip().str.lower().isin(EXPENSE_TYPES)]
+
+    category = _pick(chunk, "Category")
+    item = _pick(chunk, "Item")
+    method = _pick(chunk, "Payment Method")
+    out = pd.DataFrame({
+        "Category": category.fillna(DEFAULT_CATEGORY) if category is not None else DEFAULT_CATEGORY,
+        "Item": item.fillna("").astype(str) if item is not None else "",
+        "Payment Method": _clean_method(method if method is not None else pd.Series("", index=chunk.index),
+                                        payment_method),
+    }, index=chunk.index)
+    out["paid"] = (chunk["Status"].fillna("").astype(str).str.strip().str.lower().isin(PAID_STATUSES).astype(int)
+                   if "Status" in chunk.columns else 0)
+
+    whole_purchases = ("Valor_Total" in chunk.columns and "Total_Parcelas" in chunk.columns
+                       and "Parcela_Atual" not in chunk.columns and "Valor_Parcela" not in chunk.columns)
+    if whole_purchases:
+        purchases = pd.DataFrame({
+            "date": _pick(chunk, "Date"), "item": out["Item"], "price": pd.to_numeric(chunk["Valor_Total"]),
+            "category": out["Category"], "payment_method": out["Payment Method"],
+            "installments": pd.to_numeric(chunk["Total_Parcelas"]).fillna(1).astype(int),
+        })
+        rows = expand_installments(purchases, card_rules)
+        return rows, total - len(chunk)
+
+    price = _pick(chunk, "Price")
+    if price is None and "Valor_Total" in chunk.columns:
+        price = pd.to_numeric(chunk["Valor_Total"]) / pd.to_numeric(chunk.get("Total_Parcelas", 1))
+    price = pd.to_numeric(price, errors="coerce").abs().round(2)
+    if {"Valor_Total", "Parcela_Atual", "Total_Parcelas"} <= set(chunk.columns):
+        # finances_v2.csv stores 50 / 3 as 16.666666666666668: re-split the purchase in cents,
+        # remainder on the last installment, so the imported rows add up to Valor_Total
+        split = pd.Series(from_cents(installment_cents(
+            to_cents(pd.to_numeric(chunk["Valor_Total"], errors="coerce").abs()),
+            pd.to_numeric(chunk["Total_Parcelas"], errors="coerce").fillna(1),
+            pd.to_numeric(chunk["Parcela_Atual"], errors="coerce").fillna(1))), index=chunk.index)
+        price = split.where(pd.to_numeric(chunk["Valor_Total"], errors="coerce").notna(), price)
+    out["Price"] = price
+    out["Date"] = pd.to_datetime(_pick(chunk, "Date"), errors="coerce").dt.strftime("%Y-%m-%d")
+
+    out = out.dropna(subset=["Date", "Price"])
+    return out[EXPENSE_ROW_COLUMNS], total - len(out)
+
+
+class _Replay(io.TextIOBase):
+    """Non-seekable text stream whose first line was peeked at: hands that line back first."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.head = self._pending = stream.readline()
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        pending, self._pending = self._pending, ""
+        if size is None or size < 0:
+            return pending + self._stream.read()
+        return pending + self._stream.read(max(size - len(pending), 0))
+
+
+def iter_csv_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Streams a CSV (path or text/binary file-like) in fixed-size chunks. The file is never read
+    whole: only its first line is peeked at to pick the dialect, so memory stays flat for any size.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8-sig", newline="") as fh:
+            yield from iter_csv_chunks(fh, chunksize)
+        return
+    # Uploads are bytes: decoded on the fly, never copied into one big string
+    wrapper = (io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+               if isinstance(source, (io.RawIOBase, io.BufferedIOBase)) else None)
+    stream = wrapper or source
+    try:
+        if stream.seekable():
+            head = stream.readline()
+            stream.seek(0)
+        else:
+            stream = _Replay(stream)
+            head = stream.head
+        sep, decimal = _sniff_dialect(head)
+        yield from pd.read_csv(stream, sep=sep, decimal=decimal, chunksize=chunksize)
+    finally:
+        if wrapper is not None:
+            # Hands the caller's buffer back open (closing the wrapper would close the upload too)
+            wrapper.detach()
+
+
+# --- 2. OFX PARSING (streaming SGML/XML) ---
+
+_OFX_TAG = re.compile(r"<(/?)([A-Z0-9.]+)>([^<]*)")
+
+
+def iter_ofx_transactions(source, block_size=1 << 16):
+    """
+    Yields one dict per <STMTTRN>, reading the file in fixed-size blocks.
+    Works with both SGML (unclosed tags) and XML-style OFX.
+    """
+    fh = open(source, encoding="latin-1") if isinstance(source, (str, os.PathLike)) else source
+    is_card = False
+    current = None
+    tail = ""
+    try:
+        while True:
+            block = fh.read(block_size)
+            if isinstance(block, bytes):
+                block = block.decode("latin-1")
+            text = tail + block
+            # Keep an unfinished tag for the next block
+            cut = text.rfind("<") if block else len(text)
+            tail, text = text[cut:], text[:cut]
+            for closing, tag, value in _OFX_TAG.findall(text):
+                if tag == "CCSTMTRS":
+                    is_card = True
+                elif tag in ("STMTTRN", "BANKTRANLIST"):
+                    # SGML files may never close <STMTTRN>: the next one (or the list end) closes it
+                    if current is not None:
+                        current["card"] = is_card
+                        yield current
+                        current = None
+                    if tag == "STMTTRN" and not closing:
+                        current = {}
+                elif current is not None and not closing:
+                    current[tag] = value.strip()
+            if not block:
+                break
+    finally:
+        if fh is not source:
+            fh.close()
+
+
+def _first_present(df, tags):
+    out = pd.Series("", index=df.index)
+    for tag in reversed(tags):
+        if tag in df.columns:
+            out = df[tag].where(df[tag].fillna("") != "", out)
+    return out
+
+
+def ofx_to_rows(transactions, payment_method=None):
+    """Debits become expenses (card statements as pending, bank debits as already paid)."""
+    df = pd.DataFrame(transactions)
+    if df.empty:
+        return pd.DataFrame(columns=EXPENSE_ROW_COLUMNS), 0
+    amount = pd.to_numeric(df["TRNAMT"].str.replace(",", ".", regex=False), errors="coerce")
+    debits = df[amount < 0]
+    out = pd.DataFrame({
+        "Date": pd.to_datetime(debits["DTPOSTED"].str[:8], format="%Y%m%d", errors="coerce").dt.strftime("%Y-%m-%d"),
+        "Category": DEFAULT_CATEGORY,
+        "Item": _first_present(debits, ["MEMO", "NAME"]),
+        "Price": (-amount[amount < 0]).round(2),
+        "Payment Method": payment_method or DEFAULT_PAYMENT_METHOD,
+        "paid": (~debits["card"].astype(bool)).astype(int),
+    }).dropna(subset=["Date"])
+    return out[EXPENSE_ROW_COLUMNS], len(df) - len(out)
+
+
+def iter_ofx_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    batch = []
+    for trn in iter_ofx_transactions(source):
+        batch.append(trn)
+        if len(batch) >= chunksize:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- 3. DEDUPE (content key, probed key by key through idx_expenses_content) ---
+
+def _content_keys(df):
+    """Hash of the identifying content of a row: Date, Price (in cents), Payment Method, Item."""
+    key = pd.DataFrame({
+        "Date": df["Date"].astype(str),
+        "cents": (pd.to_numeric(df["Price"]) * 100).round().astype("int64"),
+        "method": df["Payment Method"].fillna("").astype(str),
+        "item": df["Item"].fillna("").astype(str).str.strip().str.lower(),
+    })
+    return pd.util.hash_pandas_object(key, index=False).to_numpy()
+
+
+_PROBE_SQL = """SELECT e.Date, e.Price, e."Payment Method", e.Item
+                FROM json_each(?) AS k
+                JOIN expenses AS e INDEXED BY idx_expenses_content
+                  ON e.Date = json_extract(k.value, '$[0]')
+                 AND e.Price BETWEEN json_extract(k.value, '$[1]') - 0.005 AND json_extract(k.value, '$[1]') + 0.005
+                WHERE e.id <= ?"""
+
+
+def _stored_matches(conn, rows, last_id):
+    """
+    Ledger rows stored before the import (ids <= last_id) sharing a (Date, Price) with 'rows':
+    one idx_expenses_content seek per distinct candidate key, never a scan of a Date range.
+    Price is matched within half a cent (stored REALs can carry float noise, e.g. 99.71000000000001);
+    cents, method and Item are compared on the normalized content key afterwards.
+    """
+    keys = rows[["Date", "Price"]].assign(Price=from_cents(to_cents(pd.to_numeric(rows["Price"])))).drop_duplicates()
+    probe = json.dumps(keys.astype(object).values.tolist())
+    return pd.read_sql(_PROBE_SQL, conn, params=(probe, last_id))
+
+
+def _drop_existing(conn, rows, seen, last_id):
+    """
+    Keeps only the rows not already in the ledger. Repeated identical rows are legitimate
+    (two coffees on one day), so each content key may be inserted as many times as it
+    appears in the file minus the times it was stored before this import started
+    (ids <= last_id). 'seen' counts keys across chunks of the same file.
+    """
+    if rows.empty:
+        return rows
+    existing = _stored_matches(conn, rows, last_id)
+    rows = rows.assign(_key=_content_keys(rows))
+    rows["_seen"] = rows.groupby("_key").cumcount() + rows["_key"].map(seen).fillna(0).astype("int64")
+    for key, n in rows["_key"].value_counts().items():
+        seen[key] = seen.get(key, 0) + n
+    stored = pd.Series(_content_keys(existing)).value_counts() if not existing.empty else pd.Series(dtype="int64")
+    allowed = rows["_key"].map(stored).fillna(0).astype("int64")
+    return rows[rows["_seen"] >= allowed].drop(columns=["_key", "_seen"])
+
+
+# --- 4. PIPELINE ---
+
+def import_statement(source, fmt=None, payment_method=None, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """
+    Streams a CSV/OFX statement into expenses inside ONE transaction (all or nothing).
+    'fmt' is "csv" or "ofx" (guessed from the file name when omitted).
+    'progress' is called after every chunk with the running report dict.
+    Returns {"read": n, "inserted": n, "duplicates": n, "skipped": n}.
+    Raises StatementFormatError (and rolls everything back) when the file can't be imported.
+    """
+    name = getattr(source, "name", source if isinstance(source, str) else "")
+    fmt = (fmt or ("ofx" if str(name).lower().endswith((".ofx", ".qfx")) else "csv")).lower()
+    report = {"read": 0, "inserted": 0, "duplicates": 0, "skipped": 0}
+    card_rules = load_card_rules()
+
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM expenses").fetchone()[0]
+        seen = {}
+        chunks = iter_ofx_chunks(source, chunksize) if fmt == "ofx" else iter_csv_chunks(source, chunksize)
+        for chunk in chunks:
+            if fmt == "ofx":
+                rows, skipped = ofx_to_rows(chunk, payment_method)
+            else:
+                rows, skipped = normalize_csv_chunk(chunk, payment_method, card_rules)
+            fresh = _drop_existing(conn, rows, seen, last_id)
+            if not fresh.empty:
+                bulk_append(conn, "expenses", INSERT_EXPENSE_SQL, installment_rows(fresh))
+
+            report["read"] += len(chunk)
+            report["skipped"] += skipped
+            report["duplicates"] += len(rows) - len(fresh)
+            report["inserted"] += len(fresh)
+            if progress:
+                progress(dict(report))
+
+    if report["inserted"]:
+        bump_table_version("expenses")
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python statement_import.py <statement.csv|statement.ofx> [payment method]
+    result = import_statement(sys.argv[1], payment_method=sys.argv[2] if len(sys.argv) > 2 else None,
+                              progress=lambda r: print(f"... {r['read']} read, {r['inserted']} inserted"))
+    print(f"✅ Import complete: {result}")
@@ -0,0 +1,87 @@
+"""
+Card statements (faturas): one billing-cycle row per card per month.
+
+Card purchases are stored on their bill's due date (installments.expand_installments applies the
+closing/due days once, at insert time), so a card's statement for 'YYYY-MM' is every expense of
+that card dated in that month. card_statements (migration 13) keeps per (month, card):
+    closing_date / due_date    the cycle's dates, from the cards table
+    total_cents / open_cents   running totals of all members / of the unpaid ones
+    count / open_count         member counts
+    state                      open (still taking purchases), closed (past the closing date, due)
+                               or paid (nothing left open)
+Triggers on expenses update the row on every insert, edit and delete, so bill totals across cards
+are an O(cards) primary-key read. Settling a bill is one indexed UPDATE of its unpaid members
+(an undoable settlement batch);
+the triggers flip the statement to paid in the same statement.
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+import db_utils
+from db_utils import bump_table_version, get_connection, note_changes, run_query, table_version
+from money import from_cents
+from settlements import settle
+
+STATEMENT_DEPS = ("expenses", "cards", "card_statements")
+STATEMENT_COLUMNS = ["Payment Method", "closing_date", "due_date", "total_cents", "open_cents",
+                     "count", "open_count", "state"]
+
+# {db path: day the open -> closed pass last ran}: the state only moves with the calendar once a day
+_CLOSED_ON = {}
+
+
+# --- 1. CYCLE STATE ---
+
+def close_due_statements(today=None):
+    """Moves open cycles whose closing date has passed to 'closed'. Returns the number closed."""
+    today = (today or pd.Timestamp.now()).strftime("%Y-%m-%d")
+    path = os.path.abspath(db_utils.DB_NAME)
+    if _CLOSED_ON.get(path) == today:
+        return 0
+    with get_connection() as conn:
+        closed = conn.execute("""UPDATE card_statements SET state = 'closed'
+                                 WHERE state = 'open' AND closing_date <= ?""", (today,)).rowcount
+        if closed:
+            note_changes(conn, "card_statements")
+    if closed:
+        bump_table_version("card_statements")
+    _CLOSED_ON[path] = today
+    return closed
+
+
+# --- 2. READS ---
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _month_statements(db_name, month_str, versions):
+    df = run_query("""SELECT card AS "Payment Method", closing_date, due_date, total_cents, open_cents,
+                             count, open_count, state
+                      FROM card_statements
+                      WHERE month = ?
+                      ORDER BY card""", (month_str,))
+    if df.empty:
+        df = pd.DataFrame(columns=STATEMENT_COLUMNS)
+    df["Total"] = from_cents(df["total_cents"].astype("int64"))
+    df["Price"] = from_cents(df["open_cents"].astype("int64"))
+    return df
+
+
+def month_statements(month_str):
+    """
+    Every card's statement due in 'YYYY-MM': Payment Method, cycle dates, state, member counts,
+    Total (whole bill) and Price (still open), in reais next to the exact cents.
+    """
+    close_due_statements()
+    return _month_statements(db_utils.DB_NAME, month_str, tuple(table_version(t) for t in STATEMENT_DEPS))
+
+
+# --- 3. SETTLEMENT ---
+
+def settle_statement(card, month_str):
+    """
+    Pays a card's statement: every unpaid member in one undoable batch (settlements.settle, on
+    idx_expenses_method_paid_date); the statement row turns 'paid' through its trigger.
+    Returns the settle() result (batch_id, rows, amount, cash_balance).
+    """
+    return settle("expenses", card=card, cycle=month_str, description=f"{card} statement {month_str}")
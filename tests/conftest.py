@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO not in sys.path:
+    sys.path.insert(0, REPO)
+
+import db_utils  # noqa: E402
+from migrations import initialize_system_db  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A migrated database of its own, made the app's default DB for the test; returns its path."""
+    db_name = str(tmp_path / "finance.db")
+    monkeypatch.setattr(db_utils, "DB_NAME", db_name)
+    initialize_system_db(db_name)
+    yield db_name
+    db_utils.get_pool(db_name).close_all()
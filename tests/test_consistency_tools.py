@@ -0,0 +1,68 @@
+"""Drift check and rebuild tools of migrations.py, in-process and through python -m migrations."""
+import subprocess
+import sys
+
+from conftest import REPO
+from db_utils import get_connection
+from migrations import cash_ledger_drift, rebuild_cash_ledger, rebuild_monthly_rollup
+
+
+def _seed():
+    with get_connection() as conn:
+        conn.executemany('INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) '
+                         "VALUES (?, 'Food', 'x', ?, 'Pix', ?)",
+                         [(f"2026-0{m}-1{d}", 10.5 * (m + d), (m + d) % 2) for m in range(1, 4) for d in range(3)])
+        conn.executemany("INSERT INTO incomes (Date, Category, Item, Price, paid) VALUES (?, 'Job', 'pay', 1000, ?)",
+                         [("2026-01-05", 1), ("2026-02-05", None), ("2026-03-05", 0)])
+
+
+def _snapshot(conn):
+    return (conn.execute("SELECT * FROM cash_ledger ORDER BY account, day").fetchall(),
+            conn.execute("SELECT * FROM cash_months ORDER BY account, month").fetchall(),
+            conn.execute("SELECT * FROM monthly_rollup ORDER BY 1, 2, 3, 4, 5").fetchall())
+
+
+def _corrupt():
+    with get_connection() as conn:
+        conn.execute("UPDATE cash_ledger SET net_cents = net_cents + 1 WHERE day = '2026-02-05'")
+        conn.execute("DELETE FROM cash_months WHERE month = '2026-03'")
+        conn.execute("UPDATE monthly_rollup SET cents = 0")
+
+
+def _migrations(*args, db):
+    return subprocess.run([sys.executable, "-m", "migrations", "--db", db, *args], cwd=REPO,
+                          capture_output=True, text=True)
+
+
+def test_drift_is_reported_and_rebuilt(db):
+    _seed()
+    with get_connection() as conn:
+        exact = _snapshot(conn)
+    assert all(rows.empty for rows in cash_ledger_drift().values())
+
+    _corrupt()
+    drift = cash_ledger_drift()
+    assert not drift["cash_ledger"].empty and not drift["cash_months"].empty
+
+    rebuild_cash_ledger()
+    rebuild_monthly_rollup()
+    assert all(rows.empty for rows in cash_ledger_drift().values())
+    with get_connection() as conn:
+        assert _snapshot(conn) == exact
+
+
+def test_command_line(db):
+    _seed()
+    with get_connection() as conn:
+        exact = _snapshot(conn)
+    _corrupt()
+
+    check = _migrations("--check", db=db)
+    assert check.returncode == 1 and "cash_ledger" in check.stdout and "rows differ" in check.stdout
+
+    rebuild = _migrations("--rebuild", db=db)
+    assert rebuild.returncode == 0, rebuild.stdout + rebuild.stderr
+    assert "rows differ" not in rebuild.stdout
+    with get_connection() as conn:
+        assert _snapshot(conn) == exact
+    assert _migrations("--check", db=db).returncode == 0
@@ -0,0 +1,187 @@
+"""
+OutboxWorker against a real SMTP server (aiosmtpd on localhost).
+
+Run with: python -m pytest tests
+"""
+import socket
+import time
+
+import pandas as pd
+import pytest
+from aiosmtpd.controller import Controller
+
+import email_outbox
+from db_utils import get_connection
+
+REFUSED = "nobody@example.com"
+
+
+class Inbox:
+    """aiosmtpd handler: keeps what it accepts, refuses REFUSED and answers 451 to the first 'flaky' DATAs."""
+
+    def __init__(self, flaky=0):
+        self.messages = []
+        self.flaky = flaky
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REFUSED:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.flaky:
+            self.flaky -= 1
+            return "451 Try again later"
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp():
+    def start(flaky=0):
+        inbox = Inbox(flaky)
+        controller = Controller(inbox, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        servers.append(controller)
+        settings = {"host": "127.0.0.1", "port": controller.port, "starttls": False,
+                    "sender": "lifeos@example.com", "password": ""}
+        return inbox, settings
+
+    servers = []
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+@pytest.fixture
+def outbox(db):
+    """Starts the worker of the test database with the given SMTP settings (stopped at teardown)."""
+    def run_worker(settings):
+        worker = email_outbox.ensure_worker(db, settings)
+        workers.append(worker)
+        return worker
+
+    workers = []
+    yield run_worker
+    for worker in workers:
+        worker.stop(timeout=5)
+
+
+def _row(outbox_id):
+    with get_connection() as conn:
+        return conn.execute("SELECT status, attempts, last_error, sent_at FROM email_outbox WHERE id = ?",
+                            (outbox_id,)).fetchone()
+
+
+def _wait_for(outbox_id, status, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        row = _row(outbox_id)
+        if row[0] == status:
+            return row
+        time.sleep(0.05)
+    pytest.fail(f"outbox row {outbox_id} still {_row(outbox_id)} after {timeout}s, expected '{status}'")
+
+
+def test_sent(smtp, outbox):
+    inbox, settings = smtp()
+    outbox(settings)
+    outbox_id = email_outbox.enqueue_report("me@example.com", "LifeOS Auto-Report: 2026-09", "body",
+                                            report_month="2026-09")
+
+    status, attempts, last_error, sent_at = _wait_for(outbox_id, "sent")
+    assert (attempts, last_error) == (1, None) and sent_at
+    assert [m.rcpt_tos for m in inbox.messages] == [["me@example.com"]]
+    assert "LifeOS Auto-Report: 2026-09" in inbox.messages[0].content.decode()
+    with get_connection() as conn:
+        assert conn.execute("SELECT sent_at FROM report_logs WHERE month_year = '2026-09'").fetchone() == (sent_at,)
+    # Same month again: already queued, nothing new is sent
+    assert email_outbox.enqueue_report("me@example.com", "again", "body", report_month="2026-09") is None
+
+
+def test_transient_failure_is_retried(smtp, outbox, monkeypatch):
+    monkeypatch.setattr(email_outbox, "BACKOFF_SECONDS", 0)
+    inbox, settings = smtp(flaky=2)
+    outbox(settings)
+    outbox_id = email_outbox.enqueue_report("me@example.com", "subject", "body")
+
+    status, attempts, last_error, sent_at = _wait_for(outbox_id, "sent")
+    assert attempts == 3 and last_error is None
+    assert len(inbox.messages) == 1
+
+
+def test_retries_run_out(smtp, outbox, monkeypatch):
+    monkeypatch.setattr(email_outbox, "BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(email_outbox, "MAX_ATTEMPTS", 3)
+    inbox, settings = smtp(flaky=10)
+    outbox(settings)
+    outbox_id = email_outbox.enqueue_report("me@example.com", "subject", "body")
+
+    status, attempts, last_error, sent_at = _wait_for(outbox_id, "failed")
+    assert attempts == 3 and sent_at is None
+    assert last_error.startswith("SMTPDataError") and "451" in last_error
+    assert inbox.messages == []
+
+
+def test_backoff_keeps_row_pending(smtp, outbox):
+    inbox, settings = smtp(flaky=1)
+    outbox(settings)
+    outbox_id = email_outbox.enqueue_report("me@example.com", "subject", "body")
+
+    deadline = time.monotonic() + 10
+    while _row(outbox_id)[2] is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    status, attempts, last_error, sent_at = _row(outbox_id)
+    assert (status, attempts) == ("pending", 1) and "451" in last_error
+    with get_connection() as conn:
+        due = conn.execute("SELECT next_attempt_at > datetime('now', 'localtime') FROM email_outbox "
+                           "WHERE id = ?", (outbox_id,)).fetchone()[0]
+    assert due == 1
+
+
+def test_refused_recipient_fails_without_retry(smtp, outbox):
+    inbox, settings = smtp()
+    outbox(settings)
+    outbox_id = email_outbox.enqueue_report(REFUSED, "subject", "body")
+
+    status, attempts, last_error, sent_at = _wait_for(outbox_id, "failed")
+    assert attempts == 1 and last_error.startswith("SMTPRecipientsRefused")
+
+
+def test_recent_outbox_follows_the_worker(smtp, outbox):
+    inbox, settings = smtp()
+    outbox(settings)
+    assert email_outbox.recent_outbox().empty
+    outbox_id = email_outbox.enqueue_report("me@example.com", "subject", "body")
+    _wait_for(outbox_id, "sent")
+    assert email_outbox.recent_outbox()[["id", "status"]].values.tolist() == [[outbox_id, "sent"]]
+
+
+def _claimed_row(subject, seconds_ago):
+    """A row some worker claimed 'seconds_ago' and is (or was) sending."""
+    claimed_at = (pd.Timestamp.now() - pd.Timedelta(seconds=seconds_ago)).strftime("%Y-%m-%d %H:%M:%S")
+    with get_connection() as conn:
+        return conn.execute("""INSERT INTO email_outbox (recipient, subject, body, status, attempts, next_attempt_at,
+                                                         created_at, claimed_at)
+                               VALUES ('me@example.com', ?, 'body', 'sending', 1, ?, ?, ?)""",
+                            (subject, claimed_at, claimed_at, claimed_at)).lastrowid
+
+
+def test_only_abandoned_claims_are_resent(smtp, outbox):
+    inbox, settings = smtp()
+    abandoned = _claimed_row("abandoned", email_outbox.STALE_CLAIM_SECONDS + 60)
+    in_flight = _claimed_row("in flight", 5)
+    outbox(settings)
+
+    status, attempts, _, _ = _wait_for(abandoned, "sent")
+    assert attempts == 2
+    # Claimed moments ago by another live worker: left alone, never sent twice
+    assert _row(in_flight)[:2] == ("sending", 1)
+    assert [m.content.decode().count("Subject: abandoned") for m in inbox.messages] == [1]
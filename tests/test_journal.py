@@ -0,0 +1,36 @@
+"""Legacy CSV import of the Finance Operations journal (journal.open_journal)."""
+from journal import open_journal, rejected_rows
+
+LEGACY = ('Data,Categoria,Descrição,Valor,Tipo\n'
+          '2026-01-01,Moradia,"two\nlines",10,Despesa\n'
+          '2026-01-02,Lazer,cinema,,Despesa\n'
+          '2026-01-03,Salário,bonus,500,Transfer\n'
+          'someday,Lazer,bar,30,Despesa\n'
+          '2026-01-04,Salário,pay,1000.5,Receita\n')
+
+
+def test_bad_legacy_rows_are_skipped_and_listed(tmp_path):
+    legacy = tmp_path / "finances.csv"
+    legacy.write_text(LEGACY, encoding="utf-8")
+    path = str(tmp_path / "finances.journal")
+
+    journal = open_journal(path, legacy_csv=str(legacy))
+    assert len(journal) == 2
+    assert journal.totals() == {"Despesa": 10.0, "Receita": 1000.5, "Investimento": 0.0}
+
+    rejected = rejected_rows(path)
+    assert rejected["line"].tolist() == [4, 5, 6]
+    assert [reason.split()[0] for reason in rejected["reason"]] == ["Valor", "Tipo", "Data"]
+    assert rejected["Descrição"].tolist() == ["cinema", "bonus", "bar"]
+
+    # Imported once: reopening neither re-imports nor forgets the rejects
+    assert len(open_journal(path, legacy_csv=str(legacy))) == 2
+    assert len(rejected_rows(path)) == 3
+
+
+def test_clean_import_has_no_rejects(tmp_path):
+    legacy = tmp_path / "finances.csv"
+    legacy.write_text("Data,Categoria,Descrição,Valor,Tipo\n2026-01-01,Moradia,rent,10,Despesa\n", encoding="utf-8")
+    path = str(tmp_path / "finances.journal")
+    assert len(open_journal(path, legacy_csv=str(legacy))) == 1
+    assert rejected_rows(path).empty
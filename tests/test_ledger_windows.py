@@ -0,0 +1,66 @@
+"""Keyset pages of the ledger views (data_layer.fetch_window) and the pending-row readers."""
+import pandas as pd
+
+from aggregations import receivables, unpaid_in_month
+from data_layer import count_window, fetch_window, load_data, pending_rows
+from db_utils import get_connection
+from money import from_cents
+
+
+def _seed(rows):
+    with get_connection() as conn:
+        conn.executemany('INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) '
+                         "VALUES (?, 'Food', ?, 10, 'Pix', ?)", rows)
+
+
+def _page_through(size, **filters):
+    ids, cursor = [], None
+    while True:
+        page, cursor = fetch_window("expenses", size, cursor, **filters)
+        ids.extend(page["id"].tolist())
+        if cursor is None:
+            return ids
+
+
+def test_null_date_rows_are_paged(db):
+    # Same-day rows straddle page boundaries; the row whose date was cleared (Ledger Mode) comes last
+    _seed([(f"2026-0{1 + i // 4}-{10 + i % 2}", f"item {i}", i % 2) for i in range(16)]
+          + [(None, "no date", 0)])
+
+    for size in (5, 16, 25):
+        ids = _page_through(size)
+        assert len(ids) == len(set(ids)) == count_window("expenses") == 17
+    last, _ = fetch_window("expenses", 25)
+    assert last["Item"].iloc[-1] == "no date" and last["Date"].isna().iloc[-1]
+
+    pending = _page_through(3, paid=0)
+    assert len(pending) == len(set(pending)) == count_window("expenses", paid=0) == 9
+
+
+def test_null_paid_rows_are_pending(db):
+    _seed([("2026-09-10", "null flag", None), ("2026-09-11", "unpaid", 0), ("2026-09-12", "paid", 1)])
+
+    page, _ = fetch_window("expenses", 25, paid=0)
+    assert page["Item"].tolist() == ["unpaid", "null flag"] and count_window("expenses", paid=0) == 2
+    assert sorted(unpaid_in_month("2026-09")["Item"]) == ["null flag", "unpaid"]
+
+
+def test_receivables_match_the_ledger(db):
+    today = pd.Timestamp.now().normalize()
+    days = [today + pd.Timedelta(days=n) for n in (-40, -1, 0, 3, 45)]
+    with get_connection() as conn:
+        conn.executemany("INSERT INTO incomes (Date, Category, Item, Price, paid) VALUES (?, 'Job', ?, ?, ?)",
+                         [(day.strftime("%Y-%m-%d") if day is not None else None, f"i{n}", 100.1 * (n + 1), paid)
+                          for n, (day, paid) in enumerate([(d, p) for d in days + [None] for p in (0, 1, None)])])
+
+    # What the Incomes page used to compute from the whole ledger in pandas
+    ledger = load_data("incomes")
+    pending = ledger[ledger["paid"] == 0]
+    month = pending[(pending["Date"] >= today) & (pending["Date"].dt.strftime("%Y-%m") == today.strftime("%Y-%m"))]
+    expected = {"overdue": from_cents(pending[pending["Date"] < today]["cents"].sum()),
+                "month": from_cents(month["cents"].sum()), "total": from_cents(pending["cents"].sum())}
+
+    assert receivables(today.strftime("%Y-%m-%d")) == expected
+    rows = pending_rows("incomes")
+    assert rows["id"].tolist() == pending.sort_values("Date", kind="stable")["id"].tolist()
+    assert rows.dtypes.to_dict() == ledger.dtypes.to_dict()
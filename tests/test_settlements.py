@@ -0,0 +1,48 @@
+"""settle / undo_settlement on rows whose paid flag is NULL (read as accounts.PAID_DEFAULTS)."""
+from db_utils import get_connection
+from settlements import settle, undo_settlement
+
+
+def _rows(table_name):
+    with get_connection() as conn:
+        return conn.execute(f"SELECT id, paid, settlement_id FROM {table_name} ORDER BY id").fetchall()
+
+
+def _open_statement_cents():
+    with get_connection() as conn:
+        return conn.execute("SELECT COALESCE(SUM(open_cents), 0) FROM card_statements").fetchone()[0]
+
+
+def test_null_paid_expense_is_settled_and_undone(db):
+    with get_connection() as conn:
+        conn.executemany('INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) '
+                         "VALUES ('2026-09-10', 'Food', ?, 10, 'Visa', ?)", [("null flag", None), ("unpaid", 0)])
+    assert _open_statement_cents() == 2000
+
+    result = settle("expenses", card="Visa", cycle="2026-09")
+    assert result["rows"] == 2 and result["amount"] == 20
+    assert [paid for _, paid, _ in _rows("expenses")] == [1, 1]
+    assert _open_statement_cents() == 0
+
+    assert undo_settlement(result["batch_id"])["rows"] == 2
+    assert _rows("expenses") == [(1, 0, None), (2, 0, None)]
+    assert _open_statement_cents() == 2000
+
+
+def test_null_paid_income_counts_as_received(db):
+    with get_connection() as conn:
+        conn.execute("INSERT INTO incomes (Date, Category, Item, Price, paid) "
+                     "VALUES ('2026-09-10', 'Salary', 'pay', 100, NULL)")
+    assert settle("incomes", ids=[1])["rows"] == 0
+
+
+def test_undo_skips_rows_unpaid_by_hand(db):
+    with get_connection() as conn:
+        conn.executemany('INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) '
+                         "VALUES ('2026-09-10', 'Food', ?, 10, 'Pix', 0)", [("a",), ("b",)])
+    batch_id = settle("expenses", ids=[1, 2])["batch_id"]
+    with get_connection() as conn:
+        # A NULL expense flag is unpaid: the row leaves the batch like one set to 0
+        conn.execute("UPDATE expenses SET paid = NULL WHERE id = 2")
+    assert _rows("expenses")[1] == (2, None, None)
+    assert undo_settlement(batch_id)["rows"] == 1
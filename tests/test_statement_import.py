@@ -0,0 +1,32 @@
+"""CSV statement imports: layout errors and payment-method defaults."""
+import io
+
+import pytest
+
+from db_utils import get_connection
+from statement_import import DEFAULT_PAYMENT_METHOD, StatementFormatError, import_statement
+
+
+def _expenses():
+    with get_connection() as conn:
+        return conn.execute('SELECT Date, Item, Price, "Payment Method" FROM expenses ORDER BY id').fetchall()
+
+
+@pytest.mark.parametrize("csv, missing", [
+    ("Categoria,Descrição,Valor,Tipo\nFood,Lunch,25.50,Despesa\n", "'Date'"),
+    ("Data,Categoria,Descrição,Tipo\n2026-09-10,Food,Lunch,Despesa\n", "'Price'"),
+])
+def test_missing_required_column_is_named(db, csv, missing):
+    with pytest.raises(StatementFormatError, match=missing):
+        import_statement(io.StringIO(csv))
+    assert _expenses() == []
+
+
+def test_finances_csv_without_payment_method(db):
+    csv = "Data,Categoria,Descrição,Valor,Tipo\n2026-09-10,Food,Lunch,25.50,Despesa\n2026-09-11,Job,Pay,900,Receita\n"
+    report = import_statement(io.StringIO(csv))
+    assert (report["inserted"], report["skipped"]) == (1, 1)
+    assert _expenses() == [("2026-09-10", "Lunch", 25.5, DEFAULT_PAYMENT_METHOD)]
+
+    import_statement(io.StringIO(csv.replace("Lunch", "Dinner")), payment_method="Cash")
+    assert _expenses()[-1] == ("2026-09-10", "Dinner", 25.5, "Cash")
@@ -0,0 +1,28 @@
+import importlib
+
+from data_layer import load_datasets
+
+# Page name -> (module in views/, shared datasets it reads up front).
+# Modules are imported on first visit and stay in sys.modules, so a rerun only calls render().
+PAGES = {
+    "📊 Dashboard": ("overview", ("investments", "budgets")),
+    "📈 Investments": ("investments", ()),
+    "🎖️ Wealth Command": ("wealth", ("investments",)),
+    "English Training": ("english", ()),
+    "Project Management": ("projects", ()),
+    "💸 Expenses": ("expenses", ()),
+    "💰 Incomes": ("incomes", ()),
+    "🎯 Set Budgets": ("budgets", ()),
+    "💳 Manage Cards": ("cards", ()),
+    "🔄 Recurring": ("recurring", ()),
+    "🏷️ Categories": ("categories", ()),
+}
+
+
+def render_page(page):
+    """Loads only the datasets the page declared, then draws it."""
+    if page not in PAGES:
+        return
+    module_name, datasets = PAGES[page]
+    module = importlib.import_module(f"views.{module_name}")
+    module.render(load_datasets(datasets))
@@ -0,0 +1,32 @@
+import streamlit as st
+from db_utils import run_query
+from data_layer import load_data
+
+
+def render(data):
+    """Monthly spending limits per category."""
+    st.markdown("## 🎯 Financial Guardrails")
+
+    # Fetch latest to show current values in the input boxes
+    latest_budgets = load_data("budgets")
+
+    with st.form("budget_form"):
+        # English Student Tip: Use "Thresholds" or "Allocations" for a native feel
+        st.markdown("### Monthly Thresholds")
+
+        # Get categories from your CATEGORIES table to stay synchronized
+        # This prevents setting a budget for a category that doesn't exist
+        cats = ["Food", "Transport", "Housing", "Fun", "Investments"]
+        new_b = {}
+
+        for c in cats:
+            existing = latest_budgets[latest_budgets['category'] == c]['amount'].values
+            new_b[c] = st.number_input(f"Monthly Limit: {c}",
+                                       value=float(existing[0]) if len(existing) > 0 else 0.0,
+                                       step=50.0)
+
+        if st.form_submit_button("Update System Guardrails"):
+            for c, a in new_b.items():
+                run_query("INSERT OR REPLACE INTO budgets (category, amount) VALUES (?, ?)", (c, a))
+            st.success("Guardrails updated successfully!")
+            st.rerun()
@@ -0,0 +1,42 @@
+import streamlit as st
+from db_utils import run_query
+from data_layer import load_data
+
+
+def render(data):
+    """Credit cards and their billing cycle days."""
+    st.title("💳 Manage Cards")
+
+    # THE FORM (Missing in previous snippet)
+    with st.form("card_form", clear_on_submit=True):
+        c1, c2, c3 = st.columns(3)
+        name = c1.text_input("Card Name (e.g. Nubank, Inter)")
+        closing = c2.number_input("Closing Day", 1, 31, 1)
+        due = c3.number_input("Due Day", 1, 31, 10)
+
+        if st.form_submit_button("Save New Card"):
+            if name:
+                # We insert with active=1 by default
+                run_query("INSERT INTO cards (card_name, closing_day, due_day, active) VALUES (?, ?, ?, 1)",
+                          (name, int(closing), int(due)))
+                st.success(f"Card {name} added!")
+                st.rerun()
+
+    st.divider()
+    df_cards = load_data("cards")
+    if not df_cards.empty:
+        col_view, col_status = st.columns([3, 1])
+        with col_view:
+            st.dataframe(df_cards, use_container_width=True, hide_index=True)
+        with col_status:
+            st.markdown("⚙️ **Toggle Status**")
+            options = (df_cards["id"].astype(str) + " - " + df_cards["card_name"]).tolist()
+            target = st.selectbox("Select Card", options, key="status_card_ui")
+
+            c1, c2 = st.columns(2)
+            if c1.button("✅ Active"):
+                run_query("UPDATE cards SET active = 1 WHERE id = ?", (target.split(" - ")[0],))
+                st.rerun()
+            if c2.button("❌ Inactive"):
+                run_query("UPDATE cards SET active = 0 WHERE id = ?", (target.split(" - ")[0],))
+                st.rerun()
@@ -0,0 +1,29 @@
+import streamlit as st
+from db_utils import run_query
+from data_layer import load_data
+
+
+def render(data):
+    """Expense, income and investment categories."""
+    st.title("🏷️ Category Management")
+
+    with st.form("cat_form", clear_on_submit=True):
+        c1, c2 = st.columns(2)
+        new_cat = c1.text_input("New Category Name")
+        cat_type = c2.selectbox("Type", ["Expense", "Income", "Investment"])
+        if st.form_submit_button("Add Category"):
+            if new_cat:
+                run_query("INSERT INTO categories (name, type) VALUES (?, ?)", (new_cat, cat_type))
+                st.success(f"Category '{new_cat}' added!")
+                st.rerun()
+
+    st.divider()
+    df_cats_display = load_data("categories")
+    if not df_cats_display.empty:
+        st.dataframe(df_cats_display, use_container_width=True, hide_index=True)
+
+        # Delete Category
+        target_cat = st.selectbox("Select Category to Delete", df_cats_display['name'].tolist())
+        if st.button("Delete Category"):
+            run_query("DELETE FROM categories WHERE name = ?", (target_cat,))
+            st.rerun()
@@ -0,0 +1,59 @@
+import streamlit as st
+
+from data_layer import PAGE_SIZES, count_window, fetch_window
+
+
+# --- UI HELPER FUNCTIONS ---
+def metric_card(label, value, color_bg, color_text, desc=""):
+    """
+    Standardized Fintech Metric Card.
+    """
+    st.markdown(f"""
+    <div style="background: {color_bg}; padding: 18px; border-radius: 12px; border-left: 5px solid {color_text}; text-align: center; height: 120px; border-top: 1px solid rgba(255,255,255,0.05);">
+        <p style="color: #8B949E; font-size: 11px; font-weight: bold; margin:0; text-transform: uppercase; letter-spacing: 0.5px;">{label}</p>
+        <h2 style="margin:5px 0; border:none; font-size: 24px; color: white; font-weight: 800;">R$ {value:,.2f}</h2>
+        <p style="margin:0; color: {color_text}; font-size: 11px; font-weight: bold; opacity: 0.9;">{desc}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def plotly_express():
+    """plotly.express, imported the first time a chart is actually drawn (it's the slowest import we have)."""
+    import plotly.express as px
+    return px
+
+
+def _turn_page(state, step):
+    if step > 0 and state["next"] is not None:
+        state["cursors"].append(state["next"])
+    elif step < 0 and len(state["cursors"]) > 1:
+        state["cursors"].pop()
+
+
+def ledger_window(table_name, key, paid=None, categories=(), search=""):
+    """
+    Paginated ledger view: page-size picker, 'rows x-y of total' and Prev/Next.
+    Returns (page, page_key): only the visible page (data_layer.fetch_window, newest first), and
+    a key unique to that page for editors fed with it (a keyed st.data_editor keeps its pending
+    edits by row position, which must not carry over to another page).
+    The cursors of the pages already visited stay in session_state; a filter change goes back to page 1.
+    """
+    c_size, c_info, c_prev, c_next = st.columns([1, 2, 1, 1])
+    size = c_size.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+
+    filters = (size, paid, tuple(categories), search)
+    state = st.session_state.get(key)
+    if state is None or state["filters"] != filters:
+        generation = state["generation"] + 1 if state else 0
+        state = st.session_state[key] = {"filters": filters, "cursors": [None], "next": None,
+                                         "generation": generation}
+
+    page, state["next"] = fetch_window(table_name, size, state["cursors"][-1], paid, categories, search)
+    total = count_window(table_name, paid, categories, search)
+    first = (len(state["cursors"]) - 1) * size
+    c_info.caption(f"Rows {first + 1 if len(page) else 0}–{first + len(page)} of {total:,}")
+    c_prev.button("◀ Prev", key=f"{key}_prev", use_container_width=True, disabled=len(state["cursors"]) == 1,
+                  on_click=_turn_page, args=(state, -1))
+    c_next.button("Next ▶", key=f"{key}_next", use_container_width=True, disabled=state["next"] is None,
+                  on_click=_turn_page, args=(state, 1))
+    return page, f"{key}_{state['generation']}_{len(state['cursors'])}"
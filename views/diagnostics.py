@@ -0,0 +1,49 @@
+import pandas as pd
+import streamlit as st
+from query_profiler import PROFILER
+
+
+def session_settings():
+    """This session's profiling switches (PROFILER's defaults until the sidebar widgets are touched)."""
+    state = st.session_state
+    return {"enabled": state.get("diag_enabled", PROFILER.enabled),
+            "explain_slow": state.get("diag_explain", PROFILER.explain_slow),
+            "slow_ms": state.get("diag_slow_ms", PROFILER.slow_ms)}
+
+
+def render_panel(rerun):
+    """Sidebar 'Query Diagnostics': profiling switches plus what the rerun that just ran did."""
+    with st.sidebar.expander("🩺 Query Diagnostics"):
+        # Per-session switches: kept in st.session_state and handed to PROFILER.begin_rerun by
+        # dashboard.py on the next rerun, never written to the process-wide profiler
+        settings = session_settings()
+        enabled = st.toggle("Record queries", value=settings["enabled"], key="diag_enabled")
+        st.toggle("EXPLAIN slow statements", value=settings["explain_slow"], key="diag_explain",
+                  disabled=not enabled)
+        st.number_input("Slow threshold (ms)", min_value=1.0, value=settings["slow_ms"], step=10.0,
+                        key="diag_slow_ms")
+
+        if rerun is None:
+            st.caption("Nothing recorded for this click. Enable recording and interact with a page.")
+            return
+
+        stmts = pd.DataFrame(rerun["statements"], columns=["sql", "ms", "rows", "many", "plan"])
+        c1, c2 = st.columns(2)
+        c1.metric("Queries / click", len(stmts))
+        c2.metric("SQL time", f"{stmts['ms'].sum():,.1f} ms")
+
+        if not stmts.empty:
+            by_sql = (stmts.groupby("sql", sort=False)
+                      .agg(calls=("ms", "size"), total_ms=("ms", "sum"), rows=("rows", "sum"))
+                      .sort_values("total_ms", ascending=False).reset_index())
+            st.dataframe(by_sql, hide_index=True, use_container_width=True,
+                         column_config={"total_ms": st.column_config.NumberColumn("ms", format="%.1f")})
+
+            for _, slow in stmts[stmts["plan"].notna()].iterrows():
+                st.markdown(f"**{slow['ms']:.1f} ms** · {slow['rows']} rows")
+                st.code(slow["sql"] + "\n-- " + "\n-- ".join(slow["plan"]), language="sql")
+
+        if PROFILER.recent:
+            st.markdown("##### Recent clicks")
+            st.dataframe(pd.DataFrame(list(PROFILER.recent)[::-1]), hide_index=True, use_container_width=True)
+        st.caption(f"Log: {PROFILER.log_path}")
@@ -0,0 +1,115 @@
+import streamlit as st
+import pandas as pd
+from db_utils import run_query
+
+
+def render(data):
+    """English vocabulary and daily habit tracking."""
+    st.markdown("<h1>🇺🇸 English Proficiency Hub</h1>", unsafe_allow_html=True)
+    today_date = pd.Timestamp.now().strftime("%Y-%m-%d")
+
+    col_rituals, col_vocab = st.columns([1, 1.3])
+
+    # --- LEFT: DAILY RITUALS (Consistency Engine) ---
+    with col_rituals:
+        st.markdown('<div class="fintech-card">', unsafe_allow_html=True)
+        st.markdown("### ✍️ Daily Rituals")
+
+        # Fetch Master List and Today's Progress
+        res_master = run_query("SELECT id, habit_name FROM habit_list")
+        master_habits = res_master if res_master is not None and not res_master.empty else pd.DataFrame()
+
+        res_done = run_query("SELECT habit_name FROM daily_habits WHERE date = ?", (today_date,))
+        done_today = res_done["habit_name"].tolist() if res_done is not None and not res_done.empty else []
+
+        if not master_habits.empty:
+            for _, h_row in master_habits.iterrows():
+                h_name = h_row['habit_name']
+                h_id = h_row['id']
+                is_done = h_name in done_today
+
+                # Layout for Ritual Row
+                r_col1, r_col2 = st.columns([5, 1])
+
+                # Checkbox for Completion
+                if r_col1.checkbox(h_name, value=is_done, key=f"rit_{h_id}_{today_date}"):
+                    if not is_done:
+                        run_query("INSERT INTO daily_habits (habit_name, date, completed) VALUES (?, ?, 1)",
+                                  (h_name, today_date))
+                        st.rerun()
+                elif is_done:
+                    run_query("DELETE FROM daily_habits WHERE habit_name = ? AND date = ?", (h_name, today_date))
+                    st.rerun()
+        else:
+            st.info("No rituals defined. Provision your training plan below.")
+
+        st.markdown("---")
+
+        # --- THE MANAGEMENT ZONE (Fixes the delete issue) ---
+        with st.expander("⚙️ System Housekeeping (Manage Rituals)"):
+            # ADD NEW
+            new_h = st.text_input("New Ritual Name", placeholder="e.g. Read 5 pages")
+            if st.button("Add to Master List", use_container_width=True):
+                if new_h:
+                    run_query("INSERT INTO habit_list (habit_name) VALUES (?)", (new_h.strip(),))
+                    st.rerun()
+
+            st.divider()
+
+            # DELETE EXISTING
+            if not master_habits.empty:
+                st.caption("⚠️ Destructive Action: Remove Habit Forever")
+                target_to_del = st.selectbox("Select Habit to Purge", master_habits['habit_name'].tolist())
+                if st.button("🗑️ Purge Habit from System", use_container_width=True):
+                    # Delete from Master List
+                    run_query("DELETE FROM habit_list WHERE habit_name = ?", (target_to_del,))
+                    # Also delete historical logs to keep DB clean (Referential Integrity)
+                    run_query("DELETE FROM daily_habits WHERE habit_name = ?", (target_to_del,))
+                    st.warning(f"Habit '{target_to_del}' has been decommissioned.")
+                    st.rerun()
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # --- RIGHT: EXPRESSION CAPTURE (The Lexicon) ---
+    with col_vocab:
+        st.markdown('<div class="fintech-card">', unsafe_allow_html=True)
+        st.markdown("### 📓 Expression Capture")
+
+        with st.container():
+            c1, c2 = st.columns([1, 2])
+            word_input = c1.text_input("New Term", key="vocab_term", placeholder="Slang / Idiom")
+            sent_input = c2.text_input("Usage Context", key="vocab_sent", placeholder="Usage context...")
+
+            if st.button("💾 Commit to Memory", use_container_width=True):
+                if word_input:
+                    run_query("INSERT INTO vocabulary (word, sentence, date) VALUES (?, ?, ?)",
+                              (word_input.strip(), sent_input.strip(), today_date))
+                    st.toast(f"Logged: {word_input}")
+                    st.rerun()
+
+        st.markdown("---")
+
+        # Display acquisitions
+        df_vocab = run_query("SELECT id, word, sentence FROM vocabulary ORDER BY id DESC LIMIT 6")
+
+        if df_vocab is not None and not df_vocab.empty:
+            st.markdown("#### 📜 Recent Acquisitions")
+            for _, row in df_vocab.iterrows():
+                context = row['sentence'] if row['sentence'] else "No context recorded."
+                st.markdown(f"""
+                    <div style="background: rgba(255,255,255,0.03); padding: 10px; border-radius: 8px; margin-bottom: 8px; border-left: 3px solid #58a6ff;">
+                        <strong style="color: #58a6ff;">{row['word']}</strong><br>
+                        <small style="color: #8B949E; font-style: italic;">{context}</small>
+                    </div>
+                """, unsafe_allow_html=True)
+
+            # --- NEW DELETE LOGIC FOR VOCAB ---
+            with st.expander("🗑️ Delete Expressions"):
+                vocab_options = (df_vocab["id"].astype(str) + " - " + df_vocab["word"]).tolist()
+                to_delete = st.selectbox("Select term to purge", vocab_options)
+                if st.button("Purge from Lexicon"):
+                    run_query("DELETE FROM vocabulary WHERE id = ?", (to_delete.split(" - ")[0],))
+                    st.success("Word removed.")
+                    st.rerun()
+        else:
+            st.caption("The lexicon is currently empty.")
+        st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,161 @@
+import streamlit as st
+from db_utils import run_query, run_many
+from data_layer import load_data, editable, ledger_categories
+from batch_writer import apply_ledger_changes
+from installments import generate_installments
+from statement_import import StatementFormatError, import_statement
+from views.components import ledger_window
+
+
+def render(data):
+    """Expense entry (with installments), statement import and ledger maintenance."""
+    st.markdown("## 💸 Expense Management")
+
+    # 1. FETCH LATEST CATEGORIES (The Fix for Cybersecurity)
+    df_cats_local = load_data("categories")
+    if not df_cats_local.empty:
+        # Filter by type and sort by name
+        expense_cats = df_cats_local[df_cats_local['type'] == 'Expense'].sort_values("name")['name'].tolist()
+    else:
+        expense_cats = sorted(["Food", "Transport", "Housing", "Fun", "Investments"])  # Fallback
+
+    # Fallback in case the category table is empty
+    if not expense_cats:
+        expense_cats = ["Food", "Transport", "Housing", "Fun", "Investments"]
+
+    with st.expander("➕ New Transaction", expanded=True):
+        with st.form("expense_form", clear_on_submit=True):
+            r1c1, r1c2, r1c3 = st.columns([1, 2, 1])
+            d, item, pr = r1c1.date_input("Date"), r1c2.text_input("Item"), r1c3.number_input("Price", step=0.01)
+
+            r2c1, r2c2, r2c3 = st.columns(3)
+
+            # USE THE DYNAMIC LIST HERE
+            cat = r2c1.selectbox("Category", expense_cats)
+
+            cards_df = load_data("cards")
+            # Only show active cards
+            card_list = (cards_df[cards_df['active'] == 1]['card_name'].tolist() if not cards_df.empty else [])
+            meth = r2c2.selectbox("Method", ["Pix", "Cash"] + card_list)
+
+            inst = r2c3.number_input("Installments", 1, 24, 1)
+
+            if st.form_submit_button("Confirm Transaction"):
+                # 1. Ensure 'd' is converted to a string format SQLite likes if it isn't already
+                rows = generate_installments(d, item, pr, cat, meth, inst)
+
+                # 2. Safety Check: Convert the first element of each tuple (the date) to string
+                # Your current generate_installments might already do this, but let's be explicit:
+                formatted_rows = [
+                    (r[0].strftime("%Y-%m-%d") if not isinstance(r[0], str) else r[0],
+                     r[1], r[2], r[3], r[4], r[5])
+                    for r in rows
+                ]
+
+                run_many(
+                    'INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) VALUES (?, ?, ?, ?, ?, ?)',
+                    formatted_rows)
+                st.toast("Logged!", icon="✅")
+                st.rerun()
+
+    with st.expander("📥 Import Statement (CSV / OFX)"):
+        st.caption("Bank exports, finances_v2.csv or legacy finance.csv. Rows already in the ledger are skipped.")
+        ic1, ic2 = st.columns([3, 1])
+        statement = ic1.file_uploader("Statement file", type=["csv", "ofx", "qfx"], key="stmt_upload")
+        import_method = ic2.selectbox("Default Method", ["Pix", "Cash"] + card_list, key="stmt_method")
+
+        if statement is not None and st.button("Import Statement"):
+            progress_text = st.empty()
+            try:
+                report = import_statement(
+                    statement, payment_method=import_method,
+                    progress=lambda r: progress_text.caption(f"⏳ {r['read']} rows read · {r['inserted']} new"))
+            except StatementFormatError as e:
+                progress_text.empty()
+                st.error(f"❌ Nothing imported: {e}")
+            else:
+                progress_text.empty()
+                st.success(f"✅ {report['inserted']} imported · {report['duplicates']} duplicates skipped · "
+                           f"{report['skipped']} ignored (incomes/invalid)")
+
+    st.divider()
+    st.markdown("### 📜 History & Maintenance")
+
+    # --- 🟢 FILTER & SEARCH SECTION 🟢 ---
+    c_search, c_filter = st.columns([2, 1])
+    search_query = c_search.text_input("🔍 Search Item", placeholder="Search by name...", key="exp_search_box")
+
+    cat_list = ledger_categories("expenses")
+    selected_cats = c_filter.multiselect("📂 Filter Categories", options=cat_list, key="exp_filter_cats")
+
+    # 🟢 Pending items only (paid = 0), filtered in SQLite and fetched one page at a time
+    df_exp_display, _ = ledger_window("expenses", "exp_history_window", paid=0,
+                                      categories=selected_cats, search=search_query)
+    # Date is already parsed by the data layer; paid as boolean for the checkbox column
+    df_exp_display["paid"] = df_exp_display["paid"].astype(bool)
+
+    if not df_exp_display.empty:
+        cv, cd = st.columns([3, 1])
+        with cv:
+            st.dataframe(
+                df_exp_display,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "id": st.column_config.NumberColumn("ID", width="small"),  # 🟢 ID VISIBLE
+                    "Date": st.column_config.DateColumn("Date", format="DD/MM/YYYY"),
+                    "Price": st.column_config.NumberColumn("Price", format="R$ %.2f"),
+                    "paid": st.column_config.CheckboxColumn("Paid?"),
+                    "is_auto": None,
+                    "cents": None,
+                    "settlement_id": None
+                }
+            )
+        with cd:
+            st.markdown("🗑️ **Delete Record**")
+            # Selector remains synced with the filtered view
+            target_list = (df_exp_display["id"].astype(str) + " - " + df_exp_display["Item"]).tolist()
+            target = st.selectbox("Select ID", target_list, key="del_exp_final")
+
+            if st.button("Delete Permanently"):
+                run_query("DELETE FROM expenses WHERE id = ?", (target.split(" - ")[0],))
+                st.toast(f"Record {target.split(' - ')[0]} Removed")
+                st.rerun()
+
+        st.divider()
+        with st.expander("✏️ Correct Expense History (Ledger Mode)"):
+            st.info("Edit cells below to fix typos or wrong values. Changes save instantly.")
+            # Ledger pages through everything (even paid items) to allow full correction
+            df_edit_exp, page_key = ledger_window("expenses", "exp_ledger_window")
+
+            if not df_edit_exp.empty:
+                # --- 🟢 DATA TYPE CONVERSION 🟢 ---
+                # Standardize types to prevent StreamlitAPIException (free-text labels, checkbox paid)
+                df_edit_exp = editable(df_edit_exp)
+                df_edit_exp["paid"] = df_edit_exp["paid"].astype(bool)
+
+                edited_exp = st.data_editor(
+                    df_edit_exp,
+                    key=f"ledger_exp_page_v3_{page_key}",
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        "id": st.column_config.NumberColumn("ID", width="small", disabled=True),
+                        # 🟢 ID VISIBLE & PROTECTED
+                        "paid": st.column_config.CheckboxColumn("Paid?"),
+                        "Date": st.column_config.DateColumn("Date", format="DD/MM/YYYY"),
+                        "Price": st.column_config.NumberColumn("Price", format="R$ %.2f"),
+                        "is_auto": None,
+                        "cents": None,
+                        "settlement_id": None
+                    }
+                )
+
+                # --- 🟢 UPDATE LOGIC (one transaction for every edited row) 🟢 ---
+                if not edited_exp.equals(df_edit_exp):
+                    changes = apply_ledger_changes("expenses", df_edit_exp, edited_exp)
+                    if changes["updated"]:
+                        st.toast(f"Updated {len(changes['updated'])} record(s): IDs {changes['updated']}")
+                        st.rerun()
+
+        st.divider()
@@ -0,0 +1,139 @@
+import streamlit as st
+import pandas as pd
+from db_utils import run_query
+from aggregations import receivables
+from data_layer import load_data, editable, ledger_categories, pending_rows
+from batch_writer import apply_ledger_changes
+from settlements import settle
+from views.components import ledger_window, metric_card
+
+
+def render(data):
+    """Income streams, receivables pipeline and the income ledger."""
+    st.markdown("## 💰 Income Management")
+
+    # --- 1. DATA PREPARATION ---
+    # Only the pending rows and three SQL sums, never the whole income ledger
+    today_str = pd.Timestamp.now().strftime("%Y-%m-%d")
+    radar = receivables(today_str)
+    total_overdue, total_expected_mtd, grand_total_pending = radar["overdue"], radar["month"], radar["total"]
+    active_pending_list = pending_rows("incomes")
+
+    # --- 2. RECEIVABLES RADAR ---
+    st.markdown("### 📡 Receivables Radar")
+    r1, r2, r3 = st.columns(3)
+    with r1:
+        metric_card("⚠️ Total Overdue", total_overdue, "rgba(239, 68, 68, 0.1)", "#ef4444", "Should be in bank")
+    with r2:
+        metric_card("📅 Month Forecast", total_expected_mtd, "rgba(245, 158, 11, 0.1)", "#f59e0b", "Coming soon")
+    with r3:
+        metric_card("💎 Total to Receive", grand_total_pending, "rgba(59, 130, 246, 0.1)", "#3b82f6",
+                    "All Pending Assets")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # --- 3. INPUT FORM ---
+    df_cats_local = load_data("categories")
+    income_cats = df_cats_local[df_cats_local['type'] == 'Income'].sort_values("name")[
+        'name'].tolist() if not df_cats_local.empty else ["Salary"]
+
+    with st.expander("➕ Log New Income Stream", expanded=False):
+        with st.form("income_form", clear_on_submit=True):
+            r1c1, r1c2, r1c3 = st.columns(3)
+            d, cat, pr = r1c1.date_input("Date"), r1c2.selectbox("Category", income_cats), r1c3.number_input("Amount",
+                                                                                                             step=0.01)
+            item = st.text_input("Source/Description")
+            received = st.checkbox("Received (Cash in hand?)", value=True)
+
+            if st.form_submit_button("Confirm & Deposit"):
+                try:
+                    status = 1 if received else 0
+                    run_query('INSERT INTO incomes (Date, Category, Item, Price, paid) VALUES (?, ?, ?, ?, ?)',
+                              (d.strftime("%Y-%m-%d"), cat, item, pr, status))
+                    st.toast("Inflow Recorded!", icon="💰")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Save Failed: {e}")
+
+    st.divider()
+
+    # --- 4. THE ACTION LIST (Awaiting Funds) ---
+    st.markdown("### ⏳ Awaiting Funds")
+    if not active_pending_list.empty:
+        st.caption("Items disappear from here once checked, moving to your permanent history below.")
+
+        # 🟢 Ensure types are correct for the editor
+        active_pending_list["paid"] = active_pending_list["paid"].astype(bool)
+
+        edited_pending = st.data_editor(
+            active_pending_list[["id", "Date", "Category", "Item", "Price", "paid"]],
+            hide_index=True, use_container_width=True, key="action_list_editor",
+            column_config={
+                "id": st.column_config.NumberColumn("ID", width="small"),  # 🟢 ID VISIBLE
+                "Date": st.column_config.DateColumn("Date", format="DD/MM/YYYY"),
+                "paid": st.column_config.CheckboxColumn("Received?"),
+                "Price": st.column_config.NumberColumn("Price", format="R$ %.2f")
+            },
+            disabled=["id", "Date", "Category", "Item", "Price"]  # 🟢 Only 'paid' is editable
+        )
+
+        # Every ticked row in one batch (a single UPDATE), not one write + rerun per row
+        received = edited_pending[edited_pending["paid"]]
+        if not received.empty:
+            result = settle("incomes", ids=received["id"].tolist(), description="Income received")
+            st.toast(f"Income Received: {', '.join(received['Item'].astype(str))} "
+                     f"(Cash: R$ {result['cash_balance']:,.2f})")
+            st.rerun()
+    else:
+        st.success("✨ All current receivables are cleared.")
+
+    st.divider()
+
+    # --- 🟢 5. NEW FILTER & SEARCH SECTION 🟢 ---
+    st.markdown("### 🔍 Filter Historical Records")
+    c_search, c_filter = st.columns([2, 1])
+    search_inc = c_search.text_input("🔍 Search Income Source", placeholder="e.g., Salary, Client X...",
+                                     key="inc_search_box")
+
+    inc_cat_list = ledger_categories("incomes")
+    selected_inc_cats = c_filter.multiselect("📂 Filter Categories", options=inc_cat_list, key="inc_filter_cats")
+
+    # --- 6. THE HISTORICAL LEDGER ---
+    with st.expander("📜 Historical Ledger (Complete Archive)", expanded=True):
+        st.info("Full record of all income. Toggle 'Rec.?' to revert status or use tools to delete.")
+        # Filtered in SQLite, newest first, one page at a time
+        df_history_page, page_key = ledger_window("incomes", "inc_history_window",
+                                                  categories=selected_inc_cats, search=search_inc)
+        df_history_display = editable(df_history_page)
+        df_history_display["paid"] = df_history_display["paid"].astype(bool)
+        if not df_history_display.empty:
+            col_table, col_tools = st.columns([3, 1])
+            with col_table:
+                edited_history = st.data_editor(
+                    df_history_display,
+                    key=f"master_history_editor_v2_{page_key}",
+                    hide_index=True, use_container_width=True,
+                    column_config={
+                        "id": st.column_config.NumberColumn("ID", width="small", disabled=True),
+                        # 🟢 ID VISIBLE & LOCKED
+                        "paid": st.column_config.CheckboxColumn("Rec.?"),
+                        "Date": st.column_config.DateColumn("Date", format="DD/MM/YYYY"),
+                        "Price": st.column_config.NumberColumn("Price", format="R$ %.2f"),
+                        "cents": None,
+                        "settlement_id": None
+                    }
+                )
+
+                if not edited_history.equals(df_history_display):
+                    changes = apply_ledger_changes("incomes", df_history_display, edited_history)
+                    if changes["updated"]:
+                        st.toast(f"Updated Income IDs {changes['updated']}")
+                        st.rerun()
+            with col_tools:
+                st.markdown("🗑️ **Delete Record**")
+                options = (df_history_display["id"].astype(str) + " - " + df_history_display["Item"]).tolist()
+                target = st.selectbox("Select ID", options, key="del_final_inc")
+                if st.button("Confirm Delete"):
+                    run_query("DELETE FROM incomes WHERE id = ?", (target.split(" - ")[0],))
+                    st.toast("Income Record Deleted")
+                    st.rerun()
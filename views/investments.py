@@ -0,0 +1,106 @@
+import streamlit as st
+from db_utils import run_query
+from data_layer import load_data
+from views.components import plotly_express
+
+
+def render(data):
+    """Portfolio strategy: buy/sell log and position tracking."""
+    st.markdown("## 🏛️ Portfolio Strategy")
+    st.markdown("<p style='color: #8B949E; margin-top: -15px;'>Strategic asset management and position tracking.</p>",
+                unsafe_allow_html=True)
+
+    # 1. INPUT & TRANSACTION FORM
+    with st.expander("📝 Log Buy/Sell Transaction", expanded=True):
+        with st.form("inv_form", clear_on_submit=True):
+            c1, c2, c3 = st.columns(3)
+            asset_name = c1.text_input("Asset Ticker (e.g., ALRX11)").upper().strip()
+
+            # Dynamic Categories
+            df_cats_inv = load_data("categories")
+            inv_cats = df_cats_inv[df_cats_inv['type'] == 'Investment']['name'].tolist()
+            category = c2.selectbox("Category", inv_cats if inv_cats else ["Stocks", "FIIs", "Crypto"])
+            purchase_date = c3.date_input("Transaction Date")
+
+            c4, c5 = st.columns(2)
+            quantity = c4.number_input("Quantity to Add", min_value=0.0, step=1.0,
+                                       help="Amount purchased in this transaction")
+            total_paid = c5.number_input("Total Price Paid", min_value=0.0, step=10.0,
+                                         help="Total cost of this specific transaction")
+
+            if st.form_submit_button("Log Transaction"):
+                if asset_name and quantity > 0:
+                    # THE ACCUMULATOR LOGIC:
+                    # If ticker exists, ADD quantity and amount. If not, INSERT new.
+                    run_query("""
+                              INSERT INTO investments (Asset, Category, Date, Quantity, Amount, Current_Value)
+                              VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(Asset) DO
+                              UPDATE
+                              SET
+                                  Quantity = Quantity + excluded.Quantity, Amount = Amount + excluded.Amount, Date = excluded.Date, Category = excluded.Category
+                              """, (asset_name, category, purchase_date, quantity, total_paid, total_paid))
+
+                    st.success(f"Successfully added {quantity} units to {asset_name}!")
+                    st.rerun()
+
+    # 2. DATA LOAD
+    df_inv = load_data("investments")
+
+    if not df_inv.empty:
+        # Avoid division by zero
+        df_inv['Avg Price'] = df_inv['Amount'] / df_inv['Quantity'].replace(0, 1)
+
+        # --- TOP METRICS ---
+        total_invested = df_inv["Amount"].sum()
+        m1, m2 = st.columns(2)
+        with m1:
+            st.metric("TOTAL CAPITAL ALLOCATED", f"R$ {total_invested:,.2f}")
+        with m2:
+            st.metric("TOTAL ASSETS", len(df_inv), delta="Active Positions")
+
+        # --- VISUAL CHARTS ---
+        px = plotly_express()
+        st.divider()
+        col_chart1, col_chart2 = st.columns(2)
+
+        with col_chart1:
+            st.markdown("#### 📁 Asset Allocation")
+            fig_pie = px.pie(df_inv, values="Amount", names="Category", hole=0.5,
+                             template="plotly_dark", color_discrete_sequence=px.colors.sequential.Blues_r)
+            fig_pie.update_layout(margin=dict(t=20, b=20, l=0, r=0), showlegend=True)
+            st.plotly_chart(fig_pie, use_container_width=True)
+
+        with col_chart2:
+            st.markdown("#### 📊 Portfolio Concentration")
+            fig_bar = px.bar(df_inv, x="Asset", y="Amount", color="Category",
+                             template="plotly_dark", text_auto='.2s')
+            fig_bar.update_layout(margin=dict(t=20, b=20, l=0, r=0))
+            st.plotly_chart(fig_bar, use_container_width=True)
+
+        # --- 3. THE LEDGER (The Table) ---
+        st.divider()
+        st.markdown("### 📜 Portfolio Ledger")
+
+        # Wrapped in a container for design
+        st.markdown('<div class="fintech-card">', unsafe_allow_html=True)
+        st.dataframe(
+            df_inv[["Asset", "Category", "Quantity", "Avg Price", "Amount"]],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Asset": st.column_config.TextColumn("Ticker"),
+                "Avg Price": st.column_config.NumberColumn("Avg. Cost", format="R$ %.2f"),
+                "Amount": st.column_config.NumberColumn("Total Cost", format="R$ %.2f"),
+                "Quantity": st.column_config.NumberColumn("Total Qty")
+            }
+        )
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        # 4. DELETE / LIQUIDATE
+        with st.expander("🗑️ Close Position"):
+            st.warning("This will permanently remove the asset record from your ledger.")
+            target_del = st.selectbox("Select ticker to remove", df_inv["Asset"].tolist(), key="del_inv_selector")
+            if st.button("Delete Asset Permanently"):
+                run_query("DELETE FROM investments WHERE Asset = ?", (target_del,))
+                st.success(f"Position {target_del} liquidated.")
+                st.rerun()
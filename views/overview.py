@@ -0,0 +1,367 @@
+import streamlit as st
+import pandas as pd
+from db_utils import run_query
+from email_outbox import enqueue_report, recent_outbox
+from reports import monthly_summary_text
+from recurring_schedule import recurring_occurrences
+from forecasting import cash_flow_forecast
+from accounts import DIRECT_METHODS
+from aggregations import (month_metrics, cash_balance, category_totals, unpaid_in_month,
+                          month_item_names, range_monthly_totals)
+from dateutil.relativedelta import relativedelta
+from money import from_cents, to_cents
+from settlements import recent_settlements, settle, undo_settlement
+from statements import month_statements, settle_statement
+from views.components import metric_card, plotly_express
+
+
+def render(data):
+    """Command center: capital, monthly velocity, budgets, settlements and the Intelligence Hub."""
+
+    # --- 1. DATA PREP (Unified Pipeline) ---
+    today = pd.Timestamp.now()
+    curr_month_str = today.strftime("%Y-%m")
+    view_month_start = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    df_inv, df_budgets = data["investments"], data["budgets"]
+
+    # --- 🟢 RECURRING LOGIC (Historical & Birth-Date Integrity) 🟢 ---
+    # This month's bill of every active subscription born by the 1st, read from recurring_projection
+    df_rec_simulated = recurring_occurrences(view_month_start, view_month_start)
+
+    # --- 🔵 MONTHLY CALCULATIONS (The Operational Plan) 🔵 ---
+    # Aggregated by SQLite over the month's Date range; only the totals come back.
+    month_stats = month_metrics(curr_month_str)
+
+    # Logged Incomes this month (March Target)
+    income_val = month_stats["income"]
+
+    # Logged Expenses this month (March Commitment) + simulated subscriptions
+    rec_simulated_total = from_cents(to_cents(df_rec_simulated["Price"]).sum()) if not df_rec_simulated.empty else 0.0
+    expense_val = month_stats["expense"] + rec_simulated_total
+
+    # --- 🏛️ STRATEGIC TOTALS (The Actual Cash Reality) ---
+    # Total Cash = ALL Received Incomes (Jan + Feb + Mar...) - ALL Paid Expenses
+    # This is your real bank balance. It updates when you mark ANY row (January or March) as paid.
+    total_cash = cash_balance()
+
+    # --- 📊 OPERATIONAL METRICS ---
+    # Settled MTD: Only expenses dated this month that you have actually paid
+    paid_mtd = month_stats["paid_expense"]
+
+    # DISPOSABLE: Your total cash currently in the bank
+    # This reflects your REAL spending power at this exact second.
+    disposable_income = total_cash
+
+    # Burn Rate (Based on total commitments vs total expected income)
+    burn_rate = (expense_val / income_val * 100) if income_val > 0 else 0.0
+
+    total_invested = df_inv["Amount"].sum() if not df_inv.empty else 0.0
+    net_worth = total_cash + total_invested
+
+    # --- ZONE 1: STRATEGIC CAPITAL ---
+    st.markdown("## 🏛️ Strategic Capital")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        metric_card("Liquid Assets", total_cash, "rgba(59, 130, 246, 0.1)", "#3b82f6", "Real Bank Balance")
+    with c2:
+        metric_card("Invested Capital", total_invested, "rgba(139, 92, 246, 0.1)", "#8b5cf6", "Yield Assets")
+    with c3:
+        metric_card("Net Equity", net_worth, "rgba(16, 185, 129, 0.1)", "#10b981", "Total System Value")
+
+    st.divider()
+
+    # --- ZONE 2: OPERATIONAL VELOCITY ---
+    st.markdown("### 📊 Operational Velocity")
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        # Expected income for the current month only
+        metric_card("Gross Inflow", income_val, "rgba(16, 185, 129, 0.05)", "#10b981",
+                    f"Plan for {today.strftime('%b')}")
+    with m2:
+        metric_card("Gross Outflow", expense_val, "rgba(239, 68, 68, 0.05)", "#ef4444", f"Burn: {burn_rate:.1f}%")
+    with m3:
+        # Expenses dated this month that are settled
+        metric_card("Cleared Debts", paid_mtd, "rgba(245, 158, 11, 0.05)", "#f59e0b", "Actually Paid (MTD)")
+    with m4:
+        # This now reacts to the January payment you marked!
+        metric_card("Disposable", disposable_income, "rgba(59, 130, 246, 0.05)", "#3b82f6", "Cash-in-Hand")
+
+    # --- ZONE 3: BUDGET VS ACTUAL ---
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("### 🎯 Budget Guardrails")
+    if not df_budgets.empty:
+        exp_by_cat = category_totals(curr_month_str)
+        if not df_rec_simulated.empty:
+            rec_cents = pd.DataFrame({"Category": df_rec_simulated["Category"],
+                                      "cents": to_cents(df_rec_simulated["Price"])})
+            exp_by_cat = pd.concat([exp_by_cat[["Category", "cents"]], rec_cents]).groupby(
+                "Category")["cents"].sum().reset_index()
+            exp_by_cat["Price"] = from_cents(exp_by_cat["cents"])
+        comp_df = pd.merge(df_budgets, exp_by_cat, left_on="category", right_on="Category", how="left").fillna(0)
+        comp_df["% Used"] = (comp_df["Price"] / comp_df["amount"] * 100).round(1)
+
+        px = plotly_express()
+        fig_budget = px.bar(comp_df, x="category", y=["amount", "Price"],
+                            barmode="group",
+                            labels={"value": "Amount (R$)", "variable": "Metric", "category": "Category"},
+                            title="Spending vs. Monthly Limits",
+                            color_discrete_map={"amount": "#3b82f6", "Price": "#ef4444"},
+                            template="plotly_dark")
+        st.plotly_chart(fig_budget, use_container_width=True)
+
+        cols = st.columns(len(comp_df))
+        for i, row in comp_df.iterrows():
+            with cols[i]:
+                color = "#10b981" if row["% Used"] < 80 else "#f59e0b" if row["% Used"] < 100 else "#ef4444"
+                st.markdown(f"""
+                    <div style="text-align: center; padding: 5px; border-top: 3px solid {color}; background: rgba(255,255,255,0.02); border-radius: 5px;">
+                        <p style="margin:0; font-size: 0.7rem; color: #8B949E;">{row['category']}</p>
+                        <p style="margin:0; font-size: 0.9rem; font-weight: bold; color: {color};">{row['% Used']}%</p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+    # --- ZONE 4: PENDING OBLIGATIONS ---
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("### 💳 Liability & Settlement Pipeline")
+
+    # 1. FILTER: Unpaid AND strictly within this month (range query on Date, not a full scan)
+    unpaid_current = unpaid_in_month(curr_month_str)
+
+    # 2. FILTER RECURRING (same projected occurrences as the metrics above)
+    active_recurring_settle = df_rec_simulated
+
+    # 3. RENDER TABS
+    if not unpaid_current.empty or not active_recurring_settle.empty:
+        tab_cards, tab_tasks, tab_rec_pending = st.tabs([
+            "💳 Institutional Debt (Cards)",
+            "💸 Direct Settlements (Pix/Cash)",
+            "🔄 Fixed Subscriptions"
+        ])
+
+        with tab_cards:
+            # This month's bills come from card_statements: one precomputed row per card, no ledger filter
+            statements = month_statements(curr_month_str)
+            open_bills = statements[statements["state"] != "paid"].reset_index(drop=True)
+            cards_only = unpaid_current[~unpaid_current["Payment Method"].isin(DIRECT_METHODS)]
+
+            if not open_bills.empty:
+                cols = st.columns(len(open_bills))
+
+                for i, row in open_bills.iterrows():
+                    bank_name = row['Payment Method']
+                    cycle = (f"{row['state'].title()} · due {pd.Timestamp(row['due_date']):%d/%m}"
+                             if pd.notna(row['due_date']) else row['state'].title())
+                    with cols[i]:
+                        st.markdown(f"""
+                            <div style="background: rgba(255, 75, 75, 0.1); padding: 15px; border-radius: 10px; border: 1px solid rgba(255, 75, 75, 0.2); text-align: center;">
+                                <p style="margin:0; font-size: 0.8rem; color: #94a3b8;">{bank_name}</p>
+                                <h3 style="margin:0; color: #ff4b4b;">R$ {row['Price']:,.2f}</h3>
+                                <p style="margin:0; font-size: 0.7rem; color: #8B949E;">{cycle}</p>
+                            </div>
+                        """, unsafe_allow_html=True)
+
+                        # DETAILS LIST: Now you will see all 20+ items here
+                        with st.expander(f"View {bank_name} items"):
+                            details = cards_only[cards_only["Payment Method"] == bank_name]
+                            st.dataframe(details[["Date", "Item", "Price"]], hide_index=True, use_container_width=True)
+
+                        if st.button(f"Settle {bank_name} Month", key=f"btn_settle_{bank_name}",
+                                     use_container_width=True):
+                            result = settle_statement(bank_name, curr_month_str)
+                            st.toast(f"{bank_name} balance cleared! Cash: R$ {result['cash_balance']:,.2f}")
+                            st.rerun()
+            else:
+                st.success("No card installments due this month. ✅")
+
+        with tab_tasks:
+            pix_cash = unpaid_current[unpaid_current["Payment Method"].isin(DIRECT_METHODS)].copy()
+            if not pix_cash.empty:
+                edited_df = st.data_editor(
+                    pix_cash[["id", "Date", "Category", "Item", "Price", "paid"]],
+                    hide_index=True, use_container_width=True, key="editor_monthly_pix_final",
+                    column_config={
+                        "id": None,
+                        "Date": st.column_config.DateColumn("Due Date", format="DD/MM/YYYY"),
+                        "paid": st.column_config.CheckboxColumn("Settle?")
+                    },
+                    disabled=["Date", "Category", "Item", "Price"]
+                )
+                # Every ticked row in one batch (a single UPDATE), not one write + rerun per row
+                checked = edited_df.loc[edited_df["paid"] == 1, "id"]
+                if not checked.empty:
+                    result = settle("expenses", ids=checked.tolist(), description="Pix/Cash settlements")
+                    st.toast(f"Settled {result['rows']} payment(s). Cash: R$ {result['cash_balance']:,.2f}")
+                    st.rerun()
+            else:
+                st.success("No manual payments pending for this month. ✅")
+
+        with tab_rec_pending:
+            if not active_recurring_settle.empty:
+                st.caption(f"Subscriptions for {today.strftime('%B %Y')}:")
+                current_month_names = month_item_names(curr_month_str)
+                pending_recurring = active_recurring_settle[~active_recurring_settle['Item'].isin(current_month_names)]
+
+                if not pending_recurring.empty:
+                    for _, r_row in pending_recurring.iterrows():
+                        c1, c2, c3 = st.columns([3, 1, 1])
+                        c1.markdown(f"**{r_row['Item']}**")
+                        c2.markdown(f"R$ {r_row['Price']:,.2f}")
+                        if c3.button("Settle", key=f"log_rec_{r_row['recurring_id']}", use_container_width=True):
+                            run_query(
+                                'INSERT INTO expenses (Date, Category, Item, Price, "Payment Method", paid) VALUES (?, ?, ?, ?, ?, ?)',
+                                (today.strftime("%Y-%m-%d"), r_row['Category'], r_row['Item'], r_row['Price'],
+                                 r_row['Payment Method'], 1))
+                            st.toast(f"Logged: {r_row['Item']}")
+                            st.rerun()
+                else:
+                    st.success("✨ All fixed subscriptions for this month settled.")
+
+    # 4. UNDO: shown whenever batches exist, even once nothing is left to settle
+    recent = recent_settlements()
+    if not recent.empty:
+        with st.expander("↩️ Recent settlements"):
+            for _, batch in recent.iterrows():
+                c1, c2 = st.columns([4, 1])
+                c1.caption(f"{batch['created_at']} · {batch['description'] or batch['table_name']} · "
+                           f"{batch['rows']} row(s) · R$ {from_cents(batch['cents']):,.2f}")
+                if c2.button("Undo", key=f"undo_settlement_{batch['id']}", use_container_width=True):
+                    result = undo_settlement(batch["id"])
+                    st.toast(f"Undone: {result['rows']} row(s) back to pending. "
+                             f"Cash: R$ {result['cash_balance']:,.2f}")
+                    st.rerun()
+
+    # --- TIER 4: INTELLIGENCE HUB ---
+    st.divider()
+    st.markdown("### 🕵️‍♂️ Intelligence Hub")
+
+    with st.expander("🔍 Deep Data Analysis & Prediction", expanded=False):
+        date_selection = st.date_input(
+            "Analysis Period",
+            value=(today.date(), (today + relativedelta(months=1)).date()),
+            key="intel_hub_v6_final"
+        )
+
+        # CRITICAL FIX: Ensure start and end exist before running
+        if isinstance(date_selection, (list, tuple)) and len(date_selection) == 2:
+            start, end = pd.to_datetime(date_selection[0]), pd.to_datetime(date_selection[1])
+
+            # One vectorized pass: daily flows (incl. recurring), balance bands, runway and chart breakdowns
+            forecast = cash_flow_forecast(start, end)
+            px = plotly_express()
+            net_pred = forecast["net"]
+            status_color = "#10b981" if net_pred > 0 else "#ef4444"
+
+            st.markdown(f"""
+                <div style="background: rgba(255,255,255,0.02); padding: 20px; border-radius: 15px; border-left: 10px solid {status_color}; margin-bottom: 20px;">
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <div>
+                            <p style="color: #8B949E; margin:0; font-size: 0.8rem; letter-spacing: 1px;">STRATEGIC FORECAST (INCL. RECURRING)</p>
+                            <h1 style="margin:0; color: white;">R$ {net_pred:,.2f}</h1>
+                        </div>
+                        <div style="text-align: right;">
+                            <p style="margin:0; font-size: 1.2rem; color: {status_color}; font-weight: bold;">{'SURPLUS' if net_pred > 0 else 'DEFICIT'}</p>
+                            <p style="margin:0; color: #8B949E; font-size: 0.8rem;">{start.strftime('%d %b')} — {end.strftime('%d %b')}</p>
+                        </div>
+                    </div>
+                </div>
+            """, unsafe_allow_html=True)
+
+            col_left, col_right = st.columns([2, 1])
+            with col_left:
+                st.markdown("##### 📊 Cash Flow Momentum")
+                combined_list = []
+                # Ledger months come pre-aggregated from monthly_rollup; only the simulated
+                # subscriptions are grouped here.
+                range_str = (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+                e = range_monthly_totals("expense", *range_str)
+                sim_exp = forecast["recurring"]
+                if not sim_exp.empty:
+                    sim_by_month = pd.Series(to_cents(sim_exp["Price"]), index=sim_exp.index).groupby(
+                        sim_exp["Date"].dt.to_period("M").astype(str)).sum()
+                    e = pd.concat([e[["Month", "cents"]], sim_by_month.rename_axis("Month").reset_index(name="cents")])
+                    e = e.groupby("Month", as_index=False)["cents"].sum()
+                    e["Price"] = from_cents(e["cents"])
+                if not e.empty:
+                    e = e.rename(columns={"Month": "Date"})
+                    e["Type"] = "Expense"; combined_list.append(e)
+                i = range_monthly_totals("income", *range_str)
+                if not i.empty:
+                    i = i.rename(columns={"Month": "Date"})
+                    i["Type"] = "Income"; combined_list.append(i)
+                if combined_list:
+                    fig_mom = px.bar(pd.concat(combined_list), x="Date", y="Price", color="Type", barmode="group", template="plotly_dark", height=250, color_discrete_map={"Income": "#10b981", "Expense": "#ef4444"})
+                    st.plotly_chart(fig_mom, use_container_width=True)
+
+            with col_right:
+                st.markdown("##### 💳 Card Utilization")
+                card_data = forecast["account_totals"]
+                if not card_data.empty:
+                    st.plotly_chart(px.bar(card_data, y="Payment Method", x="Price", orientation='h', template="plotly_dark", height=250, color_discrete_sequence=["#8b5cf6"]), use_container_width=True)
+
+            st.divider()
+            col_pie, col_leaks = st.columns([1, 2])
+            with col_pie:
+                st.markdown("##### 🍕 Category Mix")
+                if not forecast["category_totals"].empty:
+                    st.plotly_chart(px.pie(forecast["category_totals"], values="Price", names="Category", hole=0.6, template="plotly_dark", height=280), use_container_width=True)
+
+            with col_leaks:
+                st.markdown("##### 🕵️‍♂️ Top Spending Items")
+                leaks = forecast["top_items"]
+                if not leaks.empty:
+                    for _, row in leaks.iterrows():
+                        st.markdown(f"""
+                            <div style="display: flex; justify-content: space-between; align-items: center; padding: 12px; margin-bottom: 5px; background: rgba(255,255,255,0.02); border-radius: 8px; border: 1px solid rgba(255,255,255,0.05);">
+                                <div style="flex-grow: 1;"><p style="margin:0; font-weight: bold; color: white;">{row['Item']}</p><p style="margin:0; font-size: 0.75rem; color: #8B949E;">{row['Category']} • {row['Date'].strftime('%d/%m/%Y')}</p></div>
+                                <div style="text-align: right;"><p style="margin:0; font-weight: bold; color: #ef4444;">R$ {row['Price']:,.2f}</p></div>
+                            </div>
+                        """, unsafe_allow_html=True)
+
+            st.markdown("##### 📈 Projected Balance")
+            proj_df = pd.DataFrame({"Date": forecast["days"], "Scheduled": forecast["balance"],
+                                    "P10": forecast["bands"][10], "P50": forecast["bands"][50],
+                                    "P90": forecast["bands"][90]})
+            fig_proj = px.line(proj_df, x="Date", y=["P10", "P50", "P90", "Scheduled"], template="plotly_dark",
+                               height=260, color_discrete_map={"P10": "#ef4444", "P50": "#8B949E",
+                                                               "P90": "#10b981", "Scheduled": "#3b82f6"})
+            st.plotly_chart(fig_proj, use_container_width=True)
+
+            st.divider()
+            col_runway, col_audit = st.columns([1, 1.5])
+            with col_runway:
+                st.markdown("##### ⛽ Cash Runway")
+                runway_days = forecast["runway_days"]
+                color_runway = "#10b981" if runway_days > 90 else "#f59e0b" if runway_days > 30 else "#ef4444"
+                st.markdown(f"""<div style="background: rgba(255,255,255,0.02); padding: 15px; border-radius: 12px; text-align: center; border: 1px solid rgba(255,255,255,0.05);"><h2 style="margin:0; color: {color_runway};">{int(runway_days)} Days</h2><p style="margin:0; font-size: 0.8rem; color: #8B949E;">Survival Days</p></div>""", unsafe_allow_html=True)
+
+            with col_audit:
+                st.markdown("##### ✂️ Optimization Audit")
+                waste_items = forecast["waste_items"]
+                if not waste_items.empty:
+                    for _, row in waste_items.iterrows():
+                        st.markdown(f"""<div style="display: flex; justify-content: space-between; padding: 5px 10px; background: rgba(255,255,255,0.03); border-radius: 5px; margin-bottom: 3px; border-left: 4px solid #ef4444;"><span style="font-size: 0.85rem; color: #EEE; font-weight: bold;">{row['Item']}</span><span style="font-size: 0.85rem; font-weight: bold; color: #ef4444;">R$ {row['Price']:,.2f}</span></div>""", unsafe_allow_html=True)
+
+            st.divider()
+            st.markdown("##### 🎯 Savings Goal Progress")
+            target_rate, current_rate = 0.30, forecast["savings_rate"]
+            st.progress(min(1.0, max(0.0, current_rate / target_rate)))
+            st.write(f"**{current_rate * 100:.1f}%** / {target_rate * 100:.0f}%")
+
+    # --- TIER 5: NOTIFICATIONS ---
+    st.divider()
+    with st.expander("📧 Notification Center"):
+        col_notif1, col_notif2 = st.columns([2, 1])
+        user_email = col_notif1.text_input("Report Recipient", placeholder="your@email.com")
+        if st.button("📧 Dispatch Monthly Report"):
+            if user_email:
+                # Month totals come from the cached report engine (monthly_rollup), not the full ledgers
+                report_body = monthly_summary_text()
+                # Only queued here: the outbox worker does the SMTP round-trip off the script thread
+                enqueue_report(user_email, "LifeOS Summary", report_body)
+                st.success("Report queued! It will be sent in the background.")
+
+        outbox = recent_outbox()
+        if not outbox.empty:
+            st.caption("Recent dispatches")
+            st.dataframe(outbox[["recipient", "status", "attempts", "last_error", "created_at", "sent_at"]],
+                         hide_index=True, use_container_width=True)
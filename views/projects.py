@@ -0,0 +1,124 @@
+import streamlit as st
+import pandas as pd
+from db_utils import run_query
+
+
+def render(data):
+    """Dev portfolio: task board and audit trail."""
+    st.markdown("<h1>💻 Security & Dev Portfolio</h1>", unsafe_allow_html=True)
+
+    # 2. DATA INGESTION
+    res = run_query("SELECT * FROM dev_tasks")
+    df_tasks = res if res is not None and not res.empty else pd.DataFrame(
+        columns=['id', 'task_name', 'status', 'priority', 'completed'])
+
+    # 3. OPERATIONAL METRICS (Health Monitoring)
+    sprint_tasks = df_tasks[df_tasks['status'] == 'Sprint'].copy()
+    progress = sprint_tasks['completed'].mean() if not sprint_tasks.empty else 0
+
+    st.markdown('<div class="fintech-card">', unsafe_allow_html=True)
+    st.markdown(f"### 🛡️ Remediation Velocity ({progress:.0%})")
+    # Custom colored progress bar based on completion
+    st.progress(progress)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # 4. LIFECYCLE TABS
+    tab1, tab2, tab3, tab4 = st.tabs(["🚀 Active Sprint", "📂 Triage Queue", "🛠️ Provisioning", "📜 Audit Trail"])
+
+    with tab1:
+        st.markdown('<div class="fintech-card">', unsafe_allow_html=True)
+        st.markdown("### 🏃 Execution Phase")
+
+        if not sprint_tasks.empty:
+            for _, row in sprint_tasks.iterrows():
+                # Severity-based visual markers
+                p_map = {"High": "🔴", "Medium": "🟡", "Low": "🟢"}
+                icon = p_map.get(row['priority'], "⚪")
+
+                is_checked = bool(row['completed'])
+                if st.checkbox(f"{icon} {row['task_name']}", value=is_checked, key=f"sprint_{row['id']}"):
+                    if not is_checked:
+                        run_query("UPDATE dev_tasks SET completed = 1 WHERE id = ?", (row['id'],))
+                        st.rerun()
+                elif is_checked:
+                    run_query("UPDATE dev_tasks SET completed = 0 WHERE id = ?", (row['id'],))
+                    st.rerun()
+
+            st.divider()
+
+            # INTEGRATED CLOSEOUT (Operation Cleanup)
+            st.markdown("### 🧹 Quick Closeout")
+            c_sel, c_arch, c_del = st.columns([2, 1, 1])
+
+            target_list = sprint_tasks['task_name'].tolist()
+            if target_list:
+                target_name = c_sel.selectbox("Select Task to Finalize:", target_list, key="q_close")
+                target_id = sprint_tasks[sprint_tasks['task_name'] == target_name]['id'].values[0]
+
+                if c_arch.button("✅ Archive", use_container_width=True):
+                    run_query("UPDATE dev_tasks SET status = 'Archived', completed = 1 WHERE id = ?", (int(target_id),))
+                    st.toast(f"Requirement {target_id} moved to history.")
+                    st.rerun()
+
+                if c_del.button("🗑️ Purge", use_container_width=True):
+                    run_query("DELETE FROM dev_tasks WHERE id = ?", (int(target_id),))
+                    st.warning(f"Record {target_id} purged from system.")
+                    st.rerun()
+        else:
+            st.info("No active tickets in the current sprint. Pipeline idle.")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with tab2:
+        st.markdown('<div class="fintech-card">', unsafe_allow_html=True)
+        st.markdown("### 🔍 Risk Triage (Backlog)")
+        backlog_items = df_tasks[df_tasks['status'] == 'Backlog'].copy()
+
+        if not backlog_items.empty:
+            for _, row in backlog_items.iterrows():
+                col_item, col_btn = st.columns([3, 1])
+                color = "🔴" if row['priority'] == "High" else "⚪"
+                col_item.markdown(f"{color} **{row['task_name']}**")
+
+                if col_btn.button("Promote to Sprint", key=f"prom_{row['id']}", use_container_width=True):
+                    run_query("UPDATE dev_tasks SET status = 'Sprint' WHERE id = ?", (row['id'],))
+                    st.rerun()
+        else:
+            st.success("Triage complete. No pending risks found.")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with tab3:
+        st.markdown('<div class="fintech-card">', unsafe_allow_html=True)
+        st.markdown("### 🛠️ Provision New Requirement")
+        with st.form("new_req_form", clear_on_submit=True):
+            col_a, col_b = st.columns([2, 1])
+            name = col_a.text_input("Operational Requirement", placeholder="e.g., Audit firewall logs")
+            priority = col_b.selectbox("Severity Level", ["Low", "Medium", "High"], index=1)
+            stage = st.selectbox("Deployment Pipeline", ["Backlog", "Sprint"])
+
+            if st.form_submit_button("Deploy to System"):
+                if name:
+                    run_query("INSERT INTO dev_tasks (task_name, status, priority, completed) VALUES (?, ?, ?, 0)",
+                              (name.strip(), stage, priority))
+                    st.rerun()
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with tab4:
+        st.markdown('<div class="fintech-card">', unsafe_allow_html=True)
+        st.markdown("### 📜 Historical Audit Trail")
+        archived_tasks = df_tasks[df_tasks['status'] == 'Archived'].copy()
+
+        if not archived_tasks.empty:
+            st.dataframe(archived_tasks[['task_name', 'priority', 'completed']],
+                         column_config={
+                             "task_name": "Resolved Task",
+                             "priority": "Severity",
+                             "completed": st.column_config.CheckboxColumn("Validated")
+                         },
+                         hide_index=True, use_container_width=True)
+
+            if st.button("Purge Audit History", help="Destructive action: removes all archived records"):
+                run_query("DELETE FROM dev_tasks WHERE status = 'Archived'")
+                st.rerun()
+        else:
+            st.caption("Audit trail empty. No historical data.")
+        st.markdown('</div>', unsafe_allow_html=True)
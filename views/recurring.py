@@ -0,0 +1,57 @@
+import streamlit as st
+import pandas as pd
+from db_utils import run_query
+from data_layer import load_data
+
+
+def render(data):
+    """Fixed monthly expenses (subscriptions)."""
+    st.markdown("## 🔄 Manage Fixed Expenses")
+
+    with st.form("recurring_form", clear_on_submit=True):
+        c1, c2 = st.columns(2)
+        item_name = c1.text_input("Service/Item (e.g. Netflix, Rent)")
+        price = c2.number_input("Monthly Price", min_value=0.0, step=0.01)
+
+        c3, c4 = st.columns(2)
+        category = c3.selectbox("Category", ["Housing", "Son", "Fun", "Transport", "Food", "Education"])
+        day = c4.number_input("Due Day of Month", 1, 31, 1)
+
+        if st.form_submit_button("Add Subscription"):
+            if item_name and price > 0:
+                # Capture current month/year as the 'birth' of this subscription
+                creation_date = pd.Timestamp.now().strftime("%Y-%m-01")
+                run_query(
+                    "INSERT INTO recurring (item, category, price, payment_method, day_of_month, active, created_at) VALUES (?, ?, ?, 'Pix', ?, 1, ?)",
+                    (item_name, category, price, int(day), creation_date))
+                st.success(f"Subscription for {item_name} active from {creation_date}!")
+                st.rerun()
+
+    st.divider()
+    df_rec = load_data("recurring")
+    if not df_rec.empty:
+        # Fill empty created_at for old records so they don't break
+        df_rec['created_at'] = df_rec['created_at'].fillna("2024-01-01")
+
+        col_view, col_status = st.columns([3, 1.2])
+        with col_view:
+            st.dataframe(df_rec, use_container_width=True, hide_index=True)
+        with col_status:
+            st.markdown("⚙️ **Lifecycle Management**")
+            options = (df_rec["id"].astype(str) + " - " + df_rec["item"]).tolist()
+            target = st.selectbox("Select Service", options, key="status_rec_ui")
+            target_id = target.split(" - ")[0]
+
+            c1, c2 = st.columns(2)
+            if c1.button("▶️ Resume"):
+                run_query("UPDATE recurring SET active = 1 WHERE id = ?", (target_id,))
+                st.rerun()
+            if c2.button("⏸️ Pause"):
+                run_query("UPDATE recurring SET active = 0 WHERE id = ?", (target_id,))
+                st.rerun()
+
+            st.markdown("---")
+            if st.button("🗑️ Delete Permanently", use_container_width=True):
+                run_query("DELETE FROM recurring WHERE id = ?", (target_id,))
+                st.warning(f"Subscription removed from system.")
+                st.rerun()
@@ -0,0 +1,115 @@
+import streamlit as st
+import pandas as pd
+from aggregations import balance_curve, cash_balance, monthly_totals
+from views.components import plotly_express
+
+
+def render(data):
+    """Long-term strategy: FIRE progress and net worth allocation."""
+    st.title("🎖️ Wealth Command & FIRE Strategy")
+    st.markdown("### *Building your Financial Freedom*")
+
+    # --- 1. DATA CALCULATIONS ---
+    # Month-level totals come from monthly_rollup (one row per month), not the full ledger
+    exp_by_month = monthly_totals("expense")
+    # Same real bank balance as the Dashboard, read from the running balance (no all-time sums)
+    total_cash = cash_balance()
+    df_inv = data["investments"]
+    total_invested = df_inv["Amount"].sum() if not df_inv.empty else 0
+    net_worth = total_cash + total_invested
+
+    # Calculate Average Monthly Expense (Last 3 months or all time)
+    if not exp_by_month.empty:
+        # We look at the average cost of your lifestyle
+        avg_monthly_exp = exp_by_month["Price"].mean()
+    else:
+        avg_monthly_exp = 0.0
+
+    # --- 2. THE FIRE CALCULATOR (Financial Independence, Retire Early) ---
+    # Goal: Invested Assets = 25x Annual Expenses
+    annual_expense_target = avg_monthly_exp * 12
+    fire_number = annual_expense_target * 25
+
+    progress_pct = min(total_invested / fire_number, 1.0) if fire_number > 0 else 0.0
+
+    # Financial Runway (How many months can you survive without working?)
+    runway_months = total_invested / avg_monthly_exp if avg_monthly_exp > 0 else 0
+
+    st.divider()
+
+    # --- 3. TOP LEVEL METRICS ---
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Financial Runway", f"{runway_months:.1f} Months",
+              help="How long your investments alone cover your lifestyle.")
+    c2.metric("Annual Lifestyle Cost", f"R$ {annual_expense_target:,.2f}")
+    c3.metric("FIRE Number", f"R$ {fire_number:,.2f}", help="25x your annual expenses.")
+
+    # --- 4. VISUAL PROGRESS TO FREEDOM ---
+    st.markdown(f"#### 🎯 Progress to Financial Independence: {progress_pct * 100:.1f}%")
+    st.progress(progress_pct)
+
+    if progress_pct < 1.0:
+        remaining = fire_number - total_invested
+        st.info(f"🚀 You are **R$ {remaining:,.2f}** away from your freedom goal.")
+    else:
+        st.balloons()
+        st.success("🎊 You have reached Financial Independence!")
+
+    st.divider()
+
+    # --- 5. ASSET ALLOCATION (Visualizing where your wealth is) ---
+    px = plotly_express()
+    st.subheader("🏦 Asset Allocation")
+    col_asset1, col_asset2 = st.columns([2, 1])
+
+    with col_asset1:
+        # Net Worth Trend (Simplified - Assets vs Cash)
+        allocation_data = pd.DataFrame({
+            "Source": ["Liquid Cash", "Invested Assets"],
+            "Value": [total_cash, total_invested]
+        })
+        st.plotly_chart(px.pie(allocation_data, values="Value", names="Source",
+                               hole=0.5, color_discrete_sequence=["#3b82f6", "#8b5cf6"],
+                               template="plotly_dark"), use_container_width=True)
+
+    with col_asset2:
+        # Breakdown of Investments
+        if not df_inv.empty:
+            st.markdown("##### Investment Mix")
+            inv_mix = df_inv.groupby("Category")["Amount"].sum().reset_index()
+            st.plotly_chart(px.bar(inv_mix, x="Category", y="Amount", template="plotly_dark"), use_container_width=True)
+
+    # Liquid cash over the last year: one end-of-day balance per day from cash_ledger
+    today = pd.Timestamp.now().normalize()
+    cash_history = balance_curve((today - pd.DateOffset(years=1)).strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+    st.markdown("##### 💧 Liquid Cash (Last 12 Months)")
+    st.plotly_chart(px.area(cash_history.rename_axis("Date").reset_index(), x="Date", y="Balance",
+                            color_discrete_sequence=["#3b82f6"], template="plotly_dark"),
+                    use_container_width=True)
+
+    # --- 6. FREEDOM MILESTONES ---
+    st.divider()
+    st.subheader("🚩 Freedom Milestones")
+
+
+    def milestone_box(label, amount, current):
+        status = "✅" if current >= amount else "⏳"
+        color = "#10b981" if current >= amount else "#94a3b8"
+        st.markdown(f"""
+            <div style="padding:10px; border-radius:10px; border-left: 5px solid {color}; background-color: #1a1c24; margin-bottom:10px;">
+                <span style="color: {color}; font-weight: bold;">{status} {label}</span><br>
+                <small style="color: #64748b;">Target: R$ {amount:,.2f}</small>
+            </div>
+        """, unsafe_allow_html=True)
+
+
+    m1, m2, m3 = st.columns(3)
+    with m1:
+        milestone_box("Starter Emergency Fund", 1000, net_worth)
+        milestone_box("3-Month Safety Net", avg_monthly_exp * 3, net_worth)
+    with m2:
+        milestone_box("1-Year Runway", avg_monthly_exp * 12, total_invested)
+        milestone_box("Lean FIRE (Halfway)", fire_number / 2, total_invested)
+    with m3:
+        milestone_box("Coast FIRE", fire_number * 0.75, total_invested)
+        milestone_box("FULL FREEDOM", fire_number, total_invested)